@@ -1,6 +1,6 @@
 import os
 import json
-from groq import Groq
+from utils.clients import groq_client
 
 
 class BoilerplateGeneratorAgent:
@@ -13,7 +13,7 @@ class BoilerplateGeneratorAgent:
     }
 
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = groq_client("boilerplate_generator")
 
         self.system_prompt = """
 You are an expert software project initializer.
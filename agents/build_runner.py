@@ -176,10 +176,17 @@
 #         }
 
 
-import docker
+from utils.clients import docker_client
 import os
+import sys
 import json
-from groq import Groq
+import re
+import time
+from utils.clients import groq_client
+from utils.log_capture import LogCapture, spill_path_for
+from utils.project_root import detect_project_root as cached_project_root
+from utils.test_selector import find_impacted_tests
+from utils import dependency_cache
 
 class BuildRunnerAgent:
     """
@@ -188,8 +195,12 @@ class BuildRunnerAgent:
     """
 
     def __init__(self):
-        self.client = docker.from_env()
-        self.ai = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = docker_client()
+        self.ai = groq_client("build_runner")
+        # containers whose dependencies resolved online at least once
+        self._resolved = set()
+        # container_id -> daemon-backed toolchain ("maven"/"gradle") or None
+        self._daemons = {}
 
         self.system_prompt = """
 # You are an expert build system engineer.
@@ -214,30 +225,8 @@ class BuildRunnerAgent:
     # Detect where the actual project root is
     # ---------------------------------------------------------
     def detect_project_root(self, container_id: str):
-        container = self.client.containers.get(container_id)
-
-        # Look for common project types
-        search_patterns = [
-            "pom.xml",               # Maven
-            "build.gradle",          # Gradle
-            "package.json",          # Node
-            "pyproject.toml",        # Python
-            "requirements.txt",      # Python
-            "*.csproj",              # .NET
-        ]
-
-        for pattern in search_patterns:
-            cmd = f"bash -lc \"find /workspace -name '{pattern}' | head -n 1\""
-            ec, out = container.exec_run(cmd)
-            result = out.decode().strip()
-
-            if result:
-                # Strip filename → return folder containing it
-                project_root = os.path.dirname(result)
-                return project_root
-
-        # fallback → assume workspace root
-        return "/workspace"
+        # single pruned `find`, cached per container (utils/project_root.py)
+        return cached_project_root(self.client, container_id)
 
     # ---------------------------------------------------------
     # Execute a command inside project directory
@@ -255,10 +244,12 @@ class BuildRunnerAgent:
 
         return exit_code, output.decode(errors="ignore")
     
-    def _exec_stream_logs(self, container_id: str, project_root: str, command: str):
+    def _exec_stream_logs(self, container_id: str, project_root: str, command: str, kind: str = "build"):
         """
-        Streams logs line-by-line instead of capturing huge outputs into memory.
-        Returns the full log as a single string (but built incrementally).
+        Streams logs instead of capturing huge outputs into memory.
+        Returns (exit_code, LogCapture): bounded head/tail + error-line index,
+        with the full log spilled to a gzip file.
+        BUILD_LOG_CAPTURE=full keeps every line in memory (no truncation).
         """
 
         container = self.client.containers.get(container_id)
@@ -277,44 +268,192 @@ class BuildRunnerAgent:
 
         output_stream = self.client.api.exec_start(exec_id, stream=True)
 
-        logs = []
+        if os.getenv("BUILD_LOG_CAPTURE", "bounded") == "full":
+            capture = LogCapture(head_lines=sys.maxsize)
+        else:
+            capture = LogCapture(spill_path=spill_path_for(container_id, kind))
 
-        for chunk in output_stream:
-            line = chunk.decode(errors="ignore")
-            # print(line, end="")   # optional real-time console streaming
-            logs.append(line)
+        try:
+            for chunk in output_stream:
+                # print(chunk.decode(errors="ignore"), end="")   # optional real-time console streaming
+                capture.feed(chunk)
+        finally:
+            capture.close()
 
         # Get exit code
         exit_code = self.client.api.exec_inspect(exec_id)["ExitCode"]
 
-        return exit_code, "".join(logs)
+        return exit_code, capture
 
 
     # ---------------------------------------------------------
-    # Static known build commands
+    # Static known build commands, per build stage
     # ---------------------------------------------------------
-    def _static_build_command(self, stack):
-        lang = stack.get("language", "").lower()
-        tool = stack.get("build_tool", "").lower()
-
-        if lang == "java":
-            if "maven" in tool:
-                return "mvn clean install"
-            if "gradle" in tool:
-                return "gradle test --stacktrace"
-            return "mvn test"
+    # "compile" is the fast gate, "test" only runs once it passes, "full"
+    # is the clean one-shot build used as the final gate (and the only
+    # stage for BUILD_STRATEGY=full). {offline} expands to the tool's
+    # offline flag once this container has resolved its dependencies.
+    BUILD_STAGES = {
+        "maven": {
+            "compile": "mvn {offline}-q compile",
+            "test": "mvn {offline}-q test",
+            "full": "mvn clean install",
+        },
+        "gradle": {
+            "compile": "gradle {offline}-q compileJava compileTestJava",
+            "test": "gradle {offline}test --stacktrace",
+            "full": "gradle clean build --stacktrace",
+        },
+        "node": {
+            "compile": "npm install {offline}--no-audit --no-fund && npm run build --if-present",
+            "test": "npm test",
+            "full": "npm install && npm run build --if-present && npm test",
+        },
+        "python": {
+            "compile": "python -m compileall -q .",
+            "test": "pytest -q",
+            "full": "pytest -q",
+        },
+        "dotnet": {
+            "compile": "dotnet build",
+            "test": "dotnet test --no-build",
+            "full": "dotnet build --no-incremental && dotnet test --no-build",
+        },
+    }
+    OFFLINE_FLAGS = {"maven": "-o ", "gradle": "--offline ", "node": "--prefer-offline "}
+    # "test" stage restricted to impacted tests ({tests} filled per toolchain)
+    TARGETED_TEST_COMMANDS = {
+        "maven": "mvn {offline}-q test -Dtest={tests} -Dsurefire.failIfNoSpecifiedTests=false",
+        "gradle": "gradle {offline}test {tests} --stacktrace",
+        "node": "npx jest --findRelatedTests {tests} --passWithNoTests",
+        "python": "pytest -q {tests}",
+        "dotnet": "dotnet test --no-build --filter '{tests}'",
+    }
+    TEST_JOINERS = {
+        "maven": lambda t: ",".join(t),
+        "gradle": lambda t: " ".join(f"--tests {x}" for x in t),
+        "node": lambda t: " ".join(t),
+        "python": lambda t: " ".join(t),
+        "dotnet": lambda t: "|".join(f"FullyQualifiedName~{x}" for x in t),
+    }
+    INCREMENTAL_STAGES = ("compile", "test")
+
+    def flush_cache(self, container_id: str, language: str):
+        """
+        Finishes publishing resolved dependencies to the shared cache before
+        the container is stopped or removed (the refresh after a successful
+        build runs detached and would be killed with the container).
+        """
+        if container_id not in self._resolved:
+            return
+        try:
+            dependency_cache.refresh(self.client.containers.get(container_id), (language or "").lower(), wait=True)
+        except Exception as e:
+            print(f"⚠️ Dependency cache refresh failed: {e}")
 
-        if lang == "node":
-            return "npm install && npm test"
+    # ---------------------------------------------------------
+    # Persistent build daemons (mvnd / Gradle daemon)
+    # ---------------------------------------------------------
+    DAEMON_BINARIES = {"maven": "mvnd", "gradle": "gradle"}
+    DAEMON_WARMUP_DIR = "/tmp/sb-daemon-warmup"
+    DAEMON_WARMUP = {
+        "maven": (
+            "printf '<project><modelVersion>4.0.0</modelVersion><groupId>sb</groupId>"
+            "<artifactId>warmup</artifactId><version>1</version><packaging>pom</packaging></project>' > pom.xml"
+            " && mvnd -B -q validate"
+        ),
+        "gradle": "touch settings.gradle && gradle --daemon -q help",
+    }
+    DAEMON_FAILURE_MARKERS = ("DaemonException", "Could not connect to", "daemon disappeared", "command not found")
+
+    def daemons_enabled(self):
+        return os.getenv("BUILD_DAEMON", "on").lower() not in ("0", "off", "false")
+
+    def start_daemon(self, container_id: str, stack: dict):
+        """
+        Starts a long-lived build daemon when the container is leased so the
+        first compile already hits a warm JVM. No-op (plain mvn/gradle) if
+        disabled or the binary is missing from the image.
+        """
+        toolchain = self._toolchain(stack)
+        if not self.daemons_enabled() or toolchain not in self.DAEMON_BINARIES:
+            self._daemons[container_id] = None
+            return None
 
-        if lang == "python":
-            return "pytest -q"
+        container = self.client.containers.get(container_id)
+        ec, _ = container.exec_run(f"bash -lc \"command -v {self.DAEMON_BINARIES[toolchain]}\"")
+        if ec != 0:
+            print(f"ℹ️ {self.DAEMON_BINARIES[toolchain]} not found in image; using plain {toolchain}")
+            self._daemons[container_id] = None
+            return None
 
-        if lang == "dotnet":
-            return "dotnet build"
+        warmup = self.DAEMON_WARMUP[toolchain]
+        container.exec_run(
+            f"bash -lc \"mkdir -p {self.DAEMON_WARMUP_DIR} && cd {self.DAEMON_WARMUP_DIR} && {warmup}\"",
+            detach=True
+        )
+        self._daemons[container_id] = toolchain
+        print(f"🔥 Started {self.DAEMON_BINARIES[toolchain]} daemon in {container_id[:12]}")
+        return toolchain
+
+    def _with_daemon(self, container_id: str, cmd: str):
+        toolchain = self._daemons.get(container_id)
+        if toolchain == "maven":
+            return re.sub(r"(^|&&\s*)mvn\b", r"\1mvnd -B", cmd)
+        if toolchain == "gradle":
+            return re.sub(r"(^|&&\s*)gradle\b(?! --daemon)", r"\1gradle --daemon", cmd)
+        return cmd
+
+    def _toolchain(self, stack):
+        lang = stack.get("language", "").lower()
+        tool = (stack.get("build_tool") or "").lower()
 
+        if lang == "java":
+            return "gradle" if "gradle" in tool else "maven"
+        if lang in ("node", "python", "dotnet"):
+            return lang
         return None  # unknown → use AI
 
+    def strategy_for(self, stack):
+        """
+        "incremental" (default) or "full"; selectable per stack via
+        stack["build_strategy"], BUILD_STRATEGY_<TOOLCHAIN> or BUILD_STRATEGY.
+        """
+        toolchain = self._toolchain(stack)
+        if toolchain is None:
+            return "full"
+        return (
+            stack.get("build_strategy")
+            or os.getenv(f"BUILD_STRATEGY_{toolchain.upper()}")
+            or os.getenv("BUILD_STRATEGY", "incremental")
+        ).lower()
+
+    def _targeted_test_command(self, container_id, project_root, stack, changed_paths, offline=False):
+        """
+        Test command limited to tests touching `changed_paths`.
+        Returns "" when nothing is impacted (skip the stage; the final
+        gate still runs everything) and None when selection is unsupported.
+        """
+        toolchain = self._toolchain(stack)
+        if toolchain not in self.TARGETED_TEST_COMMANDS:
+            return None
+        container = self.client.containers.get(container_id)
+        tests = find_impacted_tests(container, project_root, toolchain, changed_paths)
+        if not tests:
+            return ""
+        print(f"🎯 Impacted tests: {tests}")
+        flag = self.OFFLINE_FLAGS.get(toolchain, "") if offline else ""
+        return self.TARGETED_TEST_COMMANDS[toolchain].format(offline=flag, tests=self.TEST_JOINERS[toolchain](tests))
+
+    def _static_build_command(self, stack, stage="full", offline=False):
+        toolchain = self._toolchain(stack)
+        if toolchain is None:
+            return None
+
+        template = self.BUILD_STAGES[toolchain][stage]
+        flag = self.OFFLINE_FLAGS.get(toolchain, "") if offline else ""
+        return template.format(offline=flag)
+
     # ---------------------------------------------------------
     # AI fallback for unusual stacks
     # ---------------------------------------------------------
@@ -350,8 +489,8 @@ Output only JSON.
     # ---------------------------------------------------------
     # Choose the correct build command (static → AI → user)
     # ---------------------------------------------------------
-    def detect_build_command(self, stack):
-        cmd = self._static_build_command(stack)
+    def detect_build_command(self, stack, stage="full", offline=False):
+        cmd = self._static_build_command(stack, stage=stage, offline=offline)
         if cmd:
             return {"command": cmd, "need_clarification": False}
 
@@ -364,33 +503,103 @@ Output only JSON.
             "question": f"Cannot determine build command for stack: {stack}. Please provide it."
         }
 
+    # ---------------------------------------------------------
+    # Run one command and package the result
+    # ---------------------------------------------------------
+    def _run_stage(self, container_id: str, project_root: str, stage: str, cmd: str):
+        print(f"\n🚀 Running build [{stage}] in: {project_root}\n➡️ {cmd}")
+        started = time.time()
+        # exit_code, logs = self._exec_in_dir(container_id, project_root, cmd)
+        exit_code, capture = self._exec_stream_logs(container_id, project_root, cmd)
+        return {
+            "stage": stage,
+            "exit_code": exit_code,
+            "command": cmd,
+            "duration_s": round(time.time() - started, 2),
+            "capture": capture,
+        }
+
+    def _can_go_offline(self, container_id: str, stack: dict):
+        if container_id in self._resolved:
+            return True
+        container = self.client.containers.get(container_id)
+        return dependency_cache.is_seeded(container, stack.get("language", "").lower())
+
     # ---------------------------------------------------------
     # MAIN: Run the build
     # ---------------------------------------------------------
-    def run_build(self, container_id: str, stack: dict, user_override_cmd=None):
+    def run_build(self, container_id: str, stack: dict, user_override_cmd=None, stage=None, changed_paths=None):
+        """
+        stage=None follows the stack's strategy: compile gate, then tests
+        (incremental) or one clean build (full). stage="full" forces the
+        clean build, e.g. as the final gate of an incremental run.
+        changed_paths (workspace-relative) narrows the incremental test
+        stage to the impacted tests.
+        """
         project_root = self.detect_project_root(container_id)
 
         if user_override_cmd:
-            cmd = user_override_cmd
+            plan = [("override", user_override_cmd)]
         else:
-            decision = self.detect_build_command(stack)
-
-            if decision.get("need_clarification"):
-                return decision
-
-            cmd = decision["command"]
-
-        print(f"\n🚀 Running build in: {project_root}\n➡️ {cmd}")
-
-        # exit_code, logs = self._exec_in_dir(container_id, project_root, cmd)
-        exit_code, logs = self._exec_stream_logs(container_id, project_root, cmd)
-
-
+            if stage is None:
+                stages = self.INCREMENTAL_STAGES if self.strategy_for(stack) == "incremental" else ("full",)
+            else:
+                stages = (stage,)
+            offline = self._can_go_offline(container_id, stack)
+            plan = []
+            for st in stages:
+                if st == "test" and changed_paths:
+                    targeted = self._targeted_test_command(container_id, project_root, stack, changed_paths, offline=offline)
+                    if targeted == "":
+                        print("🎯 No impacted tests; deferring tests to the final build")
+                        continue
+                    if targeted:
+                        plan.append(("test_targeted", targeted))
+                        continue
+                decision = self.detect_build_command(stack, stage=st, offline=offline and st != "full")
+                if decision.get("need_clarification"):
+                    return decision
+                plan.append((st, decision["command"]))
+
+        results = []
+        for st, cmd in plan:
+            daemon_cmd = self._with_daemon(container_id, cmd)
+            result = self._run_stage(container_id, project_root, st, daemon_cmd)
+            if result["exit_code"] != 0 and daemon_cmd != cmd and (
+                result["exit_code"] == 127
+                or any(m in result["capture"].text() for m in self.DAEMON_FAILURE_MARKERS)
+            ):
+                # daemon broken in this container: fall back to the plain tool for good
+                print("⚠️ Build daemon failed; falling back to plain build tool")
+                self._daemons[container_id] = None
+                result = self._run_stage(container_id, project_root, st, cmd)
+            offline_miss = any(m in result["capture"].text() for m in dependency_cache.OFFLINE_FAILURE_MARKERS)
+            if result["exit_code"] != 0 and st in self.INCREMENTAL_STAGES and offline_miss:
+                # cache lacks something: retry this stage online once
+                cmd = self.detect_build_command(stack, stage=st)["command"]
+                result = self._run_stage(container_id, project_root, st, self._with_daemon(container_id, cmd))
+            results.append(result)
+            if result["exit_code"] != 0:
+                break
+
+        last = results[-1]
+        exit_code = last["exit_code"]
+        capture = last["capture"]
+
+        if exit_code == 0:
+            self._resolved.add(container_id)
+            # share newly resolved dependencies with later containers
+            dependency_cache.refresh(self.client.containers.get(container_id), stack.get("language", "").lower())
+
+        # state keeps the bounded excerpt + a reference to the full log
         return {
             "success": exit_code == 0,
             "exit_code": exit_code,
-            "logs": logs,
-            "command": cmd,
+            "logs": capture.text(),
+            **capture.summary(),
+            "command": last["command"],
+            "stage": last["stage"],
+            "stages": [{k: v for k, v in r.items() if k != "capture"} for r in results],
             "project_root": project_root,
             "need_clarification": False
         }
@@ -193,14 +193,24 @@ from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
 from SolutionWriteModel.groq_model import GroqModelClient
+from utils.patching import PatchError, edit_protocol, resolve_edit
+
+# Optional imports for local vector store; deferred to first use because
+# importing scikit-learn dominates process startup
+TfidfVectorizer = None
+cosine_similarity = None
+
+
+def _load_sklearn() -> bool:
+    global TfidfVectorizer, cosine_similarity
+    if TfidfVectorizer is None:
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.metrics.pairwise import cosine_similarity
+        except Exception:
+            return False
+    return True
 
-# Optional imports for local vector store
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-except Exception:
-    TfidfVectorizer = None
-    cosine_similarity = None
 
 # A simple helper to estimate token counts (approx). You can replace
 # with tokenizer from tiktoken / transformers for exact counts.
@@ -232,7 +242,7 @@ class LocalTfidfVectorStore(VectorStoreBase):
     """
 
     def __init__(self):
-        if TfidfVectorizer is None:
+        if not _load_sklearn():
             raise RuntimeError("scikit-learn is required for LocalTfidfVectorStore")
         self._docs: List[Dict[str, Any]] = []
         self._ids = set()
@@ -343,7 +353,7 @@ class CodeWriterAgent:
                  protected_dirs: Optional[List[str]] = None,
                  protected_files: Optional[List[str]] = None,
                  max_context_tokens: int = 3500,
-                 model_client=GroqModelClient()):
+                 model_client=None):
         """Construct the agent.
 
         - vector_store: instance implementing VectorStoreBase
@@ -356,7 +366,7 @@ class CodeWriterAgent:
         self.protected_dirs = protected_dirs or []
         self.protected_files = set(protected_files or [])
         self.max_context_tokens = max_context_tokens
-        self.model_client = model_client  # user supplied LLM wrapper
+        self.model_client = model_client or GroqModelClient()  # user supplied LLM wrapper
 
         # in-memory bookkeeping
         self._project_index: Dict[str, ProjectFile] = {}
@@ -454,10 +464,12 @@ class CodeWriterAgent:
     # ---------------------------
     # LLM request helpers
     # ---------------------------
-    def _compose_prompt(self, target_path: str, action: str, related_files: List[ProjectFile], file_plan: Dict[str, List[str]], extra_instructions: Optional[str] = None) -> str:
+    def _compose_prompt(self, target_path: str, action: str, related_files: List[ProjectFile], file_plan: Dict[str, List[str]], extra_instructions: Optional[str] = None,
+                        current_content: Optional[str] = None) -> str:
         """Compose a token-safe prompt for generating the target file.
         The prompt includes: concise global summary, component summary,
-        minimal file_plan reference, and trimmed related files.
+        minimal file_plan reference, and trimmed related files. When
+        `current_content` is given the model may answer with a patch.
         """
         parts = []
         # system-like opener
@@ -473,6 +485,10 @@ class CodeWriterAgent:
         parts.append("FILE PLAN (paths only):\n" + json.dumps(file_plan, indent=2))
         parts.append(f"TARGET:\npath: {target_path}\naction: {action}\n")
 
+        if current_content is not None:
+            parts.append("CURRENT TARGET CONTENT:\n" + current_content)
+            related_files = [rf for rf in related_files if rf.path != target_path]
+
         if related_files:
             rf_texts = []
             for rf in related_files:
@@ -484,6 +500,9 @@ class CodeWriterAgent:
 
         # Request strict JSON-only response
         parts.append("\nReturn STRICT JSON only: { \"path\": \"<target path>\", \"action\": \"create|update|skip_protected\", \"content\": \"<file content>\" }")
+        if current_content is not None:
+            parts.append("For small changes to the current content prefer: { \"path\": \"<target path>\", \"action\": \"patch\", "
+                         "\"hunks\": [ { \"search\": \"<exact unique lines from the current content>\", \"replace\": \"<new lines>\" } ] }")
 
         prompt = "\n\n".join(parts)
         # Truncate prompt to fall under max_context_tokens
@@ -579,7 +598,11 @@ class CodeWriterAgent:
             "files_to_update": project_files.get("files_to_update", []),
             "files_to_create": project_files.get("files_to_create", []),
         }
-        prompt = self._compose_prompt(target_path, action, related, file_plan, extra_instructions=extra_instructions)
+        # host-side copy of an existing target enables patch responses
+        current = self._project_index.get(target_path) if action == "update" and edit_protocol() == "patch" else None
+        current_content = current.content if current else None
+        prompt = self._compose_prompt(target_path, action, related, file_plan, extra_instructions=extra_instructions,
+                                      current_content=current_content)
 
         # 3) call LLM
         raw = self._call_llm(prompt, max_tokens=1500)
@@ -587,6 +610,18 @@ class CodeWriterAgent:
         if parsed is None:
             return {"path": target_path, "action": "error", "content": "", "raw": raw}
 
+        if parsed.get("action") == "patch":
+            parsed.setdefault("path", target_path)
+            try:
+                parsed = resolve_edit(parsed, current_content)
+            except PatchError as ex:
+                # fall back to a full rewrite of this file only
+                print(f"⚠️ Patch for {target_path} failed ({ex}); requesting full content")
+                raw = self._call_llm(prompt + "\n\nYour previous patch did not apply. Return the FULL file content (action update).", max_tokens=1500)
+                parsed = self._extract_json(raw)
+                if parsed is None or parsed.get("action") == "patch":
+                    return {"path": target_path, "action": "error", "content": "", "raw": raw}
+
         # ensure fields
         parsed.setdefault("path", target_path)
         parsed.setdefault("action", action)
@@ -603,6 +638,8 @@ class CodeWriterAgent:
 
         # index read files early
         for f in project_files.get("files_to_read", []) or []:
+            if f.get("content") is None:  # planned update of a file that does not exist yet
+                continue
             self.index_file(f["path"], f["content"])
 
         # Build global summary up-front
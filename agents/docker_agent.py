@@ -1,5 +1,11 @@
+import os
 import uuid
 import docker
+from utils.clients import docker_client
+from utils import dependency_cache
+from utils.admission import AdmissionController, reservation_labels
+from utils import lifecycle
+from constants.resources import profile_for
 
 STATIC_IMAGE_MAP = {
     "java": "solution-builder-java:latest",
@@ -12,13 +18,44 @@ STATIC_IMAGE_MAP = {
 class DockerAgent:
     """
     Runs everything INSIDE Docker.
-    No local paths. No volume mounts.
+    No local paths. The only volumes are the shared dependency caches
+    (see utils/dependency_cache.py).
     """
 
     def __init__(self):
-        self.client = docker.from_env()
+        self.client = docker_client()
+        self.admission = AdmissionController(self.client)
+        # removes containers of builds that never came back (utils/lifecycle.py)
+        lifecycle.start_reaper(self.client)
 
-    def create_environment(self, stack: dict):
+    def _resource_options(self, language: str, profile: dict) -> dict:
+        """cpu/memory/pid limits plus tmpfs mounts for a language profile."""
+        # exec: JDBC drivers, embedded databases etc. load native libraries from /tmp
+        tmpfs = {"/tmp": f"rw,exec,size={profile['tmp_mb']}m,mode=1777"}
+        # build output on tmpfs is opt-in: `mvn clean` / `gradle clean` cannot delete a mount point
+        template = dependency_cache.CACHE_SPECS.get(language, {}).get("template")
+        if profile.get("build_dir") and template and \
+                os.getenv("CONTAINER_TMPFS_BUILD_DIR", "off").lower() in ("1", "on", "true"):
+            root = os.path.dirname(template[1])
+            tmpfs[f"/workspace/{root}/{profile['build_dir']}"] = f"rw,exec,size={profile['tmp_mb']}m"
+        return {
+            "nano_cpus": int(profile["cpus"] * 1e9),
+            "mem_limit": f"{profile['memory_mb']}m",
+            "memswap_limit": f"{profile['memory_mb']}m",  # no swap: an over-budget build fails fast
+            "pids_limit": profile["pids"],
+            "tmpfs": tmpfs,
+        }
+
+    def capacity(self) -> dict:
+        """Host utilisation and which language profiles would be admitted right now."""
+        util = self.admission.utilisation()
+        util["can_admit"] = {
+            lang: not util["admission_control"] or self.admission.fits(profile_for(lang), util)
+            for lang in list(STATIC_IMAGE_MAP) + ["default"]
+        }
+        return util
+
+    def create_environment(self, stack: dict, build_id: str = None):
         language = stack["language"].lower()
 
         if language not in STATIC_IMAGE_MAP:
@@ -37,25 +74,48 @@ class DockerAgent:
                 f"❌ Docker image '{image}' not found locally.\n"
                 f"Build it first using:\n"
                 f"docker build -t {image} dockerfiles/{language}\n"
+                f"python -m utils.dependency_cache seed {language}\n"
             )
 
-        # Start container WITHOUT VOLUMES
-        container = self.client.containers.run(
-            image=image,
-            name=container_name,
-            command="tail -f /dev/null",
-            detach=True,
-            tty=True,
-            working_dir="/workspace"  # persistent inside container only
-        )
+        # Start container; workspace lives inside the container only,
+        # dependency caches come from shared named volumes. The build waits
+        # here while the host has no room for its resource profile.
+        profile = profile_for(language)
+        with self.admission.admit(language, profile):
+            container = self.client.containers.run(
+                image=image,
+                name=container_name,
+                command="tail -f /dev/null",
+                detach=True,
+                tty=True,
+                working_dir="/workspace",
+                labels={**reservation_labels(language, profile), **lifecycle.build_labels(build_id)},
+                **self._resource_options(language, profile),
+                **dependency_cache.container_options(self.client, language)
+            )
 
         return {
             "container_id": container.id,
             "container_name": container_name,
             "workspace": "/workspace",   # always internal path
-            "image": image
+            "image": image,
+            "resources": {"cpus": profile["cpus"], "memory_mb": profile["memory_mb"]}
         }
 
+    def reattach(self, container_id: str) -> bool:
+        """
+        Re-use a container provisioned by an earlier (crashed or paused) run.
+        Starts it again if it exited; returns False if it no longer exists.
+        """
+        try:
+            container = self.client.containers.get(container_id)
+        except docker.errors.NotFound:
+            return False
+        if container.status != "running":
+            print(f"🐳 Restarting container {container.name} for resumed build")
+            container.start()
+        return True
+
     def exec(self, container_id: str, command: str):
         container = self.client.containers.get(container_id)
         exit_code, output = container.exec_run(command)
@@ -76,3 +136,53 @@ class DockerAgent:
             self.client.containers.get(container_id).remove(force=True)
         except:
             pass
+
+    def build_containers(self, build_id: str) -> list:
+        """Containers labelled with this build id (running or stopped)."""
+        return self.client.containers.list(all=True, filters={"label": f"{lifecycle.BUILD_LABEL}={build_id}"})
+
+    def snapshot_workspace(self, container_id: str, build_id: str) -> dict:
+        """Archives /workspace (minus build output) under VAR_DIR/snapshots."""
+        stream, _ = self.client.containers.get(container_id).get_archive("/workspace")
+        snap = lifecycle.write_snapshot(stream, build_id)
+        print(f"📦 Workspace snapshot: {snap['path']} ({snap['files']} files, {snap['bytes'] / 1e6:.1f} MB)")
+        return snap
+
+    def teardown(self, container_id: str, build_id: str, status: str, reason: str = "finalize") -> dict:
+        """
+        End of a build: snapshot if configured, then remove the container,
+        or only stop it when the policy keeps it (see utils/lifecycle.py).
+        """
+        out = {"container_id": container_id, "status": status}
+        if lifecycle.should_snapshot(status):
+            try:
+                out["snapshot"] = self.snapshot_workspace(container_id, build_id)
+            except Exception as e:
+                print(f"⚠️ Workspace snapshot failed: {e}")
+                out["snapshot_error"] = str(e)
+        action = "removed" if lifecycle.should_remove(status) else "stopped"
+        (self.remove if action == "removed" else self.stop)(container_id)
+        lifecycle.CONTAINER_TEARDOWNS.inc(action=action, reason=reason)
+        print(f"🧹 Container {container_id[:12]} {action} ({reason}, build {status})")
+        out["action"] = action
+        return out
+
+    def park(self, build_id: str, reason: str) -> list:
+        """
+        Stops (does not remove) a build's containers when it pauses or
+        fails, releasing host capacity; reattach() restarts them on resume
+        and the reaper removes them if the build never comes back.
+        """
+        parked = []
+        for c in self.build_containers(build_id):
+            if c.status == "running":
+                try:
+                    c.stop()
+                except Exception as e:
+                    print(f"⚠️ Could not stop container {c.name}: {e}")
+                    continue
+                lifecycle.CONTAINER_TEARDOWNS.inc(action="stopped", reason=reason)
+                parked.append(c.name)
+        if parked:
+            print(f"⏸️ Stopped {', '.join(parked)} ({reason}); kept for resume")
+        return parked
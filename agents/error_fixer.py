@@ -137,12 +137,17 @@
 # agents/error_fixer.py
 import os
 import json
-from groq import Groq
+from utils.clients import groq_client
 from constants.protection import PROTECTED_DIRS, PROTECTED_FILES
+from utils import fix_memory
+from utils.fix_memory import FixMemory
+from utils.patching import PATCH_FORMAT_INSTRUCTIONS, edit_protocol, resolve_edits
 
 class ErrorFixerAgent:
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = groq_client("error_fixer")
+        self.memory = FixMemory()
+        output_format = PATCH_FORMAT_INSTRUCTIONS if edit_protocol() == "patch" else "Return full file contents."
         self.system_prompt = f"""
 You are an expert engineer who fixes build/runtime errors.
 
@@ -153,13 +158,13 @@ Inputs:
 
 Output JSON only:
 {{ "edits": [ {{ "path": "...", "action":"update/create", "content":"full file" }} ] }}
-
+{output_format}
 Rules:
 - DO NOT modify protected files or directories:
   DIRS: {PROTECTED_DIRS}
   FILES: {PROTECTED_FILES}
 - If the fix would require editing a protected file, return an object with action 'skip_protected'.
-- Return full file contents. No explanations.
+- No explanations.
 """
     def _extract_json(self, text):
         text = text.strip()
@@ -174,7 +179,45 @@ Rules:
                     return None
         return None
 
-    def fix_errors(self, global_spec: str, build_logs: str, selected_files: list):
+    def _is_protected(self, p: str) -> bool:
+        return any(p.startswith(d.rstrip("/") + "/") or p == d.rstrip("/") for d in PROTECTED_DIRS) or p in PROTECTED_FILES
+
+    def _complete(self, prompt: str, usage: dict):
+        resp = self.client.chat.completions.create(
+            model=os.getenv("GROQ_MODEL", "openai/gpt-oss-120b"),
+            messages=[{"role":"system","content":self.system_prompt},{"role":"user","content":prompt}],
+            temperature=0.0,
+            max_completion_tokens=8192
+        )
+        if getattr(resp, "usage", None):
+            usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + (getattr(resp.usage, "prompt_tokens", 0) or 0)
+            usage["completion_tokens"] = usage.get("completion_tokens", 0) + (getattr(resp.usage, "completion_tokens", 0) or 0)
+        return resp.choices[0].message.content
+
+    def fix_errors(self, global_spec: str, build_logs: str, selected_files: list,
+                   parsed_errors: list = None, context: dict = None):
+        """
+        parsed_errors: structured errors with workspace-relative "path"
+        context: utils.fix_context.build_fix_context output; its "files" replace
+                 selected_files in the prompt, its "sources" hold full bodies
+        """
+        parsed_errors = parsed_errors or []
+        current = {p: c for p, c in ((context or {}).get("sources") or {}).items() if c is not None}
+
+        # -------- fix memory: replay known patches, skip the LLM --------
+        if fix_memory.enabled() and parsed_errors:
+            hit = self.memory.suggest(parsed_errors, current)
+            if hit and not any(self._is_protected(e["path"]) for e in hit["edits"]):
+                print(f"🧠 Fix memory covered {len(parsed_errors)} error(s); skipping LLM")
+                return {"edits": hit["edits"], "blocked": [], "usage": {},
+                        "source": "memory", "memory_fingerprints": hit["fingerprints"]}
+
+        files = context["files"] if context else list(selected_files)
+        originals = {f["path"]: f.get("content") for f in files}
+        originals.update(current)  # patches always apply to full bodies, never excerpts
+        excerpt_note = ""
+        if any(f.get("excerpt") for f in files):
+            excerpt_note = "\nFiles with \"excerpt\": true show only line windows; edit them with patch hunks, never full content.\n"
         prompt = f"""
 PROJECT_SPEC:
 {global_spec}
@@ -183,26 +226,50 @@ ERROR_BLOCK:
 {build_logs}
 
 FILES:
-{json.dumps(selected_files, indent=2)}
-"""
-        resp = self.client.chat.completions.create(
-            model=os.getenv("GROQ_MODEL", "openai/gpt-oss-120b"),
-            messages=[{"role":"system","content":self.system_prompt},{"role":"user","content":prompt}],
-            temperature=0.0,
-            max_completion_tokens=8192
-        )
-        raw = resp.choices[0].message.content
+{json.dumps(files, indent=2)}
+{excerpt_note}"""
+        usage = {}
+        raw = self._complete(prompt, usage)
         parsed = self._extract_json(raw)
         if parsed is None:
-            return {"edits": [], "error": "Could not parse JSON", "raw": raw}
+            return {"edits": [], "error": "Could not parse JSON", "raw": raw, "usage": usage}
         parsed.setdefault("edits", [])
+
+        # -------- apply patches against the copies we sent --------
+        edits, failed = resolve_edits(parsed["edits"], originals)
+        excerpts = {f["path"] for f in files if f.get("excerpt")}
+        # a full rewrite of an excerpt would drop the lines the model never saw
+        for e in [e for e in edits if e.get("path") in excerpts and not e.get("patched")]:
+            edits.remove(e)
+            failed.append({"path": e["path"], "reason": "full content returned for an excerpt"})
+        if failed:
+            # fallback: full content, only for the paths whose patch missed
+            full_sources = [{"path": f["path"], "content": originals.get(f["path"])} for f in failed if originals.get(f["path"])]
+            retry_prompt = prompt + f"""
+PATCH_FAILED:
+{json.dumps(failed, indent=2)}
+
+CURRENT_CONTENT:
+{json.dumps(full_sources, indent=2)}
+
+Return full file contents ("action":"update","content":"full file") for exactly these paths.
+"""
+            retry = self._extract_json(self._complete(retry_prompt, usage)) or {}
+            wanted = {f["path"] for f in failed}
+            full = [e for e in retry.get("edits", []) if e.get("path") in wanted and e.get("content")]
+            edits.extend(full)
+            print(f"🔁 Patch fallback: {len(full)}/{len(wanted)} file(s) rewritten in full")
+
         # Filter protected edits
         allowed = []
         blocked = []
-        for e in parsed["edits"]:
+        for e in edits:
             p = e.get("path", "")
-            if any(p.startswith(d.rstrip("/") + "/") or p == d.rstrip("/") for d in PROTECTED_DIRS) or p in PROTECTED_FILES:
+            if self._is_protected(p):
                 blocked.append({"path": p, "action": "skip_protected"})
             else:
                 allowed.append(e)
-        return {"edits": allowed, "blocked": blocked}
+        learned = self.memory.learn(parsed_errors, current, allowed) if fix_memory.enabled() else []
+        return {"edits": allowed, "blocked": blocked, "usage": usage,
+                "source": "llm", "memory_fingerprints": learned,
+                "patched": sum(1 for e in allowed if e.get("patched")), "patch_fallbacks": len(failed)}
@@ -106,7 +106,7 @@
 
 import os
 import json
-from groq import Groq
+from utils.clients import groq_client
 from constants.protection import PROTECTED_DIRS, PROTECTED_FILES
 
 
@@ -125,7 +125,7 @@ class FilePlannerAgent:
     """
 
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = groq_client("file_planner")
 
         self.system_prompt = f"""
 You are an expert senior software engineer and system planner.
@@ -91,7 +91,7 @@
 
 
 # agents/file_scanner.py
-import docker
+from utils.clients import docker_client
 import os
 from constants.protection import PROTECTED_DIRS, PROTECTED_FILES
 
@@ -101,7 +101,7 @@ class FileScannerAgent:
     """
 
     def __init__(self):
-        self.client = docker.from_env()
+        self.client = docker_client()
 
     def _is_protected(self, rel_path: str) -> bool:
         # Normalize path
@@ -63,8 +63,12 @@
 
 import os
 import json
-from groq import Groq
+from utils import capture
+from utils.clients import groq_client
 import re
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.log_parsers import parse_logs, format_errors, strip_ansi
 
 
 class LogSummarizerAgent:
@@ -74,8 +78,10 @@ class LogSummarizerAgent:
     """
 
     def __init__(self):
-        self.ai = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.ai = groq_client("log_summarizer")
         self.model = os.getenv("GROQ_MODEL", "openai/gpt-oss-120b")
+        # parallel chunk calls; 1 restores the old sequential behaviour
+        self.max_workers = int(os.getenv("LOG_SUMMARIZER_CONCURRENCY", "4"))
 
         self.system_prompt = """
 You are an expert build-log analyst.
@@ -86,43 +92,98 @@ Your tasks:
    - file names
    - line numbers
    - the actual error / exception
-3. Output STRICT JSON:
+3. Rate your confidence that this block is the ROOT cause:
+   "high" only if it names the failing file/line or the first exception.
+4. Output STRICT JSON:
 
 {
   "error_summary": "<short summary>",
-  "error_block": "<minimal log block>"
+  "error_block": "<minimal log block>",
+  "confidence": "high|medium|low"
 }
 """
 
     # ------------------------------------------------------------
     # 1. Local prefiltering (very important)
     # ------------------------------------------------------------
-    def _extract_error_candidates(self, logs: str) -> str:
-        lines = logs.splitlines()
+    # Severity per matched keyword; higher survives the budget first.
+    SEVERITY = {
+        "Caused by": 4, "Traceback": 4, "FATAL": 4, "fatal": 4,
+        "BUILD FAILED": 4, "BUILD FAILURE": 4, "COMPILATION ERROR": 4,
+        "ERROR": 3, "Error": 3, "error": 3, "Exception": 3,
+        "FAIL": 2, "failed": 2, "undefined": 2, "not found": 2,
+        "compilation": 1,
+    }
+    ERROR_RE = re.compile(
+        r"Caused by|Traceback|FATAL|fatal|BUILD FAIL(?:ED|URE)|COMPILATION ERROR"
+        r"|ERROR|Error|error|Exception|FAIL|failed|undefined|not found|compilation"
+    )
+    FRAME_RE = re.compile(r"^\s*(?:at [\w$.<>]+\(.*\)|File \".*\", line \d+|\.\.\. \d+ more)")
+    CONTEXT_BEFORE = 10
+    CONTEXT_AFTER = 20
+    MAX_FILTERED_CHARS = 50000
 
-        keywords = [
-            "error", "Error", "ERROR", "Exception", "Traceback",
-            "failed", "FAIL", "fatal", "compilation", "undefined", "not found"
-        ]
+    def _extract_error_candidates(self, logs: str) -> str:
+        lines = strip_ansi(logs).splitlines()
 
-        candidates = []
+        # Single pass: score each line once and merge overlapping windows
+        # into intervals [start, end) as we go.
+        blocks = []  # [start, end, severity]
         for i, line in enumerate(lines):
-            if any(k in line for k in keywords):
-                # capture ~20 lines before and after
-                start = max(i - 20, 0)
-                end = min(i + 20, len(lines))
-                block = "\n".join(lines[start:end])
-                candidates.append(block)
+            severity = 0
+            for m in self.ERROR_RE.finditer(line):
+                severity = max(severity, self.SEVERITY.get(m.group(0), 3))
+            if not severity:
+                continue
+            start = max(i - self.CONTEXT_BEFORE, 0)
+            end = min(i + self.CONTEXT_AFTER + 1, len(lines))
+            if blocks and start <= blocks[-1][1]:
+                blocks[-1][1] = end
+                blocks[-1][2] = max(blocks[-1][2], severity)
+            else:
+                blocks.append([start, end, severity])
 
         # fallback if nothing detected
-        if not candidates:
+        if not blocks:
             return "\n".join(lines[-300:])
 
-        # concatenate
-        joined = "\n\n--- BLOCK ---\n\n".join(candidates)
-
-        # limit size to ~50k chars
-        return joined[-50000:]
+        # Render blocks, collapsing stack frames already shown elsewhere.
+        seen_frames = set()
+        rendered = []
+        for start, end, severity in blocks:
+            out = []
+            skipped = 0
+            for line in lines[start:end]:
+                if self.FRAME_RE.match(line):
+                    frame = line.strip()
+                    if frame in seen_frames:
+                        skipped += 1
+                        continue
+                    seen_frames.add(frame)
+                if skipped:
+                    out.append(f"\t... {skipped} repeated frame(s) omitted")
+                    skipped = 0
+                out.append(line)
+            if skipped:
+                out.append(f"\t... {skipped} repeated frame(s) omitted")
+            rendered.append((start, severity, "\n".join(out)))
+
+        # Keep the most severe, earliest blocks within the budget, then
+        # restore log order so the model reads them chronologically.
+        separator = "\n\n--- BLOCK ---\n\n"
+        chosen = []
+        used = 0
+        for block in sorted(rendered, key=lambda b: (-b[1], b[0])):
+            size = len(block[2]) + len(separator)
+            if used + size > self.MAX_FILTERED_CHARS:
+                if not chosen:
+                    chosen.append((block[0], block[1], block[2][:self.MAX_FILTERED_CHARS]))
+                continue
+            chosen.append(block)
+            used += size
+
+        chosen.sort(key=lambda b: b[0])
+        return separator.join(b[2] for b in chosen)
 
     # ------------------------------------------------------------
     # 2. Chunk a large text safely
@@ -141,10 +202,7 @@ Extract ONLY the smallest log block that contains the real failure.
 LOG CHUNK:
 {chunk}
 """
-        with open("log_summarizer_prompt.txt", "a") as f:
-            f.write("--- New Chunk Prompt ---\n")
-            f.write(prompt)
-            f.write("\n--- End Chunk Prompt ---\n\n")
+        capture.record("log_summarizer_prompt", model=self.model, prompt=prompt)
 
         resp = self.ai.chat.completions.create(
             model=self.model,
@@ -166,27 +224,101 @@ LOG CHUNK:
         except:
             return {
                 "error_summary": "Chunk parse failed",
-                "error_block": chunk[-5000:]
+                "error_block": chunk[-5000:],
+                "confidence": "none"
             }
 
+    # ------------------------------------------------------------
+    # 4. Rank chunk summaries
+    # ------------------------------------------------------------
+    CONFIDENCE_SCORE = {"high": 30, "medium": 20, "low": 10, "none": 0}
+    LOCATION_RE = re.compile(r"[\w/.-]+\.\w+[:(\[]\d+")
+    ROOT_CAUSE_RE = re.compile(r"Caused by|Exception|error:|ERROR|Traceback")
+
+    def _rank(self, summary: dict, index: int) -> float:
+        """
+        Higher is better: model confidence first, then concrete evidence
+        (file:line, exception markers), then earlier chunks and tighter blocks.
+        """
+        block = str(summary.get("error_block") or "")
+        score = self.CONFIDENCE_SCORE.get(str(summary.get("confidence", "low")).lower(), 10)
+        if self.LOCATION_RE.search(block):
+            score += 8
+        if self.ROOT_CAUSE_RE.search(block):
+            score += 5
+        if not block.strip():
+            score -= 20
+        score -= index  # root causes come first in the log
+        score -= min(len(block), 20000) / 5000
+        return score
+
+    def _is_conclusive(self, summary: dict) -> bool:
+        return (
+            str(summary.get("confidence", "")).lower() == "high"
+            and bool(self.LOCATION_RE.search(str(summary.get("error_block") or "")))
+        )
+
     # ------------------------------------------------------------
     # MAIN PUBLIC METHOD
     # ------------------------------------------------------------
     def summarize(self, logs: str):
-        # 1) Pre-save full logs for debugging
-        with open("build_logs.txt", "w", encoding="utf-8") as f:
-            f.write(logs)
+        # 1) Keep the logs for debugging (background, per build)
+        capture.record("build_logs", logs=logs)
+
+        # 2) Deterministic fast path: known toolchain error formats
+        parsed = parse_logs(logs)
+        if parsed:
+            errors = parsed["errors"]
+            first = errors[0]
+            return {
+                "error_summary": f"{parsed['parser']} build failed with {len(errors)} error(s); "
+                                 f"first: {os.path.basename(first['file'])}:{first['line']} {first['message']}",
+                "error_block": format_errors(errors),
+                "errors": errors,
+                "parser": parsed["parser"],
+            }
 
-        # 2) Local filtering (critical)
+        # 3) Local filtering (critical)
         filtered = self._extract_error_candidates(logs)
 
-        # 3) Chunk if needed
+        # 4) Chunk if needed
         chunks = self._chunk(filtered)
 
-        # 4) Summarize each chunk
-        chunk_summaries = [self._summarize_chunk(c) for c in chunks]
-
-        # 5) Select the best block: choose shortest error_block
-        best = min(chunk_summaries, key=lambda x: len(x["error_block"]))
+        # 5) Summarize chunks concurrently (LLM fallback); stop early once
+        #    a chunk pins down the root cause
+        if len(chunks) == 1 or self.max_workers <= 1:
+            results = []
+            for i, c in enumerate(chunks):
+                results.append((i, self._summarize_chunk(c)))
+                if self._is_conclusive(results[-1][1]):
+                    break
+        else:
+            results = []
+            pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)))
+            try:
+                # each worker runs in a copy of the caller's context so per-build metrics follow it
+                futures = {pool.submit(contextvars.copy_context().run, self._summarize_chunk, c): i
+                           for i, c in enumerate(chunks)}
+                for fut in as_completed(futures):
+                    try:
+                        summary = fut.result()
+                    except Exception as e:
+                        print(f"⚠️ Chunk {futures[fut]} summarization failed: {e}")
+                        continue
+                    results.append((futures[fut], summary))
+                    if self._is_conclusive(summary):
+                        break
+            finally:
+                # drop queued chunks; in-flight calls finish in the background
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        if not results:
+            return {
+                "error_summary": "Log summarization failed",
+                "error_block": filtered[-5000:]
+            }
 
+        # 6) Select the best block by rank
+        index, best = max(results, key=lambda r: self._rank(r[1], r[0]))
+        best.setdefault("error_block", "")
         return best
@@ -1,8 +1,10 @@
 # agents/runtime_runner.py
 import os
+import sys
 import time
-from groq import Groq
-from docker import from_env
+from utils.clients import docker_client, groq_client
+from utils.log_capture import LogCapture, spill_path_for
+from utils.project_root import detect_project_root as cached_project_root
 
 
 class RuntimeRunnerAgent:
@@ -12,8 +14,8 @@ class RuntimeRunnerAgent:
     """
 
     def __init__(self):
-        self.docker = from_env()
-        self.ai = Groq(api_key=None)  # will be set via env when used
+        self.docker = docker_client()
+        self.ai = groq_client("runtime_runner")
 
     def _static_runtime_cmd(self, stack):
         lang = stack.get("language", "").lower()
@@ -30,7 +32,7 @@ class RuntimeRunnerAgent:
         return None
 
     def _ai_runtime_cmd(self, stack):
-        ai = Groq(api_key=__import__("os").environ.get("GROQ_API_KEY"))
+        ai = self.ai
         prompt = f"Given this stack, return the single shell command to start the app in foreground:\n\n{stack}\n\nReturn only the command string."
         resp = ai.chat.completions.create(
             model=__import__("os").environ.get("GROQ_MODEL", "openai/gpt-oss-120b"),
@@ -48,10 +50,10 @@ class RuntimeRunnerAgent:
             return {"command": cmd, "need_clarification": False}
         return {"need_clarification": True, "question": f"Cannot determine runtime command for stack: {stack}. Please provide it."}
 
-    def _exec_stream_logs(self, container_id: str, project_root: str, command: str):
+    def _exec_stream_logs(self, container_id: str, project_root: str, command: str, kind: str = "runtime"):
         """
-        Streams logs line-by-line instead of capturing huge outputs into memory.
-        Returns the full log as a single string (but built incrementally).
+        Streams logs instead of capturing huge outputs into memory.
+        Returns (exit_code, LogCapture); see BuildRunnerAgent._exec_stream_logs.
         """
 
         container = self.docker.containers.get(container_id)
@@ -70,44 +72,27 @@ class RuntimeRunnerAgent:
 
         output_stream = self.docker.api.exec_start(exec_id, stream=True)
 
-        logs = []
+        if os.getenv("BUILD_LOG_CAPTURE", "bounded") == "full":
+            capture = LogCapture(head_lines=sys.maxsize)
+        else:
+            capture = LogCapture(spill_path=spill_path_for(container_id, kind))
 
-        for chunk in output_stream:
-            line = chunk.decode(errors="ignore")
-            # print(line, end="")   # optional real-time console streaming
-            logs.append(line)
+        try:
+            for chunk in output_stream:
+                # print(chunk.decode(errors="ignore"), end="")   # optional real-time console streaming
+                capture.feed(chunk)
+        finally:
+            capture.close()
 
         # Get exit code
         exit_code = self.docker.api.exec_inspect(exec_id)["ExitCode"]
 
-        return exit_code, "".join(logs)
+        return exit_code, capture
 
 
     def detect_project_root(self, container_id: str):
-        container = self.docker.containers.get(container_id)
-
-        # Look for common project types
-        search_patterns = [
-            "pom.xml",               # Maven
-            "build.gradle",          # Gradle
-            "package.json",          # Node
-            "pyproject.toml",        # Python
-            "requirements.txt",      # Python
-            "*.csproj",              # .NET
-        ]
-
-        for pattern in search_patterns:
-            cmd = f"bash -lc \"find /workspace -name '{pattern}' | head -n 1\""
-            ec, out = container.exec_run(cmd)
-            result = out.decode().strip()
-
-            if result:
-                # Strip filename → return folder containing it
-                project_root = os.path.dirname(result)
-                return project_root
-
-        # fallback → assume workspace root
-        return "/workspace"
+        # single pruned `find`, cached per container (utils/project_root.py)
+        return cached_project_root(self.docker, container_id)
 
     # def start_and_check(self, container_id: str, stack: dict, user_override_cmd: str = None):
     #     container = self.docker.containers.get(container_id)
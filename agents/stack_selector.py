@@ -1,7 +1,7 @@
 import os
 import json
 from typing import Optional, Dict
-from groq import Groq
+from utils.clients import groq_client
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -28,7 +28,7 @@ class StackSelectorAgent:
 
     def __init__(self):
         # Initialize Groq client using GROQ_API_KEY env variable
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = groq_client("stack_selector")
 
         # Instructions to the AI on what to output
         self.system_prompt = """
@@ -1,7 +1,7 @@
 # agents/testcase_generator.py
 import os
 import json
-from groq import Groq
+from utils.clients import groq_client
 
 
 class TestcaseGeneratorAgent:
@@ -13,7 +13,7 @@ class TestcaseGeneratorAgent:
     """
 
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = groq_client("testcase_generator")
 
         self.system_prompt = """
 You are an expert QA automation engineer.
@@ -1,11 +1,32 @@
-from fastapi import APIRouter, FastAPI
+import os
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from app.schemas import BuildRequest, BuildResponse
-from graph.build_graph import execute_build_graph
+from graph.build_graph import docker_agent, execute_build_graph
+from utils.blob_store import blob_store
+from utils import lifecycle, metrics
+from utils.job_queue import JobQueue
 from fastapi.middleware.cors import CORSMiddleware
 
 
 router = APIRouter()
 
+# inline: build inside the request (default); queue: enqueue for app/worker.py
+BUILD_EXECUTION = os.getenv("BUILD_EXECUTION", "inline").lower()
+_job_queue = None
+
+
+def job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
+
+
+# queued builds run in workers; the container reaper must not remove their containers
+if BUILD_EXECUTION == "queue":
+    lifecycle.register_activity_check(lambda build_id: job_queue().is_active(build_id))
+
 # ⚡ Enable CORS
 # -----------------------------------------
 
@@ -42,17 +63,28 @@ def apply_cors(app: FastAPI):
 
 @router.post("/build", response_model=BuildResponse)
 async def build_project(request: BuildRequest):
+    if BUILD_EXECUTION == "queue":
+        try:
+            job = job_queue().enqueue(request.model_dump(), build_id=request.build_id)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        # poll GET /builds/{build_id}
+        return BuildResponse(status="queued", details={**job, "position": job_queue().position(job["job_id"])})
+
     result = await execute_build_graph(
         prompt=request.prompt,
         clarification_answer=request.clarification_answer,
-        global_spec=request.global_spec
+        global_spec=request.global_spec,
+        build_id=request.build_id,
+        resume=request.resume,
+        resume_node=request.resume_node
     )
 
-    # Need clarification
+    # Need clarification; answer with the same build_id and resume=true
     if result.get("need_clarification"):
         return BuildResponse(
             status="need_clarification",
-            details={"question": result["question"]}
+            details={"question": result["question"], "build_id": result["build_id"], "metrics": result["metrics"]}
         )
 
     # Return EVERYTHING (stack + docker + boilerplate)
@@ -60,3 +92,52 @@ async def build_project(request: BuildRequest):
         status="build_complete",
         details=result  # instead of result["stack"]
     )
+
+
+# File bodies in build responses are {path, sha, size} refs; fetch them here
+@router.get("/blobs/{sha}", response_class=PlainTextResponse)
+async def get_blob(sha: str):
+    content = blob_store.get(sha)
+    if content is None:
+        raise HTTPException(status_code=404, detail="blob not found")
+    return content
+
+
+# Prometheus scrape target: node/LLM/Docker timings, tokens, bytes, fix-loop iterations
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Queued builds: status of the latest job for a build id (result once finished)
+@router.get("/builds/{build_id}", response_model=BuildResponse)
+async def get_build(build_id: str):
+    job = job_queue().latest_for_build(build_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="build not found")
+    details = {"build_id": build_id, "job_id": job["id"], "attempts": job["attempts"], "worker_id": job["worker_id"]}
+    if job["status"] == "queued":
+        details["position"] = job_queue().position(job["id"])
+    if job["status"] == "failed":
+        details["error"] = job["error"]
+    result = job["result"] or {}
+    if job["status"] == "need_clarification":
+        details.update({"question": result.get("question"), "metrics": result.get("metrics")})
+    elif job["status"] == "done":
+        return BuildResponse(status="build_complete", details=result)
+    return BuildResponse(status=job["status"], details=details)
+
+
+# Docker host utilisation: reserved vs usable cpus/memory, which profiles fit now
+@router.get("/capacity")
+async def get_capacity():
+    try:
+        return docker_agent.capacity()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"docker unavailable: {e}")
+
+
+# Workers alive, their capacity and job counts by status
+@router.get("/queue")
+async def get_queue():
+    return job_queue().stats()
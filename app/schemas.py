@@ -5,6 +5,10 @@ class BuildRequest(BaseModel):
     prompt: str
     clarification_answer: Optional[str] = None
     global_spec: Optional[str] = None
+    # resume an earlier build (crash or clarification) from its checkpoint
+    build_id: Optional[str] = None
+    resume: bool = False
+    resume_node: Optional[str] = None
 
 class BuildResponse(BaseModel):
     status: str
@@ -0,0 +1,174 @@
+# app/worker.py
+"""
+Build worker: consumes jobs from the SQLite queue (utils/job_queue.py) and
+runs them through graph/build_graph.py.
+
+    python -m app.worker                          # 1 process, 1 build at a time
+    python -m app.worker --processes 4 --concurrency 2
+
+Run API nodes with BUILD_EXECUTION=queue so /build enqueues instead of
+building in the request. Workers on any number of hosts can share the
+queue file and one Docker daemon pool (DOCKER_HOST). Each build holds one
+container, so --concurrency also caps the containers a worker process has
+in use, and a worker only claims a job while its Docker host can admit
+another build container (see utils/admission.py). Builds in one process share agent instances except those the
+graph registers per thread; prefer --processes to scale across cores.
+
+Every worker heartbeats its running jobs; if a worker dies, another one
+re-queues its jobs when the lease expires and resumes them from their
+graph checkpoint.
+
+Build containers are torn down when a build finishes; a failed attempt
+stops its container so the retry can restart it (utils/lifecycle.py).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from utils.job_queue import JobQueue, new_worker_id
+from utils import lifecycle
+
+# execute_build_graph keyword arguments a job payload may carry
+BUILD_ARGS = ("prompt", "clarification_answer", "global_spec", "build_id", "resume", "resume_node")
+
+
+class BuildWorker:
+    def __init__(self, queue: JobQueue = None, concurrency: int = None, poll_s: float = None,
+                 heartbeat_s: float = None, worker_id: str = None):
+        self.queue = queue or JobQueue()
+        self.concurrency = concurrency or int(os.getenv("BUILD_WORKER_CONCURRENCY", "1"))
+        self.poll_s = poll_s or float(os.getenv("BUILD_WORKER_POLL_S", "1"))
+        self.heartbeat_s = heartbeat_s or min(10.0, self.queue.lease_s / 3)
+        self.worker_id = worker_id or new_worker_id()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    # -----------------------------------------------------------
+    def _running_ids(self) -> list:
+        with self._lock:
+            return list(self._active)
+
+    def _heartbeat_loop(self):
+        while not self._stopping.wait(self.heartbeat_s):
+            try:
+                self.queue.heartbeat(self.worker_id, self._running_ids(), self.concurrency)
+                for job in self.queue.requeue_expired():
+                    print(f"♻️ Re-queued job {job['id']} from lost worker {job['worker_id']}")
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed: {e}")
+
+    def _host_has_room(self) -> bool:
+        """Leave jobs to other hosts while this Docker host cannot admit another build."""
+        from graph.build_graph import docker_agent
+        try:
+            return docker_agent.capacity()["can_admit"]["default"]
+        except Exception as e:
+            print(f"⚠️ Capacity check failed: {e}")
+            return True
+
+    def _run_job(self, job: dict):
+        from graph.build_graph import execute_build_graph  # heavy import stays out of the supervisor
+
+        payload = job["payload"]
+        kwargs = {k: payload[k] for k in BUILD_ARGS if k in payload}
+        # a retried job continues from its checkpoint
+        if job["attempts"] > 1:
+            kwargs["resume"] = True
+        print(f"🏗️ [{self.worker_id}] job {job['id']} (build {job['build_id']}, attempt {job['attempts']})")
+        try:
+            result = asyncio.run(execute_build_graph(**kwargs))
+            status = "need_clarification" if result.get("need_clarification") else "done"
+            if not self.queue.complete(job["id"], self.worker_id, result, status):
+                print(f"⚠️ Job {job['id']} finished after its lease was lost; result discarded")
+        except Exception as e:
+            outcome = self.queue.fail(job["id"], self.worker_id, f"{e}\n{traceback.format_exc()}")
+            print(f"❌ Job {job['id']} raised {e!r}; {outcome}")
+        finally:
+            with self._lock:
+                self._active.pop(job["id"], None)
+
+    def run(self):
+        print(f"👷 Worker {self.worker_id} started (concurrency {self.concurrency}, queue {self.queue.path})")
+        self.queue.heartbeat(self.worker_id, [], self.concurrency)
+        # the container reaper spares builds other workers are running or will retry
+        lifecycle.register_activity_check(self.queue.is_active)
+        threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True).start()
+
+        while not self._stopping.is_set():
+            with self._lock:
+                free = self.concurrency - len(self._active)
+            job = self.queue.claim(self.worker_id) if free > 0 and self._host_has_room() else None
+            if job is None:
+                self._stopping.wait(self.poll_s)
+                continue
+            t = threading.Thread(target=self._run_job, args=(job,), name=f"build-{job['id'][:8]}", daemon=True)
+            with self._lock:
+                self._active[job["id"]] = t
+            t.start()
+
+        # graceful stop: finish what is running (leases keep being extended until then)
+        for t in list(self._active.values()):
+            while t.is_alive():
+                self.queue.heartbeat(self.worker_id, self._running_ids(), self.concurrency)
+                t.join(self.heartbeat_s)
+        self.queue.unregister(self.worker_id)
+        print(f"👋 Worker {self.worker_id} stopped")
+
+    def stop(self, *_):
+        self._stopping.set()
+
+
+def _worker_main(concurrency: int):
+    worker = BuildWorker(concurrency=concurrency)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=int(os.getenv("BUILD_WORKER_PROCESSES", "1")))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BUILD_WORKER_CONCURRENCY", "1")),
+                        help="builds (and containers) in flight per process")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _worker_main(args.concurrency)
+        return 0
+
+    # spawn, not fork: each worker builds its own clients and DB connections
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker_main, args=(args.concurrency,), name=f"build-worker-{i}")
+             for i in range(args.processes)]
+    for p in procs:
+        p.start()
+
+    stopping = threading.Event()
+
+    def forward(signum, _frame):
+        stopping.set()
+        for p in procs:
+            if p.is_alive():
+                os.kill(p.pid, signum)
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    # restart a crashed process; its jobs are recovered through their leases
+    while any(p.is_alive() for p in procs):
+        time.sleep(1)
+        for i, p in enumerate(procs):
+            if not stopping.is_set() and not p.is_alive() and p.exitcode != 0:
+                print(f"⚠️ {p.name} exited with {p.exitcode}; restarting")
+                procs[i] = ctx.Process(target=_worker_main, args=(args.concurrency,), name=p.name)
+                procs[i].start()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
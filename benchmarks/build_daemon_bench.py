@@ -0,0 +1,74 @@
+# benchmarks/build_daemon_bench.py
+"""
+Compares fix-loop compile latency with and without a persistent build daemon.
+
+Runs the incremental "compile" stage N times against an already provisioned
+container (boilerplate loaded), touching one source file between iterations
+the way a fixer edit would:
+
+    python -m benchmarks.build_daemon_bench <container_id> --language java --iterations 5
+"""
+import argparse
+import statistics
+import time
+
+from agents.build_runner import BuildRunnerAgent
+
+
+def _touch_sources(runner, container_id, project_root):
+    runner._exec_in_dir(
+        container_id, project_root,
+        "f=$(find src -name '*.java' -o -name '*.kt' | head -n 1); test -n \\\"$f\\\" && touch \\\"$f\\\""
+    )
+
+
+def run_mode(runner, container_id, stack, project_root, iterations, use_daemon):
+    if use_daemon:
+        if runner.start_daemon(container_id, stack) is None:
+            return None
+        time.sleep(5)  # let the warm-up finish, as it would while planning runs
+    else:
+        runner._daemons[container_id] = None
+
+    cmd = runner._static_build_command(stack, stage="compile", offline=runner._can_go_offline(container_id, stack))
+    timings = []
+    for i in range(iterations):
+        _touch_sources(runner, container_id, project_root)
+        started = time.time()
+        exit_code, _ = runner._exec_stream_logs(container_id, project_root, runner._with_daemon(container_id, cmd))
+        timings.append(time.time() - started)
+        print(f"  {'daemon' if use_daemon else 'plain '} #{i + 1}: {timings[-1]:.2f}s (exit {exit_code})")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("container_id")
+    parser.add_argument("--language", default="java")
+    parser.add_argument("--build-tool", default="maven")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    runner = BuildRunnerAgent()
+    stack = {"language": args.language, "build_tool": args.build_tool}
+    project_root = runner.detect_project_root(args.container_id)
+
+    results = {}
+    for mode, use_daemon in (("plain", False), ("daemon", True)):
+        print(f"▶️ {mode}")
+        timings = run_mode(runner, args.container_id, stack, project_root, args.iterations, use_daemon)
+        if timings:
+            results[mode] = timings
+
+    print("\nmode     first    median   mean")
+    for mode, t in results.items():
+        print(f"{mode:<8} {t[0]:>6.2f}s  {statistics.median(t):>6.2f}s  {statistics.mean(t):>6.2f}s")
+    if "plain" in results and "daemon" in results:
+        speedup = statistics.median(results["plain"]) / max(statistics.median(results["daemon"]), 1e-6)
+        print(f"\nmedian speed-up with daemon: {speedup:.2f}x")
+    elif "daemon" not in results:
+        print("\nno daemon binary in this image; only plain timings collected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# benchmarks/fake_docker.py
+"""
+In-process stand-in for the docker SDK client, backed by a temp directory.
+
+Container paths are mapped onto the host (/workspace -> <root>/<name>/workspace,
+/opt/sb-cache -> <root>/cache, /root/.m2 -> <root>/<name>/m2) and ordinary
+commands (find, cat, grep, mkdir, tail, ...) run through the host's bash.
+Toolchain commands are scripted by the scenario instead, in rule order:
+
+    {"match": "spring-boot:run", "write": {"runtime.log": "...Started..."}}
+    {"match": "&&\\s*(\\./)?(mvnw?|mvnd)\\s", "seconds": 1.5,
+     "sequence": [{"exit_code": 1, "output": "[ERROR] ..."}, {"exit_code": 0, "output": "BUILD SUCCESS"}]}
+
+"sequence" entries are consumed per call (the last one repeats); "write"
+files are created relative to the command's `cd` directory.
+
+Install before the agents are imported:
+
+    docker.from_env = lambda *a, **k: client
+"""
+import io
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import threading
+import time
+import uuid
+from collections import namedtuple
+import docker
+
+ExecResult = namedtuple("ExecResult", "exit_code output")
+CD_RE = re.compile(r"cd\s+(\S+)\s*&&")
+
+
+class _Image:
+    def __init__(self, name):
+        self.tags = [name]
+        self.id = f"sha256:{uuid.uuid5(uuid.NAMESPACE_URL, name).hex}"
+
+
+class FakeContainer:
+    def __init__(self, client, name, image, labels=None):
+        self.client = client
+        self.id = uuid.uuid4().hex + uuid.uuid4().hex[:32]
+        self.name = name
+        self.image = image
+        self.labels = dict(labels or {})
+        self.status = "running"
+        self.dir = os.path.join(client.root, name)
+        os.makedirs(os.path.join(self.dir, "workspace"), exist_ok=True)
+
+    @property
+    def attrs(self):
+        return {"Id": self.id, "Name": self.name, "Config": {"Labels": self.labels}, "State": {"Status": self.status}}
+
+    # ----------------------------------------------------------
+    # path mapping
+    # ----------------------------------------------------------
+    def _mappings(self):
+        return [
+            ("/workspace", os.path.join(self.dir, "workspace")),
+            ("/opt/sb-cache", os.path.join(self.client.root, "cache")),
+            ("/root/.m2", os.path.join(self.dir, "m2")),
+        ]
+
+    def to_host(self, text: str) -> str:
+        for inner, host in self._mappings():
+            text = text.replace(inner, host)
+        return text
+
+    def to_container(self, text: str) -> str:
+        for inner, host in self._mappings():
+            text = text.replace(host, inner)
+        return text
+
+    # ----------------------------------------------------------
+    # exec
+    # ----------------------------------------------------------
+    def _run(self, cmd) -> ExecResult:
+        cmd = " ".join(cmd) if isinstance(cmd, (list, tuple)) else cmd
+        stats = self.client.stats
+        stats["exec_calls"] += 1
+
+        rule = self.client.match(cmd)
+        if rule is not None:
+            stats["scripted_execs"] += 1
+            if rule.get("seconds"):
+                time.sleep(rule["seconds"])
+            m = CD_RE.search(cmd)
+            cwd = self.to_host(m.group(1)) if m else os.path.join(self.dir, "workspace")
+            for rel, content in (rule.get("write") or {}).items():
+                path = os.path.join(cwd, rel)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(content)
+            step = self.client.next_step(rule)
+            out = step.get("output", "").encode("utf-8")
+            stats["bytes_from_container"] += len(out)
+            return ExecResult(step.get("exit_code", 0), out)
+
+        # no login shell: the host's profile is not the image's
+        host_cmd = self.to_host(cmd).replace("bash -lc ", "bash -c ")
+        proc = subprocess.run(["bash", "-c", host_cmd], capture_output=True,
+                              cwd=os.path.join(self.dir, "workspace"))
+        out = self.to_container((proc.stdout + proc.stderr).decode("utf-8", errors="ignore")).encode("utf-8")
+        stats["bytes_from_container"] += len(out)
+        return ExecResult(proc.returncode, out)
+
+    def exec_run(self, cmd, detach=False, **kwargs):
+        result = self._run(cmd)
+        return ExecResult(None, b"") if detach else result
+
+    def put_archive(self, path, data):
+        data = data.getvalue() if hasattr(data, "getvalue") else data
+        self.client.stats["put_archive_calls"] += 1
+        self.client.stats["bytes_to_container"] += len(data)
+        target = self.to_host(path)
+        os.makedirs(target, exist_ok=True)
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            for member in tar.getmembers():
+                self._extract(tar, member, target)
+        return True
+
+    @staticmethod
+    def _extract(tar, member, target):
+        # like the daemon: a later entry replaces an existing path of another type
+        dest = os.path.join(target, member.name)
+        parent = os.path.dirname(dest)
+        while parent != target and not os.path.isdir(parent):
+            if os.path.lexists(parent):
+                os.remove(parent)
+                break
+            parent = os.path.dirname(parent)
+        if member.isdir():
+            if os.path.lexists(dest) and not os.path.isdir(dest):
+                os.remove(dest)
+            os.makedirs(dest, exist_ok=True)
+            return
+        if os.path.isdir(dest):
+            shutil.rmtree(dest)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "wb") as f:
+            f.write(tar.extractfile(member).read() if member.size else b"")
+        os.chmod(dest, member.mode or 0o644)
+
+    def get_archive(self, path):
+        host = self.to_host(path)
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            tar.add(host, arcname=os.path.basename(host.rstrip("/")))
+        data = buf.getvalue()
+        self.client.stats["bytes_from_container"] += len(data)
+        return iter([data]), {"name": os.path.basename(path)}
+
+    def start(self):
+        self.status = "running"
+
+    def stop(self, **kwargs):
+        self.status = "exited"
+
+    def remove(self, force=False, **kwargs):
+        self.client.containers._items.pop(self.id, None)
+
+    def reload(self):
+        pass
+
+
+class _Containers:
+    def __init__(self, client):
+        self.client = client
+        self._items = {}
+
+    def run(self, image, name=None, labels=None, **kwargs):
+        c = FakeContainer(self.client, name or f"fake_{uuid.uuid4().hex[:10]}", image, labels)
+        self._items[c.id] = c
+        self.client.stats["containers_created"] += 1
+        return c
+
+    def get(self, key):
+        for c in self._items.values():
+            if c.id == key or c.id.startswith(key) or c.name == key:
+                return c
+        raise docker.errors.NotFound(f"No such container: {key}")
+
+    def list(self, all=False, filters=None):
+        items = list(self._items.values())
+        labels = (filters or {}).get("label") or []
+        for label in [labels] if isinstance(labels, str) else labels:
+            key, _, value = label.partition("=")
+            items = [c for c in items if key in c.labels and (not value or c.labels[key] == value)]
+        return items if all else [c for c in items if c.status == "running"]
+
+
+class _Images:
+    def get(self, name):
+        return _Image(name)
+
+
+class _Volumes:
+    def __init__(self):
+        self._items = {}
+
+    def get(self, name):
+        if name not in self._items:
+            raise docker.errors.NotFound(f"No such volume: {name}")
+        return self._items[name]
+
+    def create(self, name, **kwargs):
+        self._items[name] = type("Volume", (), {"name": name, "attrs": kwargs})()
+        return self._items[name]
+
+
+class _Api:
+    """Low-level exec API used for streamed build/runtime output."""
+    def __init__(self, client):
+        self.client = client
+        self._execs = {}
+
+    def exec_create(self, container_id, cmd, **kwargs):
+        exec_id = uuid.uuid4().hex
+        self._execs[exec_id] = {"container": self.client.containers.get(container_id), "cmd": cmd, "exit": None}
+        return {"Id": exec_id}
+
+    def exec_start(self, exec_id, stream=False, **kwargs):
+        ex = self._execs[exec_id]
+        result = ex["container"]._run(ex["cmd"])
+        ex["exit"] = result.exit_code
+        if not stream:
+            return result.output
+        return (result.output[i:i + 8192] for i in range(0, len(result.output), 8192))
+
+    def exec_inspect(self, exec_id):
+        return {"ExitCode": self._execs[exec_id]["exit"]}
+
+
+class FakeDockerClient:
+    def __init__(self, root: str, commands: list = None):
+        self.root = root
+        self.rules = [dict(r, hits=0, _re=re.compile(r["match"])) for r in commands or []]
+        self.stats = {"exec_calls": 0, "scripted_execs": 0, "put_archive_calls": 0,
+                      "bytes_to_container": 0, "bytes_from_container": 0, "containers_created": 0}
+        self._lock = threading.Lock()
+        self.containers = _Containers(self)
+        self.images = _Images()
+        self.volumes = _Volumes()
+        self.api = _Api(self)
+
+    def match(self, cmd: str):
+        return next((r for r in self.rules if r["_re"].search(cmd)), None)
+
+    def next_step(self, rule: dict) -> dict:
+        with self._lock:
+            seq = rule.get("sequence") or [{"exit_code": rule.get("exit_code", 0), "output": rule.get("output", "")}]
+            step = seq[min(rule["hits"], len(seq) - 1)]
+            rule["hits"] += 1
+        return step
+
+    def info(self):
+        return {"NCPU": os.cpu_count() or 1,
+                "MemTotal": os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")}
+
+    def close(self):
+        pass
@@ -0,0 +1,114 @@
+# benchmarks/fake_groq.py
+"""
+Local OpenAI/Groq-compatible chat-completions server for offline benchmarks.
+
+Replays recorded responses from a scenario. Each rule is matched against the
+concatenated message contents of a request:
+
+    {"match": "expert software architect", "response": {...} | "text"}
+    {"match": "fixes build/runtime errors", "responses": [first, second, ...]}
+
+"responses" are consumed in order (the last one repeats). Latency is
+simulated as `latency_ms + completion_tokens / tokens_per_s`.
+
+The Groq SDK honours GROQ_BASE_URL, so agents need no changes:
+
+    server = FakeGroqServer(scenario["llm"]).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+class FakeGroqServer:
+    def __init__(self, rules: list, latency_ms: float = 0.0, tokens_per_s: float = 0.0, default: str = "{}"):
+        self.rules = [dict(r, hits=0) for r in rules]
+        self.latency_ms = latency_ms
+        self.tokens_per_s = tokens_per_s
+        self.default = default
+        self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0, "prompt_tokens": 0,
+                      "completion_tokens": 0, "simulated_latency_s": 0.0, "unmatched": 0}
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _respond(self, text: str) -> str:
+        with self._lock:
+            for rule in self.rules:
+                if rule["match"] in text:
+                    seq = rule.get("responses") or [rule.get("response")]
+                    reply = seq[min(rule["hits"], len(seq) - 1)]
+                    rule["hits"] += 1
+                    return reply if isinstance(reply, str) else json.dumps(reply)
+            self.stats["unmatched"] += 1
+        return self.default
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                req = json.loads(body or b"{}")
+                text = "\n".join(str(m.get("content", "")) for m in req.get("messages", []))
+                content = server._respond(text)
+                prompt_tokens, completion_tokens = approx_tokens(text), approx_tokens(content)
+
+                delay = server.latency_ms / 1000.0
+                if server.tokens_per_s:
+                    delay += completion_tokens / server.tokens_per_s
+                if delay:
+                    time.sleep(delay)
+
+                payload = json.dumps({
+                    "id": f"chatcmpl-fake-{time.time_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": req.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                }).encode("utf-8")
+                with server._lock:
+                    s = server.stats
+                    s["requests"] += 1
+                    s["bytes_in"] += len(body)
+                    s["bytes_out"] += len(payload)
+                    s["prompt_tokens"] += prompt_tokens
+                    s["completion_tokens"] += completion_tokens
+                    s["simulated_latency_s"] += delay
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
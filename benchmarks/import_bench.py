@@ -0,0 +1,163 @@
+# benchmarks/import_bench.py
+"""
+Startup cost of the service: how long `import app.main` takes in a fresh
+interpreter, and which modules it pulls in.
+
+    python -m benchmarks.import_bench
+    python -m benchmarks.import_bench --module graph.build_graph --runs 10
+    python -m benchmarks.import_bench --update-baseline
+
+Each run is a new process with Docker unreachable and no Groq key, so an
+agent or client built at import time fails the run. Modules listed in
+DEFERRED (heavy SDKs that agents load on first use) must not be imported
+at startup. The median is compared against benchmarks/baselines/import_<module>.json;
+exit code 1 on a regression beyond --tolerance or a deferred import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(REPO_ROOT, "benchmarks", "baselines")
+
+# must stay out of startup: imported by agents/clients when first used
+DEFERRED = ["sklearn", "scipy", "docker", "groq"]
+ABSOLUTE_FLOOR_S = 0.05
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _env() -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    env["DOCKER_HOST"] = "unix:///nonexistent/docker.sock"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def run_once(module: str) -> dict:
+    proc = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=REPO_ROOT,
+                          env=_env(), capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+LOCAL_PACKAGES = ("app", "graph", "agents", "utils", "constants", "SolutionWriteModel")
+
+
+def top_imports(module: str, limit: int = 15) -> list:
+    """
+    Third-party imports pulled in by the probed module, by cumulative time
+    (python -X importtime). Repo modules are expanded, so each row is the
+    external package a repo module imported.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO_ROOT,
+                          env=_env(), capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2  # nested imports are indented two spaces per level
+        rows.append((name.strip(), int(cumulative_us), depth))
+
+    # importtime prints children before their parent: rebuild the tree bottom-up
+    children, stack = {}, []
+    for i, (name, _, depth) in enumerate(rows):
+        kids = []
+        while stack and rows[stack[-1]][2] > depth:
+            kids.append(stack.pop())
+        children[i] = kids
+        stack.append(i)
+    roots = [i for i, r in enumerate(rows) if r[0] == module]
+    out, todo = [], list(roots)
+    while todo:
+        i = todo.pop()
+        for k in children[i]:
+            if rows[k][0].split(".")[0] in LOCAL_PACKAGES:
+                todo.append(k)
+            else:
+                out.append(rows[k])
+    out.sort(key=lambda r: -r[1])
+    return [{"module": n, "ms": round(us / 1000, 1)} for n, us, _ in out[:limit]]
+
+
+def measure(module: str, runs: int) -> dict:
+    samples = [run_once(module) for _ in range(runs)]
+    modules = samples[-1]["modules"]
+    leaked = sorted({m.split(".")[0] for m in modules if m.split(".")[0] in DEFERRED})
+    seconds = sorted(s["seconds"] for s in samples)
+    return {
+        "module": module,
+        "runs": runs,
+        "median_s": round(statistics.median(seconds), 3),
+        "min_s": round(seconds[0], 3),
+        "max_s": round(seconds[-1], 3),
+        "module_count": len(modules),
+        "deferred_imported": leaked,
+        "top_imports": top_imports(module),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = measure(args.module, args.runs)
+    print(f"\nimport {report['module']}: median={report['median_s']:.3f}s "
+          f"(min {report['min_s']:.3f}s, max {report['max_s']:.3f}s, {report['runs']} runs), "
+          f"{report['module_count']} modules")
+    print("\nlargest imports                          ms")
+    for row in report["top_imports"]:
+        print(f"{row['module']:<38} {row['ms']:>6}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if report["deferred_imported"]:
+        print(f"\n❌ Imported at startup (should load on first use): {', '.join(report['deferred_imported'])}")
+        failed = True
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"import_{args.module.replace('.', '_')}.json")
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📌 Baseline written to {baseline_path}")
+        return 1 if failed else 0
+    if not os.path.exists(baseline_path):
+        print(f"\nℹ️ No baseline at {baseline_path}; run with --update-baseline to record one")
+        return 1 if failed else 0
+
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base, cur = baseline["median_s"], report["median_s"]
+    delta = (cur - base) / base if base else 0.0
+    print(f"\nmedian import: baseline {base:.3f}s, current {cur:.3f}s ({delta:+.1%})")
+    if cur > base * (1 + args.tolerance) and cur - base > ABSOLUTE_FLOOR_S:
+        print(f"❌ Startup regressed beyond {args.tolerance:.0%}")
+        failed = True
+    if not failed:
+        print("✅ Within tolerance of baseline")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# benchmarks/pipeline_bench.py
+"""
+Offline end-to-end benchmark of graph/build_graph.py.
+
+Runs the real pipeline against a fake Groq server (benchmarks/fake_groq.py)
+and an in-process Docker stand-in (benchmarks/fake_docker.py) driven by a
+recorded scenario, then reports per-node wall time, LLM/Docker round-trips,
+bytes moved and peak memory:
+
+    python -m benchmarks.pipeline_bench --scenario benchmarks/scenarios/java_crud.json
+    python -m benchmarks.pipeline_bench --llm-latency-ms 800 --tokens-per-s 300
+    python -m benchmarks.pipeline_bench --update-baseline
+
+Results are compared against benchmarks/baselines/<scenario>.json; the exit
+code is 1 when a metric regresses by more than --tolerance.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(REPO_ROOT, "benchmarks", "baselines")
+
+# metrics compared against the baseline: (path, kind)
+#   time/memory → relative tolerance plus a small absolute floor
+#   count       → relative tolerance (deterministic for a scenario)
+COMPARED = [
+    ("wall_s", "time"),
+    ("llm.requests", "count"),
+    ("llm.prompt_tokens", "count"),
+    ("llm.completion_tokens", "count"),
+    ("llm.bytes_in", "count"),
+    ("docker.exec_calls", "count"),
+    ("docker.put_archive_calls", "count"),
+    ("docker.bytes_to_container", "count"),
+    ("docker.bytes_from_container", "count"),
+    ("memory.peak_traced_mb", "memory"),
+]
+ABSOLUTE_FLOOR = {"time": 0.05, "memory": 2.0, "count": 0}
+
+
+def _get(report: dict, path: str):
+    cur = report
+    for key in path.split("."):
+        if not isinstance(cur, dict) or key not in cur:
+            return None
+        cur = cur[key]
+    return cur
+
+
+def _timed(fn, name, stats):
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(state, *args, **kwargs)
+        finally:
+            entry = stats.setdefault(name, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += time.perf_counter() - started
+    return wrapper
+
+
+def run_scenario(scenario: dict, latency_ms: float, tokens_per_s: float, trace_malloc: bool) -> dict:
+    work = tempfile.mkdtemp(prefix="sb-bench-")
+    cwd = os.getcwd()
+    try:
+        # relative template paths resolve from the working dir; prompt/log dumps land in `work`
+        os.symlink(os.path.join(REPO_ROOT, "boilerplates"), os.path.join(work, "boilerplates"))
+        os.chdir(work)
+        sys.path.insert(0, REPO_ROOT)
+
+        from benchmarks.fake_groq import FakeGroqServer
+        from benchmarks.fake_docker import FakeDockerClient
+
+        server = FakeGroqServer(scenario["llm"], latency_ms=latency_ms, tokens_per_s=tokens_per_s).start()
+        os.environ.update({
+            "GROQ_API_KEY": "fake",
+            "GROQ_BASE_URL": server.base_url,
+            "SOLUTION_BUILDER_VAR_DIR": os.path.join(work, "var"),
+        })
+
+        import docker
+        fake = FakeDockerClient(os.path.join(work, "docker"), scenario.get("commands"))
+        docker.from_env = lambda *a, **k: fake
+
+        if trace_malloc:
+            tracemalloc.start()
+        started = time.perf_counter()
+        import graph.build_graph as bg
+        import_s = time.perf_counter() - started
+
+        node_stats = {}
+        for name in bg.create_graph().get_graph().nodes:
+            fn = getattr(bg, name, None)
+            if callable(fn):
+                setattr(bg, name, _timed(fn, name, node_stats))
+
+        started = time.perf_counter()
+        result = asyncio.run(bg.execute_build_graph(prompt=scenario["prompt"]))
+        wall_s = time.perf_counter() - started
+
+        peak = tracemalloc.get_traced_memory()[1] if trace_malloc else 0
+        if trace_malloc:
+            tracemalloc.stop()
+        server.stop()
+        # drain the background capture writer before the work dir goes away
+        from utils.capture import capture_sink
+        capture_sink.close()
+        capture_dir = os.path.join(work, "var", "capture")
+        capture_bytes = sum(os.path.getsize(os.path.join(capture_dir, f)) for f in os.listdir(capture_dir)) \
+            if os.path.isdir(capture_dir) else 0
+
+        final = result.get("final_build_result") or result.get("build_result") or {}
+        return {
+            "scenario": scenario.get("name"),
+            "llm_latency_ms": latency_ms,
+            "tokens_per_s": tokens_per_s,
+            "success": bool(final.get("success")) and bool((result.get("runtime_result") or {}).get("success")),
+            "fix_iterations": (result.get("fix_loop") or {}).get("iteration", 0),
+            "wall_s": round(wall_s, 3),
+            "import_s": round(import_s, 3),
+            "nodes": {k: {"calls": v["calls"], "seconds": round(v["seconds"], 3)} for k, v in node_stats.items()},
+            "llm": {k: round(v, 3) if isinstance(v, float) else v for k, v in server.stats.items()},
+            "docker": dict(fake.stats),
+            # the pipeline's own per-build rollup (utils/metrics.py), for cross-checking the fakes
+            "build_metrics": result.get("metrics"),
+            "capture_bytes": capture_bytes,
+            "memory": {
+                "peak_traced_mb": round(peak / 1e6, 2),
+                "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            },
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    rows = []
+    for path, kind in COMPARED + [(f"nodes.{n}.seconds", "time") for n in sorted(report.get("nodes", {}))]:
+        cur, base = _get(report, path), _get(baseline, path)
+        if cur is None or base is None:
+            continue
+        delta = (cur - base) / base if base else (0.0 if cur == base else float("inf"))
+        regressed = cur > base * (1 + tolerance) and cur - base > ABSOLUTE_FLOOR[kind]
+        rows.append((path, base, cur, delta, regressed))
+    return rows
+
+
+def print_report(report: dict):
+    print(f"\nscenario {report['scenario']}: success={report['success']} "
+          f"fix_iterations={report['fix_iterations']} wall={report['wall_s']:.2f}s import={report['import_s']:.2f}s")
+    print("\nnode                      calls   seconds")
+    for name, n in sorted(report["nodes"].items(), key=lambda kv: -kv[1]["seconds"]):
+        print(f"{name:<25} {n['calls']:>5}   {n['seconds']:>7.3f}")
+    llm, dk, mem = report["llm"], report["docker"], report["memory"]
+    print(f"\nllm     requests={llm['requests']} prompt_tokens={llm['prompt_tokens']} "
+          f"completion_tokens={llm['completion_tokens']} bytes_in={llm['bytes_in']} bytes_out={llm['bytes_out']} "
+          f"unmatched={llm['unmatched']}")
+    print(f"docker  execs={dk['exec_calls']} (scripted {dk['scripted_execs']}) put_archive={dk['put_archive_calls']} "
+          f"bytes_to={dk['bytes_to_container']} bytes_from={dk['bytes_from_container']}")
+    print(f"memory  peak_traced={mem['peak_traced_mb']}MB max_rss={mem['max_rss_mb']}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default=os.path.join(REPO_ROOT, "benchmarks", "scenarios", "java_crud.json"))
+    parser.add_argument("--llm-latency-ms", type=float, default=None)
+    parser.add_argument("--tokens-per-s", type=float, default=None)
+    parser.add_argument("--no-trace-malloc", action="store_true", help="skip tracemalloc (lower overhead, no peak)")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    with open(args.scenario, encoding="utf-8") as f:
+        scenario = json.load(f)
+    latency = args.llm_latency_ms if args.llm_latency_ms is not None else scenario.get("llm_latency_ms", 0)
+    tps = args.tokens_per_s if args.tokens_per_s is not None else scenario.get("tokens_per_s", 0)
+
+    report = run_scenario(scenario, latency, tps, trace_malloc=not args.no_trace_malloc)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{scenario['name']}.json")
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📌 Baseline written to {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"\nℹ️ No baseline at {baseline_path}; run with --update-baseline to record one")
+        return 0
+
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.tolerance)
+    print(f"\nmetric                                   baseline       current     delta")
+    for path, base, cur, delta, regressed in rows:
+        flag = "  ❌" if regressed else ""
+        print(f"{path:<38} {base:>11} {cur:>13} {delta:>+8.1%}{flag}")
+    regressions = [r for r in rows if r[4]]
+    if regressions or not report["success"]:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}"
+              + ("" if report["success"] else "; scenario did not succeed"))
+        return 1
+    print("\n✅ Within tolerance of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+# constants/resources.py
+# Per-language container resource profiles used by DockerAgent and the
+# admission controller (utils/admission.py). Sized for the stack each
+# image runs during a build: Java = Maven/mvnd + MariaDB + Spring Boot.
+#
+# Override or extend with RESOURCE_PROFILES (JSON), e.g.
+#   RESOURCE_PROFILES='{"java": {"cpus": 4, "memory_mb": 6144}}'
+import json
+import os
+
+RESOURCE_PROFILES = {
+    "java":    {"cpus": 2.0, "memory_mb": 3072, "pids": 2048, "tmp_mb": 1024, "build_dir": "target"},
+    "node":    {"cpus": 1.0, "memory_mb": 1536, "pids": 1024, "tmp_mb": 512, "build_dir": "dist"},
+    "python":  {"cpus": 1.0, "memory_mb": 1024, "pids": 512, "tmp_mb": 512},
+    "dotnet":  {"cpus": 2.0, "memory_mb": 2048, "pids": 1024, "tmp_mb": 1024, "build_dir": "bin"},
+    "default": {"cpus": 1.0, "memory_mb": 1024, "pids": 1024, "tmp_mb": 512},
+}
+
+try:
+    for _lang, _overrides in json.loads(os.getenv("RESOURCE_PROFILES", "{}")).items():
+        RESOURCE_PROFILES[_lang] = {**RESOURCE_PROFILES.get(_lang, RESOURCE_PROFILES["default"]), **_overrides}
+except ValueError:
+    print("⚠️ RESOURCE_PROFILES is not valid JSON; using built-in profiles")
+
+
+def profile_for(language: str) -> dict:
+    return dict(RESOURCE_PROFILES.get((language or "").lower(), RESOURCE_PROFILES["default"]))
@@ -0,0 +1,8 @@
+# constants/storage.py
+# Host-side working data (spilled logs, caches, ...). Relative to the
+# process working directory unless SOLUTION_BUILDER_VAR_DIR is set.
+import os
+
+VAR_DIR = os.getenv("SOLUTION_BUILDER_VAR_DIR", ".solution_builder")
+
+LOG_DIR = os.path.join(VAR_DIR, "logs")
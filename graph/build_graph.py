@@ -306,29 +306,28 @@
 #     }
 
 # graph/build_graph.py
+import uuid
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Optional, Dict, Any
 from constants.protection import PROTECTED_DIRS, PROTECTED_FILES
 
-# core agents (assumed implemented in repo)
-from agents.stack_selector import StackSelectorAgent
-from agents.docker_agent import DockerAgent
-from agents.boilerplate_generator import BoilerplateGeneratorAgent
-from agents.file_scanner import FileScannerAgent
-from agents.file_planner import FilePlannerAgent
-from agents.code_writer_agent import CodeWriterAgent
-from agents.error_fixer import ErrorFixerAgent
-from agents.log_summarizer import LogSummarizerAgent
-
-# new agents
-from agents.build_runner import BuildRunnerAgent
-from agents.runtime_runner import RuntimeRunnerAgent
-from agents.testcase_generator import TestcaseGeneratorAgent
-
 from utils.docker_file_writer import write_files_in_container
 from utils.docker_zip_loader import load_zip_into_container
+from utils.fix_loop import FixLoopController, error_fingerprint
+from utils.fix_memory import with_workspace_paths
+from utils.fix_context import build_fix_context
+from utils.blob_store import blob_store
+from utils.checkpoints import get_checkpointer
+from utils import lifecycle, metrics, tracing
+from utils.metrics import timed_node
+from utils.registry import registry
+from utils.admission import LANGUAGE_LABEL
 
 class BuildState(TypedDict, total=False):
+    build_id: Optional[str]
+    resume_node: Optional[str]
+    clarification_node: Optional[str]
+
     prompt: str
     clarification_answer: Optional[str]
     global_spec: Optional[str]
@@ -348,6 +347,8 @@ class BuildState(TypedDict, total=False):
 
     build_result: Optional[Dict[str, Any]]
     build_command_override: Optional[str]
+    final_build_result: Optional[Dict[str, Any]]
+    changed_paths: Optional[Any]
 
     runtime_result: Optional[Dict[str, Any]]
     runtime_command_override: Optional[str]
@@ -356,19 +357,50 @@ class BuildState(TypedDict, total=False):
 
     error_summary: Optional[str]
     error_block: Optional[str]
-
-# initialize agents
-stack_agent = StackSelectorAgent()
-docker_agent = DockerAgent()
-boiler_agent = BoilerplateGeneratorAgent()
-scanner_agent = FileScannerAgent()
-planner_agent = FilePlannerAgent()
-writer_agent = CodeWriterAgent()
-fixer_agent = ErrorFixerAgent()
-summ_agent = LogSummarizerAgent()
-build_runner = BuildRunnerAgent()
-runtime_runner = RuntimeRunnerAgent()
-testcase_gen = TestcaseGeneratorAgent()
+    parsed_errors: Optional[Any]
+    fix_loop: Optional[Dict[str, Any]]
+    fix_memory_pending: Optional[Any]
+    teardown: Optional[Dict[str, Any]]
+
+# agents: built on first use (no Docker/Groq clients or sklearn at import time);
+# override with registry.override(name, instance) before a build
+AGENT_FACTORIES = {
+    "stack_agent": "agents.stack_selector:StackSelectorAgent",
+    "docker_agent": "agents.docker_agent:DockerAgent",
+    "boiler_agent": "agents.boilerplate_generator:BoilerplateGeneratorAgent",
+    "scanner_agent": "agents.file_scanner:FileScannerAgent",
+    "planner_agent": "agents.file_planner:FilePlannerAgent",
+    "writer_agent": "agents.code_writer_agent:CodeWriterAgent",
+    "fixer_agent": "agents.error_fixer:ErrorFixerAgent",
+    "summ_agent": "agents.log_summarizer:LogSummarizerAgent",
+    "build_runner": "agents.build_runner:BuildRunnerAgent",
+    "runtime_runner": "agents.runtime_runner:RuntimeRunnerAgent",
+    "testcase_gen": "agents.testcase_generator:TestcaseGeneratorAgent",
+}
+# instances that keep per-build state (project index, global summary)
+PER_THREAD_AGENTS = {"writer_agent"}
+for _name, _factory in AGENT_FACTORIES.items():
+    registry.register(_name, _factory, per_thread=_name in PER_THREAD_AGENTS)
+
+stack_agent = registry.lazy("stack_agent")
+docker_agent = registry.lazy("docker_agent")
+boiler_agent = registry.lazy("boiler_agent")
+scanner_agent = registry.lazy("scanner_agent")
+planner_agent = registry.lazy("planner_agent")
+writer_agent = registry.lazy("writer_agent")
+fixer_agent = registry.lazy("fixer_agent")
+summ_agent = registry.lazy("summ_agent")
+build_runner = registry.lazy("build_runner")
+runtime_runner = registry.lazy("runtime_runner")
+testcase_gen = registry.lazy("testcase_gen")
+fix_loop_controller = FixLoopController()
+
+# ---------- helpers ----------
+def _refresh_copies(files: list, written: list) -> list:
+    """Keeps host-side file refs in sync with what was written, so later patches apply."""
+    latest = {e["path"]: e for e in blob_store.refs(written) if e.get("sha")}
+    return [{**f, "sha": latest[f["path"]]["sha"], "size": latest[f["path"]]["size"]}
+            if f.get("path") in latest else f for f in files or []]
 
 # ---------- nodes ----------
 def select_stack(state: BuildState) -> BuildState:
@@ -376,7 +408,7 @@ def select_stack(state: BuildState) -> BuildState:
     prompt = state.get("global_spec") or state.get("prompt")
     result = stack_agent.analyze_prompt(prompt, clarification_answer=state.get("clarification_answer"))
     if result.get("need_clarification"):
-        return {**state, "need_clarification": True, "question": result.get("question")}
+        return {**state, "need_clarification": True, "question": result.get("question"), "clarification_node": "select_stack"}
     stack = {
         "language": result["language"],
         "framework": result["framework"],
@@ -391,8 +423,10 @@ def select_stack(state: BuildState) -> BuildState:
 def setup_docker(state: BuildState) -> BuildState:
     print("Setting up Docker environment...")
     stack = state["stack"]
-    docker_env = docker_agent.create_environment(stack=stack)
+    docker_env = docker_agent.create_environment(stack=stack, build_id=state.get("build_id"))
     docker_info = {"container_id": docker_env["container_id"], "container_name": docker_env["container_name"], "workspace": docker_env["workspace"], "image": docker_env["image"]}
+    # warm mvnd / gradle daemon while boilerplate + planning run
+    docker_info["build_daemon"] = build_runner.start_daemon(docker_env["container_id"], stack)
     return {**state, "docker": docker_info}
 
 def generate_boilerplate(state: BuildState) -> BuildState:
@@ -409,7 +443,8 @@ def generate_boilerplate(state: BuildState) -> BuildState:
 def scan_initial_files(state: BuildState) -> BuildState:
     print("Scanning initial project files...")
     scan = scanner_agent.scan(container_id=state["docker"]["container_id"])
-    return {**state, "boilerplate_project_files": scan}
+    # file bodies go to the blob store; state keeps {path, sha, size}
+    return {**state, "boilerplate_project_files": {**scan, "files": blob_store.refs(scan["files"])}}
 
 def plan_files(state: BuildState) -> BuildState:
     print("Planning files to read/update/create...")
@@ -425,11 +460,13 @@ def read_required_files(state: BuildState) -> BuildState:
     if "plan" not in state:
         raise RuntimeError("Missing 'plan' in state.")
     files_to_read = state["plan"].get("files_to_read", [])
+    # files to update are read too, so the writer can answer with patches
+    files_to_read = files_to_read + [p for p in state["plan"].get("files_to_update", []) if p not in files_to_read]
     if files_to_read:
         selected_files = scanner_agent.read_files(container_id=state["docker"]["container_id"], paths=files_to_read)
     else:
         selected_files = []
-    return {**state, "selected_files": selected_files}
+    return {**state, "selected_files": blob_store.refs(selected_files)}
 
 def write_solution(state: BuildState) -> BuildState:
     print("Generating and writing solution code...")
@@ -437,7 +474,7 @@ def write_solution(state: BuildState) -> BuildState:
     plan = state.get("plan", {})
     selected_files = state.get("selected_files", [])
     solution = writer_agent.generate_solution(global_spec=spec, project_files={
-        "files_to_read": selected_files,
+        "files_to_read": blob_store.resolve_all(selected_files),
         "files_to_update": plan.get("files_to_update", []),
         "files_to_create": plan.get("files_to_create", [])
     })
@@ -453,20 +490,29 @@ def write_solution(state: BuildState) -> BuildState:
             safe.append(e)
     if safe:
         write_files_in_container(container_id=state["docker"]["container_id"], files=safe)
-    return {**state, "solution": {"edits": safe, "blocked": blocked}}
+    return {**state, "solution": {"edits": blob_store.refs(safe), "blocked": blocked}, "changed_paths": [e["path"] for e in safe],
+            "selected_files": _refresh_copies(selected_files, safe)}
 
 def run_build(state: BuildState) -> BuildState:
     print("Running build process...")
     docker = state["docker"]
     stack = state["stack"]
     override = state.get("build_command_override")
-    result = build_runner.run_build(container_id=docker["container_id"], stack=stack, user_override_cmd=override)
+    # impacted tests first; the full suite runs in final_build
+    result = build_runner.run_build(container_id=docker["container_id"], stack=stack, user_override_cmd=override,
+                                    changed_paths=state.get("changed_paths"))
     if result.get("need_clarification"):
-        return {**state, "need_clarification": True, "question": result["question"]}
+        return {**state, "need_clarification": True, "question": result["question"], "clarification_node": "run_build"}
+    if result.get("success") and state.get("fix_memory_pending"):
+        # every remembered/learned patch from the last fix held up
+        fixer_agent.memory.record_outcome(state["fix_memory_pending"], [])
+        state = {**state, "fix_memory_pending": []}
     return {**state, "build_result": result}
 
 def after_build_branch(state: BuildState):
     print("Deciding next step after build...")
+    if state.get("need_clarification"):
+        return END
     br = state.get("build_result", {})
     if br.get("success"):
         return "run_runtime"
@@ -477,7 +523,7 @@ def summarize_logs(state: BuildState) -> BuildState:
     logs = state.get("build_result", {}).get("logs", "")
     # print("Build logs length:", logs)
     summ = summ_agent.summarize(logs)
-    return {**state, "error_summary": summ.get("error_summary"), "error_block": summ.get("error_block")}
+    return {**state, "error_summary": summ.get("error_summary"), "error_block": summ.get("error_block"), "parsed_errors": summ.get("errors", [])}
 
 def fix_errors(state: BuildState) -> BuildState:
     print("Fixing errors based on logs...")
@@ -485,7 +531,21 @@ def fix_errors(state: BuildState) -> BuildState:
     build_logs = state.get("error_block") or state.get("build_result", {}).get("logs", "")
     # choose selected_files as candidate context (already non-protected)
     selected_files = state.get("selected_files", [])
-    fix = fixer_agent.fix_errors(global_spec=spec, build_logs=build_logs, selected_files=selected_files)
+    candidate_files = blob_store.resolve_all(selected_files)
+    project_root = (state.get("runtime_result") or state.get("build_result") or {}).get("project_root")
+    parsed = with_workspace_paths(state.get("parsed_errors"), project_root)
+    # fix memory only answers when every error maps to a file we can read
+    if len(parsed) != len(state.get("parsed_errors") or []):
+        parsed = []
+    # error files + mentioned symbols + direct deps, under a token budget
+    all_paths = [f["path"] for f in (state.get("boilerplate_project_files") or {}).get("files", [])]
+    all_paths += [e["path"] for e in (state.get("solution") or {}).get("edits", []) + (state.get("fix_solution") or {}).get("edits", [])]
+    context = build_fix_context(parsed or state.get("parsed_errors"), state.get("error_block") or "",
+                                list(dict.fromkeys(all_paths)),
+                                reader=lambda paths: scanner_agent.read_files(container_id=state["docker"]["container_id"], paths=paths),
+                                fallback_files=candidate_files)
+    fix = fixer_agent.fix_errors(global_spec=spec, build_logs=build_logs, selected_files=candidate_files,
+                                 parsed_errors=parsed, context=context)
     edits = fix.get("edits", [])
     # filter protected again
     safe = []
@@ -498,7 +558,30 @@ def fix_errors(state: BuildState) -> BuildState:
             safe.append(e)
     if safe:
         write_files_in_container(container_id=state["docker"]["container_id"], files=safe)
-    return {**state, "fix_solution": {"edits": safe, "blocked": blocked}}
+    # keep every fix applied so far (latest wins per path) for test generation
+    merged = {e["path"]: e for e in (state.get("fix_solution") or {}).get("edits", [])}
+    merged.update({e["path"]: e for e in blob_store.refs(safe)})
+    loop = fix_loop_controller.record_tokens(state.get("fix_loop") or fix_loop_controller.new_loop(), fix.get("usage"))
+    return {**state, "fix_solution": {"edits": list(merged.values()), "blocked": blocked},
+            "changed_paths": [e["path"] for e in safe], "fix_loop": loop,
+            "selected_files": _refresh_copies(selected_files, safe),
+            "fix_memory_pending": fix.get("memory_fingerprints", []) if safe else []}
+
+def check_fix_loop(state: BuildState) -> BuildState:
+    print("Checking fix-loop convergence...")
+    fingerprint = error_fingerprint(state.get("parsed_errors"), state.get("error_block") or "")
+    if state.get("fix_memory_pending"):
+        # score last iteration's remembered/learned patches against what still fails
+        fixer_agent.memory.record_outcome(state["fix_memory_pending"], state.get("parsed_errors") or [])
+    loop = fix_loop_controller.check(state.get("fix_loop"), fingerprint)
+    if loop.get("stopped"):
+        print(f"🛑 Stopping fix loop after {loop['iteration']} iteration(s): {loop['stopped']}")
+    return {**state, "fix_loop": loop, "fix_memory_pending": []}
+
+def after_fix_loop_check(state: BuildState):
+    if (state.get("fix_loop") or {}).get("stopped"):
+        return "finalize"
+    return "fix_errors"
 
 def run_runtime(state: BuildState) -> BuildState:
     print("Running runtime checks...")
@@ -508,11 +591,13 @@ def run_runtime(state: BuildState) -> BuildState:
     res = runtime_runner.start_and_check(container_id=docker["container_id"], stack=stack, user_override_cmd=override)
     print("Runtime result:", res)
     if res.get("need_clarification"):
-        return {**state, "need_clarification": True, "question": res["question"]}
+        return {**state, "need_clarification": True, "question": res["question"], "clarification_node": "run_runtime"}
     return {**state, "runtime_result": res}
 
 def after_runtime_branch(state: BuildState):
     print("Deciding next step after runtime...")
+    if state.get("need_clarification"):
+        return END
     rt = state.get("runtime_result", {})
     if rt.get("success"):
         return "generate_testcases"
@@ -522,7 +607,7 @@ def summarize_runtime_logs(state: BuildState) -> BuildState:
     print("Summarizing runtime logs for errors...")
     logs = state.get("runtime_result", {}).get("logs", "")
     summ = summ_agent.summarize(logs)
-    return {**state, "error_summary": summ.get("error_summary"), "error_block": summ.get("error_block")}
+    return {**state, "error_summary": summ.get("error_summary"), "error_block": summ.get("error_block"), "parsed_errors": summ.get("errors", [])}
 
 def generate_testcases(state: BuildState) -> BuildState:
     print("Generating automated test cases...")
@@ -537,7 +622,7 @@ def generate_testcases(state: BuildState) -> BuildState:
     unique = {}
     for f in edits:
         unique[f["path"]] = f
-    final_edits = list(unique.values())
+    final_edits = blob_store.resolve_all(unique.values())
     stack = state["stack"]
     testfiles = testcase_gen.generate_tests(spec=spec, solution_files=final_edits, stack=stack)
     # Prevent writing test files into protected paths
@@ -551,32 +636,65 @@ def generate_testcases(state: BuildState) -> BuildState:
             safe_tests.append(tf)
     if safe_tests:
         write_files_in_container(container_id=state["docker"]["container_id"], files=safe_tests)
-    return {**state, "testcases": {"written": safe_tests, "blocked": blocked_tests}}
+    return {**state, "testcases": {"written": blob_store.refs(safe_tests), "blocked": blocked_tests}}
+
+def final_build(state: BuildState) -> BuildState:
+    print("Running final clean build...")
+    stack = state["stack"]
+    # incremental fix iterations skip `clean`; the full build runs once here
+    if state.get("build_command_override") or build_runner.strategy_for(stack) != "incremental":
+        return state
+    result = build_runner.run_build(container_id=state["docker"]["container_id"], stack=stack, stage="full")
+    if result.get("need_clarification"):
+        return {**state, "need_clarification": True, "question": result["question"], "clarification_node": "final_build"}
+    return {**state, "final_build_result": result}
+
+def _build_status(state: BuildState) -> str:
+    ok = (state.get("final_build_result") or state.get("build_result") or {}).get("success")
+    return "success" if ok else "failed"
 
 def finalize(state: BuildState) -> BuildState:
     print("Finalizing build process...")
-    return state
+    docker = state.get("docker")
+    if not docker:
+        return state
+    status = _build_status(state)
+    container_id = docker["container_id"]
+    # quiesce the app before the workspace is archived or the container is parked
+    if state.get("runtime_result") and (lifecycle.should_snapshot(status) or not lifecycle.should_remove(status)):
+        try:
+            runtime_runner.stop_application(container_id)
+        except Exception as e:
+            print(f"⚠️ Could not stop application: {e}")
+    build_runner.flush_cache(container_id, (state.get("stack") or {}).get("language"))
+    teardown = docker_agent.teardown(container_id, state.get("build_id"), status)
+    return {**state, "teardown": teardown}
 
 # ---------- graph wiring ----------
 def create_graph():
     graph = StateGraph(BuildState)
     # nodes
-    graph.add_node("select_stack", select_stack)
-    graph.add_node("setup_docker", setup_docker)
-    graph.add_node("generate_boilerplate", generate_boilerplate)
-    graph.add_node("scan_initial_files", scan_initial_files)
-    graph.add_node("plan_files", plan_files)
-    graph.add_node("read_required_files", read_required_files)
-    graph.add_node("write_solution", write_solution)
-    graph.add_node("run_build", run_build)
-    graph.add_node("summarize_logs", summarize_logs)
-    graph.add_node("fix_errors", fix_errors)
-    graph.add_node("run_runtime", run_runtime)
-    graph.add_node("summarize_runtime_logs", summarize_runtime_logs)
-    graph.add_node("generate_testcases", generate_testcases)
-    graph.add_node("finalize", finalize)
-
-    graph.set_entry_point("select_stack")
+    graph.add_node("select_stack", timed_node("select_stack", select_stack))
+    graph.add_node("setup_docker", timed_node("setup_docker", setup_docker))
+    graph.add_node("generate_boilerplate", timed_node("generate_boilerplate", generate_boilerplate))
+    graph.add_node("scan_initial_files", timed_node("scan_initial_files", scan_initial_files))
+    graph.add_node("plan_files", timed_node("plan_files", plan_files))
+    graph.add_node("read_required_files", timed_node("read_required_files", read_required_files))
+    graph.add_node("write_solution", timed_node("write_solution", write_solution))
+    graph.add_node("run_build", timed_node("run_build", run_build))
+    graph.add_node("summarize_logs", timed_node("summarize_logs", summarize_logs))
+    graph.add_node("check_fix_loop", timed_node("check_fix_loop", check_fix_loop))
+    graph.add_node("fix_errors", timed_node("fix_errors", fix_errors))
+    graph.add_node("run_runtime", timed_node("run_runtime", run_runtime))
+    graph.add_node("summarize_runtime_logs", timed_node("summarize_runtime_logs", summarize_runtime_logs))
+    graph.add_node("generate_testcases", timed_node("generate_testcases", generate_testcases))
+    graph.add_node("final_build", timed_node("final_build", final_build))
+    graph.add_node("finalize", timed_node("finalize", finalize))
+
+    # fresh builds start at select_stack; resumed ones at the node they left off
+    def route_entry(state: BuildState):
+        return state.get("resume_node") or "select_stack"
+    graph.set_conditional_entry_point(route_entry)
 
     def ask_or_continue(state: BuildState):
         if state.get("need_clarification"):
@@ -591,31 +709,123 @@ def create_graph():
     graph.add_edge("read_required_files", "write_solution")
     graph.add_edge("write_solution", "run_build")
 
+    # fix loop: failures are fingerprinted and gated before every fix;
+    # fixer edits are applied in place and go straight back to the build
     graph.add_conditional_edges("run_build", after_build_branch)
-    graph.add_edge("summarize_logs", "fix_errors")
-    graph.add_edge("fix_errors", "write_solution")
+    graph.add_edge("summarize_logs", "check_fix_loop")
+    graph.add_conditional_edges("check_fix_loop", after_fix_loop_check)
+    graph.add_edge("fix_errors", "run_build")
 
     graph.add_conditional_edges("run_runtime", after_runtime_branch)
-    graph.add_edge("summarize_runtime_logs", "fix_errors")
+    graph.add_edge("summarize_runtime_logs", "check_fix_loop")
 
-    graph.add_edge("run_runtime", "generate_testcases")
-    graph.add_edge("generate_testcases", "finalize")
+    graph.add_edge("generate_testcases", "final_build")
+    graph.add_edge("final_build", "finalize")
     graph.add_edge("finalize", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=get_checkpointer())
 
 # external runner
-async def execute_build_graph(prompt: str, clarification_answer: Optional[str] = None, global_spec: Optional[str] = None):
+# where a clarification answer goes when resuming at the node that asked
+CLARIFICATION_TARGETS = {
+    "select_stack": "clarification_answer",
+    "run_build": "build_command_override",
+    "final_build": "build_command_override",
+    "run_runtime": "runtime_command_override",
+}
+
+def _resume_inputs(graph, config, clarification_answer: Optional[str], resume_node: Optional[str]):
+    """
+    Returns the invoke input for an existing build thread:
+      None      -> continue the interrupted run (re-runs the pending node)
+      dict      -> restart at `resume_node` with the clarification applied
+    or False when there is no checkpoint for this build id.
+    """
+    snapshot = graph.get_state(config)
+    values = snapshot.values if snapshot else None
+    if not values:
+        return False
+    node = resume_node or values.get("clarification_node")
+    if snapshot.next and not node and not clarification_answer:
+        inputs = None
+        node = snapshot.next[0]
+    else:
+        node = node or "select_stack"
+        inputs = {"resume_node": node, "need_clarification": False, "question": None, "clarification_node": None}
+        if clarification_answer:
+            inputs[CLARIFICATION_TARGETS.get(node, "clarification_answer")] = clarification_answer
+
+    # reattach the provisioned container instead of building a new one
+    docker_info = values.get("docker")
+    # finalize only tears down; a container it already removed needs no re-provisioning
+    if node not in ("select_stack", "setup_docker", "finalize") and docker_info:
+        if not docker_agent.reattach(docker_info["container_id"]):
+            print(f"♻️ Container {docker_info['container_name']} is gone; re-provisioning")
+            inputs = {**(inputs or {}), "resume_node": "setup_docker", "need_clarification": False}
+    return inputs
+
+def _release_containers(build_id: str, reason: str, remove: bool = False):
+    """Frees host capacity held by a build that did not reach finalize."""
+    if not registry.is_built("docker_agent"):
+        return  # no container was created or reattached in this process
+    try:
+        for c in docker_agent.build_containers(build_id):
+            build_runner.flush_cache(c.id, (c.labels or {}).get(LANGUAGE_LABEL))
+            if remove:
+                docker_agent.teardown(c.id, build_id, "error", reason=reason)
+        if not remove:
+            docker_agent.park(build_id, reason)
+    except Exception as e:
+        print(f"⚠️ Could not release containers of build {build_id}: {e}")
+
+async def execute_build_graph(prompt: str, clarification_answer: Optional[str] = None, global_spec: Optional[str] = None,
+                              build_id: Optional[str] = None, resume: bool = False, resume_node: Optional[str] = None):
     graph = create_graph()
-    final_state = graph.invoke({
-        "prompt": prompt,
-        "clarification_answer": clarification_answer,
-        "global_spec": global_spec
-    })
+    build_id = build_id or uuid.uuid4().hex
+    config = {"configurable": {"thread_id": build_id}, "recursion_limit": fix_loop_controller.recursion_limit()}
+
+    inputs = False
+    if resume and graph.checkpointer is not None:
+        inputs = _resume_inputs(graph, config, clarification_answer, resume_node)
+        if inputs is not False:
+            print(f"⏯️ Resuming build {build_id}")
+    if inputs is False:
+        inputs = {
+            "build_id": build_id,
+            "resume_node": None,
+            "prompt": prompt,
+            "clarification_answer": clarification_answer,
+            "global_spec": global_spec
+        }
+    # root span: node spans and their LLM/exec leaf spans nest under it
+    with metrics.build_scope(build_id) as build_metrics, \
+            tracing.span("build", {"build.id": build_id, "build.resume": bool(resume)}) as build_span:
+        try:
+            with lifecycle.track(build_id):
+                final_state = graph.invoke(inputs, config)
+        except Exception:
+            metrics.observe_build("error")
+            # keep the container (stopped) for a resumed attempt; without checkpoints nothing can resume
+            _release_containers(build_id, "error", remove=graph.checkpointer is None)
+            raise
+        if final_state.get("need_clarification"):
+            status = "clarification"
+            _release_containers(build_id, "clarification")
+        else:
+            status = _build_status(final_state)
+        metrics.observe_build(status, final_state.get("fix_loop"))
+        build_span.set_attributes({
+            "build.status": status,
+            "build.fix_iterations": (final_state.get("fix_loop") or {}).get("iteration", 0),
+            "build.stack": (final_state.get("stack") or {}).get("language") or "",
+        })
+    tracing.flush()
     if final_state.get("need_clarification"):
-        return {"need_clarification": True, "question": final_state["question"]}
+        return {"need_clarification": True, "question": final_state["question"], "build_id": build_id,
+                "clarification_node": final_state.get("clarification_node"), "metrics": build_metrics.snapshot()}
     return {
         "need_clarification": False,
+        "build_id": build_id,
         "stack": final_state.get("stack"),
         "docker": final_state.get("docker"),
         "boilerplate": final_state.get("boil"),
@@ -623,7 +833,11 @@ async def execute_build_graph(prompt: str, clarification_answer: Optional[str] =
         "plan": final_state.get("plan"),
         "solution": final_state.get("solution"),
         "fix_solution": final_state.get("fix_solution"),
+        "fix_loop": final_state.get("fix_loop"),
         "build_result": final_state.get("build_result"),
+        "final_build_result": final_state.get("final_build_result"),
         "runtime_result": final_state.get("runtime_result"),
-        "testcases": final_state.get("testcases")
+        "testcases": final_state.get("testcases"),
+        "teardown": final_state.get("teardown"),
+        "metrics": build_metrics.snapshot()
     }
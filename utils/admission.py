@@ -0,0 +1,154 @@
+# utils/admission.py
+"""
+Host-capacity admission control for build containers.
+
+Every container DockerAgent creates carries its reservation as labels
+(solution-builder.cpus / .memory_mb). Utilisation is the sum over running
+labelled containers, read from the daemon itself, so every API process and
+worker sharing that daemon sees the same numbers. A new container is
+admitted only if its profile fits into the host capacity minus a reserve;
+otherwise the build waits (polling) instead of oversubscribing the host.
+
+Check-and-create runs under a host-local file lock, so processes on one
+host cannot both take the last slot. Hosts sharing a remote daemon only
+see each other through the labels and may briefly overshoot.
+
+Env:
+  ADMISSION_CONTROL=off     admit everything (limits are still applied)
+  HOST_CPUS / HOST_MEMORY_MB  capacity (default: the daemon's NCPU / MemTotal)
+  ADMISSION_RESERVE=0.1     fraction of the host kept free for the daemon and OS
+  ADMISSION_TIMEOUT_S=1800  give up waiting for capacity after this long
+  ADMISSION_POLL_S=2
+"""
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from constants.storage import VAR_DIR
+from constants.resources import profile_for
+from utils import metrics
+
+MANAGED_LABEL = "solution-builder.managed"
+CPUS_LABEL = "solution-builder.cpus"
+MEMORY_LABEL = "solution-builder.memory_mb"
+LANGUAGE_LABEL = "solution-builder.language"
+
+ADMISSION_WAIT = metrics.Histogram("sb_admission_wait_seconds", "Time builds waited for host capacity", ["language"])
+
+
+def enabled() -> bool:
+    return os.getenv("ADMISSION_CONTROL", "on").lower() not in ("0", "off", "false")
+
+
+def reservation_labels(language: str, profile: dict) -> dict:
+    return {
+        MANAGED_LABEL: "true",
+        LANGUAGE_LABEL: language,
+        CPUS_LABEL: str(profile["cpus"]),
+        MEMORY_LABEL: str(profile["memory_mb"]),
+    }
+
+
+class AdmissionController:
+    def __init__(self, client, reserve: float = None, poll_s: float = None, timeout_s: float = None,
+                 lock_path: str = None):
+        self.client = client
+        self.reserve = reserve if reserve is not None else float(os.getenv("ADMISSION_RESERVE", "0.1"))
+        self.poll_s = poll_s or float(os.getenv("ADMISSION_POLL_S", "2"))
+        self.timeout_s = timeout_s or float(os.getenv("ADMISSION_TIMEOUT_S", "1800"))
+        self.lock_path = lock_path or os.path.join(VAR_DIR, "admission.lock")
+        self._capacity = None
+
+    # -----------------------------------------------------------
+    def host_capacity(self) -> dict:
+        if self._capacity is None:
+            info = {}
+            try:
+                info = self.client.info()
+            except Exception as e:
+                print(f"⚠️ docker info failed ({e}); using local host capacity")
+            cpus = float(os.getenv("HOST_CPUS") or info.get("NCPU") or os.cpu_count() or 1)
+            memory_mb = float(os.getenv("HOST_MEMORY_MB") or (info.get("MemTotal") or 0) / 2 ** 20
+                              or os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2 ** 20)
+            self._capacity = {"cpus": cpus, "memory_mb": round(memory_mb)}
+        return self._capacity
+
+    def reservations(self) -> list:
+        out = []
+        for c in self.client.containers.list(filters={"label": MANAGED_LABEL}):
+            labels = c.labels or {}
+            try:
+                out.append({"name": c.name, "language": labels.get(LANGUAGE_LABEL),
+                            "cpus": float(labels.get(CPUS_LABEL, 0)), "memory_mb": float(labels.get(MEMORY_LABEL, 0))})
+            except ValueError:
+                continue
+        return out
+
+    def utilisation(self) -> dict:
+        cap = self.host_capacity()
+        held = self.reservations()
+        usable = {"cpus": cap["cpus"] * (1 - self.reserve), "memory_mb": cap["memory_mb"] * (1 - self.reserve)}
+        reserved = {"cpus": sum(r["cpus"] for r in held), "memory_mb": sum(r["memory_mb"] for r in held)}
+        return {
+            "capacity": cap,
+            "usable": {k: round(v, 2) for k, v in usable.items()},
+            "reserved": {k: round(v, 2) for k, v in reserved.items()},
+            "available": {k: round(max(0.0, usable[k] - reserved[k]), 2) for k in usable},
+            "containers": len(held),
+            "admission_control": enabled(),
+        }
+
+    def fits(self, profile: dict, util: dict = None) -> bool:
+        util = util or self.utilisation()
+        if util["containers"] == 0:
+            return True  # a profile larger than the host still runs alone
+        avail = util["available"]
+        return profile["cpus"] <= avail["cpus"] and profile["memory_mb"] <= avail["memory_mb"]
+
+    def can_admit(self, language: str = None) -> bool:
+        return not enabled() or self.fits(profile_for(language or "default"))
+
+    # -----------------------------------------------------------
+    @contextmanager
+    def _host_lock(self):
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def admit(self, language: str, profile: dict):
+        """
+        Blocks until `profile` fits, then holds the host lock while the
+        caller creates the (labelled) container, so the reservation is
+        visible before the next build checks.
+        """
+        if not enabled():
+            yield None
+            return
+        started = time.time()
+        waited = False
+        while True:
+            with self._host_lock():
+                util = self.utilisation()
+                if self.fits(profile, util):
+                    if waited:
+                        print(f"✅ Capacity available after {time.time() - started:.0f}s")
+                    ADMISSION_WAIT.observe(time.time() - started, language=language)
+                    yield util
+                    return
+            if time.time() - started > self.timeout_s:
+                raise RuntimeError(
+                    f"❌ No host capacity for a {language} build after {self.timeout_s:.0f}s "
+                    f"(needs {profile['cpus']} cpus / {profile['memory_mb']} MB, "
+                    f"available {util['available']['cpus']} / {util['available']['memory_mb']} MB)"
+                )
+            if not waited:
+                print(f"⏳ Waiting for host capacity: need {profile['cpus']} cpus / {profile['memory_mb']} MB, "
+                      f"available {util['available']['cpus']} / {util['available']['memory_mb']} MB "
+                      f"({util['containers']} build containers running)")
+                waited = True
+            time.sleep(self.poll_s)
@@ -0,0 +1,103 @@
+# utils/blob_store.py
+"""
+Content-addressed store for file bodies carried through BuildState.
+
+State keeps only references:
+
+    {"path": "src/App.java", "sha": "<sha256>", "size": 1234, ...other keys}
+
+and nodes resolve them when they actually need the text. Every blob is
+written once to <VAR_DIR>/blobs/<sha[:2]>/<sha> (so refs in graph
+checkpoints still resolve after a restart) and cached in an in-memory LRU
+bounded by BLOB_STORE_MEMORY_MB. Identical bodies (boilerplate shared by
+every build) are stored once.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from constants.storage import VAR_DIR
+
+BLOB_DIR = os.path.join(VAR_DIR, "blobs")
+
+
+class BlobStore:
+    def __init__(self, max_memory_bytes: int = None, spill_dir: str = BLOB_DIR):
+        self.max_memory_bytes = max_memory_bytes or int(float(os.getenv("BLOB_STORE_MEMORY_MB", "64")) * 1024 * 1024)
+        self.spill_dir = spill_dir
+        self._mem = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+
+    def _spill_path(self, sha: str) -> str:
+        return os.path.join(self.spill_dir, sha[:2], sha)
+
+    def _spill(self, sha: str, data: bytes):
+        path = self._spill_path(sha)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def put(self, content: str) -> str:
+        data = (content or "").encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if sha in self._mem:
+                self._mem.move_to_end(sha)
+                return sha
+            self._spill(sha, data)
+            self._mem[sha] = data
+            self._mem_bytes += len(data)
+            while self._mem_bytes > self.max_memory_bytes and len(self._mem) > 1:
+                _, old = self._mem.popitem(last=False)
+                self._mem_bytes -= len(old)
+        return sha
+
+    def get(self, sha: str):
+        with self._lock:
+            data = self._mem.get(sha)
+            if data is not None:
+                self._mem.move_to_end(sha)
+                return data.decode("utf-8")
+        try:
+            with open(self._spill_path(sha), "rb") as f:
+                return f.read().decode("utf-8")
+        except OSError:
+            return None
+
+    def exists(self, sha: str) -> bool:
+        with self._lock:
+            if sha in self._mem:
+                return True
+        return os.path.exists(self._spill_path(sha))
+
+    # -----------------------------------------------------------
+    # File dict helpers: {"path", "content", ...} <-> {"path", "sha", "size", ...}
+    # -----------------------------------------------------------
+    def ref(self, f: dict) -> dict:
+        if "content" not in f or f.get("content") is None:
+            return dict(f)
+        out = {k: v for k, v in f.items() if k != "content"}
+        out["sha"] = self.put(f["content"])
+        out["size"] = len(f["content"].encode("utf-8"))
+        return out
+
+    def resolve(self, f: dict) -> dict:
+        if "sha" not in f or "content" in f:
+            return dict(f)
+        out = {k: v for k, v in f.items() if k not in ("sha", "size")}
+        out["content"] = self.get(f["sha"])
+        return out
+
+    def refs(self, files: list) -> list:
+        return [self.ref(f) for f in files or []]
+
+    def resolve_all(self, files: list) -> list:
+        return [self.resolve(f) for f in files or []]
+
+
+blob_store = BlobStore()
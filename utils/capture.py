@@ -0,0 +1,192 @@
+# utils/capture.py
+"""
+Background capture of prompts and build logs for debugging.
+
+Callers enqueue a record and return immediately; one writer thread appends
+JSON lines to gzip streams under <VAR_DIR>/capture/<kind>.jsonl.gz, each
+record tagged with the current build id:
+
+    {"ts": 1729330000.1, "build_id": "9f2c...", "kind": "code_write_prompt", "prompt": "...", ...}
+
+Streams rotate by size (<kind>.jsonl.gz -> <kind>.1.jsonl.gz -> ...). Read a
+build back with `zcat .solution_builder/capture/*.gz | grep <build_id>`.
+
+Env:
+  CAPTURE=off              disable capture entirely
+  CAPTURE_SAMPLE=0.1       keep ~10% of builds (decided per build id, so a sampled build is complete)
+  CAPTURE_MAX_MB=16        rotate a stream at this compressed size
+  CAPTURE_BACKUPS=5        rotated files kept per stream
+  CAPTURE_MAX_FIELD_KB=256 longer string fields keep their head and tail
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+import zlib
+from constants.storage import VAR_DIR
+from utils import metrics
+
+CAPTURE_DIR = os.path.join(VAR_DIR, "capture")
+
+
+def enabled() -> bool:
+    return os.getenv("CAPTURE", "on").lower() not in ("0", "off", "false")
+
+
+class CaptureSink:
+    def __init__(self, directory: str = CAPTURE_DIR, max_bytes: int = None, backups: int = None,
+                 sample: float = None, max_field_chars: int = None, queue_size: int = 1000):
+        self.directory = directory
+        self.max_bytes = max_bytes or int(float(os.getenv("CAPTURE_MAX_MB", "16")) * 1024 * 1024)
+        self.backups = backups if backups is not None else int(os.getenv("CAPTURE_BACKUPS", "5"))
+        self.sample = sample if sample is not None else float(os.getenv("CAPTURE_SAMPLE", "1.0"))
+        self.max_field_chars = max_field_chars or int(os.getenv("CAPTURE_MAX_FIELD_KB", "256")) * 1024
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._streams = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------------
+    # producer side (request path): never blocks, never raises
+    # -----------------------------------------------------------
+    def _sampled(self, build_id: str) -> bool:
+        if self.sample >= 1:
+            return True
+        if self.sample <= 0:
+            return False
+        if build_id:
+            digest = hashlib.sha1(build_id.encode("utf-8")).digest()
+            return int.from_bytes(digest[:4], "big") / 2 ** 32 < self.sample
+        return random.random() < self.sample
+
+    def _clip(self, value):
+        if isinstance(value, str) and len(value) > self.max_field_chars:
+            half = self.max_field_chars // 2
+            return f"{value[:half]}\n... [{len(value) - 2 * half} chars omitted] ...\n{value[-half:]}"
+        return value
+
+    def record(self, kind: str, **fields):
+        if not enabled():
+            return
+        bm = metrics.current()
+        build_id = bm.build_id if bm else None
+        if not self._sampled(build_id):
+            return
+        entry = {"ts": round(time.time(), 3), "build_id": build_id, "kind": kind}
+        entry.update({k: self._clip(v) for k, v in fields.items()})
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    # -----------------------------------------------------------
+    # writer thread
+    # -----------------------------------------------------------
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                self._queue.task_done()
+                break
+            batch = [entry]
+            while len(batch) < 100:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.put(None)  # handled on the next outer iteration
+                    self._queue.task_done()
+                    break
+                batch.append(nxt)
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"⚠️ Capture write failed: {e}")
+            for _ in batch:
+                self._queue.task_done()
+        self._close_streams()
+
+    def _path(self, kind: str, index: int = 0) -> str:
+        suffix = f".{index}" if index else ""
+        return os.path.join(self.directory, f"{kind}{suffix}.jsonl.gz")
+
+    def _stream(self, kind: str):
+        stream = self._streams.get(kind)
+        if stream is None:
+            os.makedirs(self.directory, exist_ok=True)
+            raw = open(self._path(kind), "ab")
+            stream = self._streams[kind] = (raw, gzip.GzipFile(fileobj=raw, mode="ab"))
+        return stream
+
+    def _rotate(self, kind: str):
+        raw, gz = self._streams.pop(kind)
+        gz.close()
+        raw.close()
+        # <kind>.jsonl.gz -> .1 -> ... -> .<backups>; the oldest is overwritten
+        for i in range(self.backups, 0, -1):
+            src = self._path(kind, i - 1)
+            if os.path.exists(src):
+                os.replace(src, self._path(kind, i))
+        if self.backups == 0 and os.path.exists(self._path(kind)):
+            os.remove(self._path(kind))
+
+    def _write(self, batch: list):
+        touched = set()
+        for entry in batch:
+            raw, gz = self._stream(entry["kind"])
+            gz.write((json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+            touched.add(entry["kind"])
+        for kind in touched:
+            raw, gz = self._streams[kind]
+            # sync flush: everything written so far is readable even if the process dies
+            gz.flush(zlib.Z_SYNC_FLUSH)
+            raw.flush()
+            if raw.tell() >= self.max_bytes:
+                self._rotate(kind)
+
+    def _close_streams(self):
+        for raw, gz in self._streams.values():
+            gz.close()
+            raw.close()
+        self._streams.clear()
+
+    # -----------------------------------------------------------
+    def flush(self, timeout: float = 5.0):
+        """Waits (bounded) until queued records are written."""
+        if self._thread is None:
+            return
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+
+capture_sink = CaptureSink()
+atexit.register(capture_sink.close)
+
+
+def record(kind: str, **fields):
+    capture_sink.record(kind, **fields)
@@ -0,0 +1,38 @@
+# utils/checkpoints.py
+"""
+Durable LangGraph checkpoints, keyed by build id (the graph thread id).
+
+Uses the SQLite saver from `langgraph-checkpoint-sqlite` so it works
+offline and survives restarts. Disable with GRAPH_CHECKPOINTS=off; if the
+package is missing, builds simply run without checkpoints.
+"""
+import os
+import sqlite3
+import threading
+from constants.storage import VAR_DIR
+
+CHECKPOINT_PATH = os.getenv("GRAPH_CHECKPOINT_DB", os.path.join(VAR_DIR, "checkpoints.sqlite"))
+
+_saver = None
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("GRAPH_CHECKPOINTS", "on").lower() not in ("0", "off", "false")
+
+
+def get_checkpointer():
+    global _saver
+    if not enabled():
+        return None
+    with _lock:
+        if _saver is None:
+            try:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+            except ImportError:
+                print("⚠️ langgraph-checkpoint-sqlite not installed; builds are not resumable")
+                return None
+            os.makedirs(os.path.dirname(CHECKPOINT_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False)
+            _saver = SqliteSaver(conn)
+    return _saver
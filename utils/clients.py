@@ -0,0 +1,211 @@
+# utils/clients.py
+"""
+Instrumented Groq / Docker clients.
+
+Agents get their clients here instead of calling `Groq(...)` /
+`docker.from_env()` directly, so every chat completion, exec and archive
+transfer is timed and counted in utils/metrics.py and traced as a leaf
+span (utils/tracing.py). The proxies delegate everything else to the real
+SDK objects unchanged.
+"""
+import os
+import time
+from utils import metrics, tracing
+
+# exec commands are span attributes; keep them readable, not whole scripts
+SPAN_CMD_CHARS = 300
+
+
+def _cmd_attr(cmd) -> str:
+    cmd = " ".join(cmd) if isinstance(cmd, (list, tuple)) else str(cmd)
+    return cmd[:SPAN_CMD_CHARS]
+
+
+# ---------------------------------------------------------------
+# Groq
+# ---------------------------------------------------------------
+class _Completions:
+    def __init__(self, inner, agent: str):
+        self._inner = inner
+        self._agent = agent
+
+    def create(self, *args, **kwargs):
+        prompt_chars = sum(len(str(m.get("content") or "")) for m in kwargs.get("messages") or [])
+        with tracing.span("groq.chat.completions.create", {
+            "llm.agent": self._agent, "llm.model": kwargs.get("model"), "llm.prompt_chars": prompt_chars,
+        }) as span:
+            started = time.perf_counter()
+            try:
+                resp = self._inner.create(*args, **kwargs)
+            except Exception:
+                metrics.observe_llm(self._agent, time.perf_counter() - started, ok=False)
+                raise
+            usage = getattr(resp, "usage", None)
+            metrics.observe_llm(self._agent, time.perf_counter() - started, usage)
+            span.set_attributes({
+                "llm.prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "llm.completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            })
+            return resp
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class _Chat:
+    def __init__(self, inner, agent: str):
+        self._inner = inner
+        self.completions = _Completions(inner.completions, agent)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class InstrumentedGroq:
+    def __init__(self, client, agent: str):
+        self._client = client
+        self.agent = agent
+        self.chat = _Chat(client.chat, agent)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def groq_client(agent: str) -> InstrumentedGroq:
+    from groq import Groq  # SDK import deferred until an agent is built
+    return InstrumentedGroq(Groq(api_key=os.getenv("GROQ_API_KEY")), agent)
+
+
+# ---------------------------------------------------------------
+# Docker
+# ---------------------------------------------------------------
+def _payload_size(data) -> int:
+    if hasattr(data, "getbuffer"):
+        return data.getbuffer().nbytes
+    try:
+        return len(data)
+    except TypeError:
+        return 0
+
+
+class InstrumentedContainer:
+    def __init__(self, container):
+        self._container = container
+
+    def exec_run(self, cmd, *args, **kwargs):
+        with tracing.span("docker.exec_run", {"docker.cmd": _cmd_attr(cmd), "docker.detach": kwargs.get("detach")}) as span:
+            started = time.perf_counter()
+            result = self._container.exec_run(cmd, *args, **kwargs)
+            output = result[1] if isinstance(result, tuple) else getattr(result, "output", None)
+            size = len(output) if isinstance(output, (bytes, str)) else 0
+            metrics.observe_docker("exec_run", time.perf_counter() - started, bytes_from=size)
+            exit_code = result[0] if isinstance(result, tuple) else getattr(result, "exit_code", None)
+            span.set_attributes({"docker.output_bytes": size, "docker.exit_code": exit_code if exit_code is not None else -1})
+            return result
+
+    def put_archive(self, path, data):
+        size = _payload_size(data)
+        with tracing.span("docker.put_archive", {"docker.path": path, "docker.bytes": size}):
+            started = time.perf_counter()
+            ok = self._container.put_archive(path, data)
+            metrics.observe_docker("put_archive", time.perf_counter() - started, bytes_to=size)
+            return ok
+
+    def get_archive(self, path, *args, **kwargs):
+        span = tracing.start_span("docker.get_archive", {"docker.path": path})
+        started = time.perf_counter()
+        stream, stat = self._container.get_archive(path, *args, **kwargs)
+
+        def counted():
+            size = 0
+            try:
+                for chunk in stream:
+                    size += len(chunk)
+                    yield chunk
+            finally:
+                metrics.observe_docker("get_archive", time.perf_counter() - started, bytes_from=size)
+                span.set_attribute("docker.bytes", size)
+                span.end()
+        return counted(), stat
+
+    def __getattr__(self, name):
+        return getattr(self._container, name)
+
+
+class _Containers:
+    def __init__(self, inner):
+        self._inner = inner
+
+    def get(self, *args, **kwargs):
+        return InstrumentedContainer(self._inner.get(*args, **kwargs))
+
+    def run(self, image, *args, **kwargs):
+        with tracing.span("docker.containers.run", {"docker.image": str(image)}):
+            started = time.perf_counter()
+            container = self._inner.run(image, *args, **kwargs)
+            metrics.observe_docker("container_run", time.perf_counter() - started)
+            return InstrumentedContainer(container) if not isinstance(container, (bytes, str)) else container
+
+    def list(self, *args, **kwargs):
+        return [InstrumentedContainer(c) for c in self._inner.list(*args, **kwargs)]
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class _Api:
+    def __init__(self, inner):
+        self._inner = inner
+        self._cmds = {}
+
+    def exec_create(self, container, cmd, *args, **kwargs):
+        created = self._inner.exec_create(container, cmd, *args, **kwargs)
+        self._cmds[created.get("Id")] = _cmd_attr(cmd)
+        return created
+
+    def exec_start(self, exec_id, *args, stream=False, **kwargs):
+        # a streamed exec lasts until its output is drained, so the span is ended by the consumer
+        span = tracing.start_span("docker.exec_start", {"docker.cmd": self._cmds.pop(exec_id, None),
+                                                         "docker.stream": bool(stream)})
+        started = time.perf_counter()
+        try:
+            out = self._inner.exec_start(exec_id, *args, stream=stream, **kwargs)
+        except Exception:
+            span.end()
+            raise
+        if not stream:
+            size = len(out) if isinstance(out, (bytes, str)) else 0
+            metrics.observe_docker("exec_start", time.perf_counter() - started, bytes_from=size)
+            span.set_attribute("docker.output_bytes", size)
+            span.end()
+            return out
+
+        def counted():
+            size = 0
+            try:
+                for chunk in out:
+                    size += len(chunk)
+                    yield chunk
+            finally:
+                metrics.observe_docker("exec_start", time.perf_counter() - started, bytes_from=size)
+                span.set_attribute("docker.output_bytes", size)
+                span.end()
+        return counted()
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class InstrumentedDocker:
+    def __init__(self, client):
+        self._client = client
+        self.containers = _Containers(client.containers)
+        self.api = _Api(client.api)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def docker_client() -> InstrumentedDocker:
+    import docker
+    return InstrumentedDocker(docker.from_env())
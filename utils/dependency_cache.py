@@ -0,0 +1,171 @@
+# utils/dependency_cache.py
+"""
+Warm dependency caches shared across build containers.
+
+Every language image gets one named Docker volume mounted at /opt/sb-cache/<name>.
+
+  java    read-mostly Maven repository used as a *tail* repository
+          (-Dmaven.repo.local.tail, Maven >= 3.9). Each container still
+          writes new artifacts to its own ~/.m2/repository (copy-on-write);
+          `refresh` publishes those back into the shared volume under a lock.
+  node    npm content-addressed cache (safe for concurrent writers)
+  python  pip wheel/http cache
+  dotnet  NuGet global packages folder
+
+Seed the Maven volume from the bundled template once after building the
+image:
+
+    python -m utils.dependency_cache seed java
+"""
+import io
+import os
+import sys
+import tarfile
+import zipfile
+import docker
+
+CACHE_ROOT = "/opt/sb-cache"
+SEEDED_MARKER = ".seeded"
+
+CACHE_SPECS = {
+    "java": {
+        "volume": "solution-builder-cache-m2",
+        "mount": f"{CACHE_ROOT}/m2",
+        "environment": {"MAVEN_OPTS": f"-Dmaven.repo.local.tail={CACHE_ROOT}/m2"},
+        "local_repo": "/root/.m2/repository",
+        "template": ("boilerplates/java/springboot_template.zip", "springbootproject/springapp/pom.xml"),
+    },
+    "node": {
+        "volume": "solution-builder-cache-npm",
+        "mount": f"{CACHE_ROOT}/npm",
+        "environment": {"npm_config_cache": f"{CACHE_ROOT}/npm", "npm_config_prefer_offline": "true"},
+    },
+    "python": {
+        "volume": "solution-builder-cache-pip",
+        "mount": f"{CACHE_ROOT}/pip",
+        "environment": {"PIP_CACHE_DIR": f"{CACHE_ROOT}/pip"},
+    },
+    "dotnet": {
+        "volume": "solution-builder-cache-nuget",
+        "mount": f"{CACHE_ROOT}/nuget",
+        "environment": {"NUGET_PACKAGES": f"{CACHE_ROOT}/nuget"},
+    },
+}
+
+# Maven messages that mean "offline and the artifact is not cached"
+OFFLINE_FAILURE_MARKERS = (
+    "in offline mode",
+    "offline mode and the artifact",
+    "Cannot access central",
+)
+
+
+def enabled() -> bool:
+    return os.getenv("DEPENDENCY_CACHE", "on").lower() not in ("0", "off", "false")
+
+
+def container_options(client, language: str) -> dict:
+    """Extra `containers.run` kwargs (volumes + environment) for a language."""
+    spec = CACHE_SPECS.get(language)
+    if not spec or not enabled():
+        return {}
+    ensure_volume(client, language)
+    return {
+        "volumes": {spec["volume"]: {"bind": spec["mount"], "mode": "rw"}},
+        "environment": dict(spec["environment"]),
+    }
+
+
+def ensure_volume(client, language: str):
+    name = CACHE_SPECS[language]["volume"]
+    try:
+        return client.volumes.get(name)
+    except docker.errors.NotFound:
+        print(f"📦 Creating dependency cache volume '{name}'")
+        return client.volumes.create(name=name, labels={"solution-builder.cache": language})
+
+
+def is_seeded(container, language: str) -> bool:
+    spec = CACHE_SPECS.get(language)
+    if not spec or not enabled():
+        return False
+    ec, _ = container.exec_run(f"test -f {spec['mount']}/{SEEDED_MARKER}")
+    return ec == 0
+
+
+def refresh(container, language: str, wait: bool = False):
+    """
+    Publish artifacts this container downloaded into the shared Maven volume.
+    rsync writes each file to a temp name and renames it, so concurrent
+    readers never see partial jars; existing entries are never overwritten.
+
+    Runs detached by default. wait=True runs it in the foreground; since it
+    takes the same lock, it also waits out a detached refresh still running
+    in the container (call it before the container is stopped or removed).
+    """
+    spec = CACHE_SPECS.get(language)
+    if not spec or "local_repo" not in spec or not enabled():
+        return
+    local, shared = spec["local_repo"], spec["mount"]
+    cmd = (
+        f"test -d {local} && flock -w 120 {shared}/.refresh.lock "
+        f"rsync -a --ignore-existing --exclude '*.lastUpdated' --exclude 'resolver-status.properties' "
+        f"{local}/ {shared}/"
+    )
+    container.exec_run(f"bash -lc \"{cmd}\"", detach=not wait)
+
+
+def seed(client, language: str, image: str = None):
+    """
+    Pre-resolve the template's dependencies into the shared volume using a
+    throw-away container of the language image.
+    """
+    from agents.docker_agent import STATIC_IMAGE_MAP
+
+    spec = CACHE_SPECS[language]
+    if "template" not in spec:
+        print(f"ℹ️ No template to seed for '{language}'; cache fills on first build.")
+        return False
+
+    zip_path, pom_entry = spec["template"]
+    with zipfile.ZipFile(zip_path) as z:
+        pom = z.read(pom_entry)
+
+    ensure_volume(client, language)
+    image = image or STATIC_IMAGE_MAP[language]
+    container = client.containers.run(
+        image=image,
+        command="tail -f /dev/null",
+        detach=True,
+        volumes={spec["volume"]: {"bind": spec["mount"], "mode": "rw"}},
+        working_dir="/seed",
+    )
+    try:
+        container.exec_run("mkdir -p /seed")
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            info = tarfile.TarInfo(name="pom.xml")
+            info.size = len(pom)
+            tar.addfile(info, io.BytesIO(pom))
+        container.put_archive("/seed", buf.getvalue())
+
+        print(f"📦 Seeding {spec['volume']} from {zip_path}:{pom_entry} ...")
+        goals = "dependency:go-offline dependency:resolve-plugins compile"
+        ec, out = container.exec_run(
+            f"bash -lc \"cd /seed && mvn -B -q -Dmaven.repo.local={spec['mount']} {goals}\""
+        )
+        if ec != 0:
+            print(out.decode(errors="ignore")[-4000:])
+            return False
+        container.exec_run(f"touch {spec['mount']}/{SEEDED_MARKER}")
+        return True
+    finally:
+        container.remove(force=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "seed":
+        print("usage: python -m utils.dependency_cache seed <language> [image]")
+        sys.exit(2)
+    ok = seed(docker.from_env(), sys.argv[2], *sys.argv[3:4])
+    sys.exit(0 if ok else 1)
@@ -1,7 +1,8 @@
 import io
 import tarfile
-import docker
+from utils.clients import docker_client
 import os
+from utils import project_root
 
 def write_files_in_container(container_id: str, files: list):
     """
@@ -9,7 +10,7 @@ def write_files_in_container(container_id: str, files: list):
     100% safe for multi-line Java, XML, YAML, JSON, etc.
     """
 
-    client = docker.from_env()
+    client = docker_client()
     container = client.containers.get(container_id)
 
     for f in files:
@@ -40,3 +41,7 @@ def write_files_in_container(container_id: str, files: list):
         container.put_archive("/workspace", tarstream.getvalue())
 
         print(f"✔ Successfully wrote file: /workspace/{path}")
+
+    # a new build marker (pom.xml, package.json, ...) may move the project root
+    if any(project_root.is_marker_path(f["path"]) for f in files):
+        project_root.invalidate(container_id)
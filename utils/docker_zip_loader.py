@@ -63,15 +63,16 @@
 #     return True
 
 
-import docker
+from utils.clients import docker_client
 import os
 import io
 import tarfile
 import zipfile
+from utils import project_root
 
 
 def load_zip_into_container(container_id: str, zip_path: str):
-    client = docker.from_env()
+    client = docker_client()
 
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP not found: {zip_path}")
@@ -145,6 +146,7 @@ echo "=== Starting Spring Boot ==="
 
     # Upload files to the container
     container.put_archive("/workspace", tar_stream.getvalue())
+    project_root.invalidate(container_id)
 
     # -----------------------------------
     # RUN dbshell.sh inside container
@@ -0,0 +1,174 @@
+# utils/fix_context.py
+"""
+Error-driven context for ErrorFixerAgent.
+
+Instead of the planner's selected_files, the fixer gets:
+  1. the files named in the error locations (parsed errors, or file:line
+     tokens found in the error block when no parser matched),
+  2. files defining symbols the errors mention (cannot find symbol X, ...),
+  3. direct dependencies of the error files (imports / same-package types),
+packed under a token budget. Large error files are sent as line windows
+around the error lines; the full bodies are kept in "sources" so patches
+are applied to the real file, never to the excerpt.
+"""
+import os
+import re
+from utils.patching import edit_protocol
+
+FILE_TOKEN_RE = re.compile(r"([\w./\\-]+\.(?:java|kt|ts|tsx|js|jsx|py|cs|xml|properties|ya?ml))(?:[:(\[](\d+))?")
+SYMBOL_RES = [
+    re.compile(r"symbol:\s+(?:class|interface|variable|method)\s+(\w+)"),
+    re.compile(r"Cannot find (?:name|module) '([\w./-]+)'"),
+    re.compile(r"does not exist on type '(\w+)"),
+    re.compile(r"type or namespace name '(\w+)'"),
+    re.compile(r"cannot import name '(\w+)'|No module named '([\w.]+)'"),
+]
+JAVA_IMPORT_RE = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)\s*;", re.M)
+JS_IMPORT_RE = re.compile(r"""(?:from\s+|require\(\s*|import\s+)['"](\.{1,2}/[^'"]+)['"]""")
+PY_IMPORT_RE = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))", re.M)
+TYPE_REF_RE = re.compile(r"\b([A-Z][A-Za-z0-9_]+)\b")
+SOURCE_EXTS = (".java", ".kt", ".ts", ".tsx", ".js", ".jsx", ".py", ".cs")
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _resolve_suffix(token: str, all_paths: list):
+    """Maps a log path (absolute, project-relative, ...) to a workspace path."""
+    token = token.replace("\\", "/").lstrip("./")
+    hits = [p for p in all_paths if p == token or p.endswith("/" + token) or token.endswith("/" + p)]
+    return min(hits, key=len) if hits else None
+
+
+def _error_locations(parsed_errors: list, error_block: str, all_paths: list) -> dict:
+    """{workspace path: [error lines]} in first-seen order."""
+    locations = {}
+    for e in parsed_errors or []:
+        path = e.get("path") or _resolve_suffix(e.get("file") or "", all_paths)
+        if path:
+            locations.setdefault(path, []).extend([e["line"]] if e.get("line") else [])
+    if not locations:
+        for m in FILE_TOKEN_RE.finditer(error_block or ""):
+            path = _resolve_suffix(m.group(1), all_paths)
+            if path:
+                locations.setdefault(path, []).extend([int(m.group(2))] if m.group(2) else [])
+    return locations
+
+
+def _error_symbols(parsed_errors: list, error_block: str) -> set:
+    text = "\n".join(e.get("message", "") for e in parsed_errors or []) or (error_block or "")
+    symbols = set()
+    for rx in SYMBOL_RES:
+        for m in rx.finditer(text):
+            name = next(g for g in m.groups() if g)
+            symbols.add(name.rsplit("/", 1)[-1].rsplit(".", 1)[-1])
+    return symbols
+
+
+def _dependencies(path: str, content: str, by_stem: dict, all_paths: set) -> list:
+    deps = []
+    if path.endswith((".java", ".kt")):
+        deps += [by_stem.get(i.rsplit(".", 1)[-1]) for i in JAVA_IMPORT_RE.findall(content)]
+    if path.endswith((".ts", ".tsx", ".js", ".jsx")):
+        base = os.path.dirname(path)
+        for rel in JS_IMPORT_RE.findall(content):
+            target = os.path.normpath(os.path.join(base, rel)).replace("\\", "/")
+            deps += [c for c in (target + ext for ext in ("", ".ts", ".tsx", ".js", ".jsx", "/index.ts", "/index.js"))
+                     if c in all_paths][:1]
+    if path.endswith(".py"):
+        for a, b in PY_IMPORT_RE.findall(content):
+            deps.append(by_stem.get((a or b).rsplit(".", 1)[-1]))
+    if path.endswith((".java", ".kt", ".cs")):
+        # same-package types need no import
+        folder = os.path.dirname(path)
+        deps += [by_stem[t] for t in set(TYPE_REF_RE.findall(content))
+                 if t in by_stem and os.path.dirname(by_stem[t]) == folder]
+    return [d for d in dict.fromkeys(deps) if d and d != path]
+
+
+def _windows(content: str, lines: list, radius: int) -> str:
+    src = content.splitlines()
+    spans = []
+    for ln in sorted(set(lines)):
+        lo, hi = max(ln - radius, 1), min(ln + radius, len(src))
+        if spans and lo <= spans[-1][1] + 1:
+            spans[-1][1] = max(spans[-1][1], hi)
+        else:
+            spans.append([lo, hi])
+    # imports/package header always help the model write a correct patch
+    head = min(15, len(src))
+    if not spans or spans[0][0] > head + 1:
+        spans.insert(0, [1, head])
+    out = []
+    for lo, hi in spans:
+        out.append(f"// ---- lines {lo}-{hi} ----")
+        out.extend(src[lo - 1:hi])
+    return "\n".join(out)
+
+
+def build_fix_context(parsed_errors: list, error_block: str, all_paths: list, reader,
+                      fallback_files: list = None, token_budget: int = None, radius: int = None) -> dict:
+    """
+    reader(paths) -> [{"path", "content"}] (FileScannerAgent.read_files)
+    Returns {"files": [{"path", "content", "excerpt"?, "reason"}],
+             "sources": {path: full content}, "tokens": int}
+    Falls back to `fallback_files` when no error location resolves.
+    """
+    token_budget = token_budget or int(os.getenv("FIX_CONTEXT_TOKENS", "12000"))
+    radius = radius or int(os.getenv("FIX_CONTEXT_WINDOW", "30"))
+    allow_excerpts = edit_protocol() == "patch"
+
+    locations = _error_locations(parsed_errors, error_block, all_paths)
+    if not locations:
+        return {"files": list(fallback_files or []),
+                "sources": {f["path"]: f.get("content") for f in fallback_files or []}, "tokens": None}
+
+    by_stem = {}
+    for p in all_paths:
+        if p.endswith(SOURCE_EXTS):
+            by_stem.setdefault(_stem(p), p)
+
+    sources = {f["path"]: f["content"] for f in reader(list(locations)) if f.get("content") is not None}
+
+    symbol_files = [by_stem[s] for s in sorted(_error_symbols(parsed_errors, error_block)) if s in by_stem]
+    dep_files = []
+    for p in locations:
+        if p in sources:
+            dep_files += _dependencies(p, sources[p], by_stem, set(all_paths))
+    extra = [p for p in dict.fromkeys(symbol_files + dep_files) if p not in sources]
+    if extra:
+        sources.update({f["path"]: f["content"] for f in reader(extra) if f.get("content") is not None})
+
+    candidates = [(p, "error") for p in locations] + \
+                 [(p, "symbol") for p in symbol_files] + [(p, "dependency") for p in dep_files]
+    files, seen, used = [], set(), 0
+    for path, reason in candidates:
+        if path in seen or path not in sources:
+            continue
+        seen.add(path)
+        content = sources[path]
+        cost = approx_tokens(content)
+        if used + cost <= token_budget and (reason == "error" or cost <= token_budget // 4):
+            files.append({"path": path, "content": content, "reason": reason})
+            used += cost
+            continue
+        if not allow_excerpts:
+            continue
+        lines = locations.get(path) if reason == "error" else None
+        if lines:
+            excerpt = _windows(content, lines, radius)
+        else:
+            excerpt = "\n".join(content.splitlines()[:60])  # header: imports + declarations
+        cost = approx_tokens(excerpt)
+        if used + cost <= token_budget:
+            files.append({"path": path, "content": excerpt, "excerpt": True, "reason": reason})
+            used += cost
+
+    print(f"🧩 Fix context: {len(files)} file(s), ~{used} tokens "
+          f"({sum(1 for f in files if f.get('excerpt'))} excerpt(s))")
+    return {"files": files, "sources": sources, "tokens": used}
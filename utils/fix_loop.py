@@ -0,0 +1,87 @@
+# utils/fix_loop.py
+"""
+Convergence guard for the build → summarize → fix → build loop.
+
+Each failing iteration is reduced to an error fingerprint. The loop stops when:
+  - the iteration cap is reached,
+  - the same fingerprint repeats (the fixer is not making progress),
+  - an older fingerprint comes back (fixes oscillate between two states),
+  - the wall-clock or LLM token budget is spent.
+"""
+import hashlib
+import os
+import re
+import time
+from utils.log_parsers import strip_ansi
+
+_VOLATILE_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ][\d:.,]+Z?"      # timestamps
+    r"|0x[0-9a-fA-F]+|@[0-9a-f]{6,}"        # addresses / hashes
+    r"|\b\d+\b"                             # line numbers, pids, counters
+)
+
+
+def _normalize(text: str) -> str:
+    return _VOLATILE_RE.sub("#", strip_ansi(text)).strip()
+
+
+def error_fingerprint(parsed_errors: list = None, error_block: str = "") -> str:
+    """Stable hash of *what* failed, ignoring line numbers and timestamps."""
+    if parsed_errors:
+        keys = sorted({
+            f"{os.path.basename(e.get('file') or '')}|{e.get('code') or ''}|{_normalize(e.get('message', ''))}"
+            for e in parsed_errors
+        })
+    else:
+        lines = [_normalize(l) for l in (error_block or "").splitlines()]
+        keys = [l for l in lines if l][:40]
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+class FixLoopController:
+    def __init__(self, max_iterations: int = None, max_repeats: int = None,
+                 time_budget_s: float = None, token_budget: int = None):
+        self.max_iterations = max_iterations or int(os.getenv("FIX_LOOP_MAX_ITERATIONS", "5"))
+        self.max_repeats = max_repeats or int(os.getenv("FIX_LOOP_MAX_REPEATS", "2"))
+        self.time_budget_s = time_budget_s or float(os.getenv("FIX_LOOP_TIME_BUDGET_S", "900"))
+        self.token_budget = token_budget or int(os.getenv("FIX_LOOP_TOKEN_BUDGET", "200000"))
+
+    def recursion_limit(self) -> int:
+        # linear pipeline (~15 nodes) + up to 6 nodes per fix iteration
+        return 25 + 6 * (self.max_iterations + 1)
+
+    def new_loop(self) -> dict:
+        return {"iteration": 0, "fingerprints": [], "started_at": time.time(), "tokens": 0, "stopped": None}
+
+    def record_tokens(self, loop: dict, usage: dict) -> dict:
+        used = (usage or {}).get("prompt_tokens", 0) + (usage or {}).get("completion_tokens", 0)
+        return {**loop, "tokens": loop.get("tokens", 0) + used}
+
+    def check(self, loop: dict, fingerprint: str) -> dict:
+        """
+        Registers one failing iteration and returns the updated loop state;
+        loop["stopped"] holds the reason when the loop must end.
+        """
+        loop = dict(loop or self.new_loop())
+        history = list(loop.get("fingerprints", []))
+
+        reason = None
+        if loop["iteration"] >= self.max_iterations:
+            reason = "max_iterations"
+        elif history and history[-1] == fingerprint and \
+                len(history) >= self.max_repeats and all(f == fingerprint for f in history[-self.max_repeats:]):
+            reason = "repeated_error"
+        elif fingerprint in history[:-1] and history[-1] != fingerprint:
+            reason = "oscillating"
+        elif time.time() - loop["started_at"] > self.time_budget_s:
+            reason = "time_budget"
+        elif loop.get("tokens", 0) > self.token_budget:
+            reason = "token_budget"
+
+        history.append(fingerprint)
+        loop["fingerprints"] = history
+        if reason:
+            loop["stopped"] = reason
+        else:
+            loop["iteration"] += 1
+        return loop
@@ -0,0 +1,314 @@
+# utils/fix_memory.py
+"""
+Fix memory: error fingerprint → edits that resolved it before.
+
+A fingerprint is (error code, message template, file role), so the same
+mistake in a different entity/controller maps to the same entry. Entries
+hold small, re-playable operations instead of whole files:
+
+    {"type": "add_import", "line": "import jakarta.persistence.Entity;"}
+    {"type": "replace", "search": "javax.persistence", "replace": "jakarta.persistence"}
+
+Two sources:
+  - built-in templates for well-known compile errors (missing imports,
+    javax → jakarta)
+  - operations learned from LLM fixes (added imports, 1:1 line rewrites)
+
+Every replay is scored against the next build; entries whose success
+rate drops are evicted.
+"""
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from constants.storage import VAR_DIR
+
+MEMORY_PATH = os.path.join(VAR_DIR, "fix_memory.json")
+MAX_ENTRIES = 500
+MIN_ATTEMPTS_FOR_EVICTION = 3
+MIN_SUCCESS_RATE = 0.5
+
+# Simple class name → import, for "cannot find symbol: class X"
+KNOWN_IMPORTS = {
+    "Entity": "jakarta.persistence.Entity",
+    "Table": "jakarta.persistence.Table",
+    "Id": "jakarta.persistence.Id",
+    "GeneratedValue": "jakarta.persistence.GeneratedValue",
+    "GenerationType": "jakarta.persistence.GenerationType",
+    "Column": "jakarta.persistence.Column",
+    "OneToMany": "jakarta.persistence.OneToMany",
+    "ManyToOne": "jakarta.persistence.ManyToOne",
+    "OneToOne": "jakarta.persistence.OneToOne",
+    "ManyToMany": "jakarta.persistence.ManyToMany",
+    "JoinColumn": "jakarta.persistence.JoinColumn",
+    "CascadeType": "jakarta.persistence.CascadeType",
+    "FetchType": "jakarta.persistence.FetchType",
+    "JpaRepository": "org.springframework.data.jpa.repository.JpaRepository",
+    "Query": "org.springframework.data.jpa.repository.Query",
+    "Repository": "org.springframework.stereotype.Repository",
+    "Service": "org.springframework.stereotype.Service",
+    "Component": "org.springframework.stereotype.Component",
+    "Autowired": "org.springframework.beans.factory.annotation.Autowired",
+    "Transactional": "org.springframework.transaction.annotation.Transactional",
+    "RestController": "org.springframework.web.bind.annotation.RestController",
+    "RequestMapping": "org.springframework.web.bind.annotation.RequestMapping",
+    "GetMapping": "org.springframework.web.bind.annotation.GetMapping",
+    "PostMapping": "org.springframework.web.bind.annotation.PostMapping",
+    "PutMapping": "org.springframework.web.bind.annotation.PutMapping",
+    "DeleteMapping": "org.springframework.web.bind.annotation.DeleteMapping",
+    "PathVariable": "org.springframework.web.bind.annotation.PathVariable",
+    "RequestBody": "org.springframework.web.bind.annotation.RequestBody",
+    "RequestParam": "org.springframework.web.bind.annotation.RequestParam",
+    "CrossOrigin": "org.springframework.web.bind.annotation.CrossOrigin",
+    "ResponseEntity": "org.springframework.http.ResponseEntity",
+    "HttpStatus": "org.springframework.http.HttpStatus",
+    "List": "java.util.List",
+    "ArrayList": "java.util.ArrayList",
+    "Map": "java.util.Map",
+    "HashMap": "java.util.HashMap",
+    "Optional": "java.util.Optional",
+    "LocalDate": "java.time.LocalDate",
+    "LocalDateTime": "java.time.LocalDateTime",
+}
+
+JAVAX_RE = re.compile(r"package javax\.(persistence|validation|servlet|annotation|transaction)\b")
+MISSING_CLASS_RE = re.compile(r"cannot find symbol[\s\S]*?symbol:\s+class (\w+)")
+IMPORT_RE = re.compile(r"^\s*import\s+[\w.*]+\s*;\s*$")
+
+FILE_ROLES = [
+    ("test", re.compile(r"(^|/)(src/test/|tests?/)|Tests?\.\w+$")),
+    ("controller", re.compile(r"Controller\.\w+$")),
+    ("service", re.compile(r"Service(Impl)?\.\w+$")),
+    ("repository", re.compile(r"(Repository|Repo|Dao)\.\w+$")),
+    ("config", re.compile(r"Config(uration)?\.\w+$")),
+    ("dto", re.compile(r"(Dto|DTO|Request|Response)\.\w+$")),
+    ("entity", re.compile(r"/(model|entity|entities|domain)/")),
+]
+
+
+def file_role(path: str) -> str:
+    p = (path or "").replace("\\", "/")
+    for role, rx in FILE_ROLES:
+        if rx.search(p):
+            return role
+    return os.path.splitext(p)[1].lstrip(".") or "file"
+
+
+def message_template(message: str) -> str:
+    msg = re.sub(r"\s*\(location:[^)]*\)", "", message or "")
+    msg = re.sub(r"\b\d+\b", "<N>", msg)
+    return re.sub(r"\s+", " ", msg).strip()
+
+
+def error_key(error: dict) -> str:
+    return f"{error.get('code') or '-'}|{message_template(error.get('message', ''))}|{file_role(error.get('file', ''))}"
+
+
+def _templated_ops(error: dict):
+    msg = error.get("message", "")
+    m = JAVAX_RE.search(msg)
+    if m:
+        pkg = m.group(1)
+        return [{"type": "replace", "search": f"javax.{pkg}", "replace": f"jakarta.{pkg}"}]
+    m = MISSING_CLASS_RE.search(msg)
+    if m and m.group(1) in KNOWN_IMPORTS:
+        return [{"type": "add_import", "line": f"import {KNOWN_IMPORTS[m.group(1)]};"}]
+    return None
+
+
+def apply_ops(content: str, ops: list):
+    """Applies operations; returns the new content or None if any op misses."""
+    lines = content.splitlines()
+    for op in ops:
+        if op["type"] == "add_import":
+            if any(l.strip() == op["line"] for l in lines):
+                continue
+            idx = max((i for i, l in enumerate(lines) if IMPORT_RE.match(l)), default=None)
+            if idx is None:
+                idx = next((i for i, l in enumerate(lines) if l.strip().startswith("package ")), -1)
+            lines.insert(idx + 1, op["line"])
+        elif op["type"] == "replace":
+            text = "\n".join(lines)
+            if op["search"] not in text:
+                return None
+            lines = text.replace(op["search"], op["replace"]).splitlines()
+        elif op["type"] == "replace_line":
+            hits = [i for i, l in enumerate(lines) if l.strip() == op["search"]]
+            if len(hits) != 1:
+                return None
+            indent = lines[hits[0]][:len(lines[hits[0]]) - len(lines[hits[0]].lstrip())]
+            lines[hits[0]] = indent + op["replace"]
+        else:
+            return None
+    new = "\n".join(lines) + ("\n" if content.endswith("\n") else "")
+    return new if new != content else None
+
+
+def learn_ops(before: str, after: str, max_ops: int = 5):
+    """Extracts re-playable ops from a fixer rewrite, or None if it is not small/generic."""
+    ops = []
+    a, b = before.splitlines(), after.splitlines()
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        removed, added = a[i1:i2], b[j1:j2]
+        if tag == "insert" and all(IMPORT_RE.match(l) for l in added):
+            ops.extend({"type": "add_import", "line": l.strip()} for l in added)
+        elif tag == "replace" and len(removed) == len(added):
+            ops.extend({"type": "replace_line", "search": r.strip(), "replace": n.strip()}
+                       for r, n in zip(removed, added) if r.strip())
+        else:
+            return None
+        if len(ops) > max_ops:
+            return None
+    return ops or None
+
+
+class FixMemory:
+    def __init__(self, path: str = MEMORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _ops_for(self, error: dict):
+        entry = self._entries.get(error_key(error))
+        if entry and not entry.get("disabled"):
+            return entry["ops"], "learned" if entry.get("source") == "learned" else "template"
+        ops = _templated_ops(error)
+        return (ops, "template") if ops else (None, None)
+
+    # -----------------------------------------------------------
+    # Lookup: cached/templated edits for ALL errors, else None
+    # -----------------------------------------------------------
+    def suggest(self, errors: list, files: dict):
+        """
+        errors: parsed errors with workspace-relative "path"
+        files: {path: content}
+        Returns {"edits": [...], "fingerprints": [...]} only if every error
+        is covered by a patch that applies cleanly; otherwise None.
+        """
+        if not errors:
+            return None
+        with self._lock:
+            contents = dict(files)
+            fingerprints = []
+            for err in errors:
+                path = err.get("path")
+                if path not in contents or contents[path] is None:
+                    return None
+                ops, _ = self._ops_for(err)
+                if not ops:
+                    return None
+                new = apply_ops(contents[path], ops)
+                if new is None:
+                    # already applied for an earlier error in the same file?
+                    if all(op["type"] == "add_import" for op in ops):
+                        new = contents[path]
+                    else:
+                        return None
+                contents[path] = new
+                fingerprints.append(error_key(err))
+
+        edits = [
+            {"path": p, "action": "update", "content": c}
+            for p, c in contents.items() if c != files.get(p)
+        ]
+        if not edits:
+            return None
+        return {"edits": edits, "fingerprints": sorted(set(fingerprints))}
+
+    # -----------------------------------------------------------
+    # Learning from LLM fixes
+    # -----------------------------------------------------------
+    def learn(self, errors: list, before: dict, edits: list):
+        """Stores ops from an LLM fix for each error whose file it rewrote."""
+        after = {e["path"]: e.get("content") for e in edits if e.get("content")}
+        learned = []
+        with self._lock:
+            for err in errors:
+                path = err.get("path")
+                if path not in after or not before.get(path):
+                    continue
+                key = error_key(err)
+                if key in self._entries or _templated_ops(err):
+                    continue
+                ops = learn_ops(before[path], after[path])
+                if not ops:
+                    continue
+                self._entries[key] = {
+                    "ops": ops, "source": "learned", "attempts": 0, "successes": 0,
+                    "created_at": time.time(), "last_used": time.time(),
+                }
+                learned.append(key)
+            if learned:
+                self._evict()
+                self._save()
+        return learned
+
+    # -----------------------------------------------------------
+    # Outcome tracking + eviction
+    # -----------------------------------------------------------
+    def record_outcome(self, fingerprints: list, remaining_errors: list):
+        """A fingerprint succeeded if it no longer appears after the rebuild."""
+        if not fingerprints:
+            return
+        still = {error_key(e) for e in remaining_errors or []}
+        with self._lock:
+            for key in fingerprints:
+                entry = self._entries.setdefault(key, {
+                    "ops": None, "source": "template", "attempts": 0, "successes": 0,
+                    "created_at": time.time(),
+                })
+                entry["attempts"] += 1
+                entry["successes"] += 0 if key in still else 1
+                entry["last_used"] = time.time()
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        for key, entry in list(self._entries.items()):
+            if entry["attempts"] >= MIN_ATTEMPTS_FOR_EVICTION and \
+                    entry["successes"] / entry["attempts"] < MIN_SUCCESS_RATE:
+                if entry.get("source") == "learned":
+                    del self._entries[key]
+                else:
+                    entry["disabled"] = True  # stop replaying a bad template
+        if len(self._entries) > MAX_ENTRIES:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k].get("last_used", 0))
+            for key in oldest[:len(self._entries) - MAX_ENTRIES]:
+                del self._entries[key]
+
+
+def enabled() -> bool:
+    return os.getenv("FIX_MEMORY", "on").lower() not in ("0", "off", "false")
+
+
+def with_workspace_paths(errors: list, project_root: str = None, workspace: str = "/workspace") -> list:
+    """Adds a workspace-relative "path" (what the scanner/writer use) to each parsed error."""
+    out = []
+    for e in errors or []:
+        f = (e.get("file") or "").replace("\\", "/")
+        if not f:
+            continue
+        full = f if f.startswith("/") else os.path.join(project_root or workspace, f)
+        rel = os.path.relpath(os.path.normpath(full), workspace).replace("\\", "/")
+        if rel.startswith("../"):
+            continue
+        out.append({**e, "path": rel})
+    return out
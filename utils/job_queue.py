@@ -0,0 +1,243 @@
+# utils/job_queue.py
+"""
+Durable build queue in SQLite, shared by API processes (producers) and
+build workers (consumers, see app/worker.py).
+
+A job is one execute_build_graph call. Workers claim jobs with a lease and
+extend it while they heartbeat; a job whose lease lapses (worker killed,
+host gone) is re-queued by whichever worker notices first and retried with
+resume=True, so it continues from its graph checkpoint instead of starting
+over. After max_attempts the job is marked failed.
+
+Job status: queued -> running -> done | need_clarification | failed
+
+BUILD_QUEUE_DB (default <VAR_DIR>/jobs.sqlite) must be on storage every
+producer and worker can lock. On one host the default WAL journal is used;
+when workers on several hosts share the file over a volume with working
+POSIX locks, set BUILD_QUEUE_JOURNAL=DELETE (WAL needs shared memory).
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from constants.storage import VAR_DIR
+
+QUEUE_PATH = os.getenv("BUILD_QUEUE_DB", os.path.join(VAR_DIR, "jobs.sqlite"))
+LEASE_S = float(os.getenv("BUILD_JOB_LEASE_S", "60"))
+MAX_ATTEMPTS = int(os.getenv("BUILD_JOB_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_S = float(os.getenv("BUILD_JOB_RETRY_BACKOFF_S", "5"))
+JOURNAL_MODE = os.getenv("BUILD_QUEUE_JOURNAL", "WAL").upper()
+if JOURNAL_MODE not in ("WAL", "DELETE", "TRUNCATE", "PERSIST"):
+    JOURNAL_MODE = "WAL"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    build_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_until REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, not_before, created);
+CREATE INDEX IF NOT EXISTS jobs_build ON jobs (build_id, created);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    concurrency INTEGER,
+    running INTEGER,
+    started REAL,
+    heartbeat REAL
+);
+"""
+
+FINISHED = ("done", "need_clarification", "failed")
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    def __init__(self, path: str = QUEUE_PATH, lease_s: float = LEASE_S):
+        self.path = path
+        self.lease_s = lease_s
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    # one connection per thread; WAL lets readers (status polls) run beside the single writer
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    class _Tx:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+    def _tx(self):
+        return self._Tx(self._conn())
+
+    @staticmethod
+    def _row(row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # -----------------------------------------------------------
+    # producers
+    # -----------------------------------------------------------
+    def enqueue(self, payload: dict, build_id: str = None, max_attempts: int = None) -> dict:
+        job_id = uuid.uuid4().hex
+        build_id = build_id or payload.get("build_id") or uuid.uuid4().hex
+        payload = {**payload, "build_id": build_id}
+        with self._tx() as db:
+            active = db.execute(
+                "SELECT id FROM jobs WHERE build_id = ? AND status IN ('queued', 'running')", (build_id,)
+            ).fetchone()
+            if active:
+                raise ValueError(f"build {build_id} already has an active job {active['id']}")
+            db.execute(
+                "INSERT INTO jobs (id, build_id, status, payload, max_attempts, created) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, build_id, json.dumps(payload), max_attempts or MAX_ATTEMPTS, time.time()),
+            )
+        return {"job_id": job_id, "build_id": build_id, "status": "queued"}
+
+    def get(self, job_id: str) -> dict:
+        return self._row(self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def latest_for_build(self, build_id: str) -> dict:
+        return self._row(self._conn().execute(
+            "SELECT * FROM jobs WHERE build_id = ? ORDER BY created DESC LIMIT 1", (build_id,)
+        ).fetchone())
+
+    def is_active(self, build_id: str) -> bool:
+        """A job for this build is queued (incl. awaiting retry) or running."""
+        return self._conn().execute(
+            "SELECT 1 FROM jobs WHERE build_id = ? AND status IN ('queued', 'running') LIMIT 1", (build_id,)
+        ).fetchone() is not None
+
+    def position(self, job_id: str) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < (SELECT created FROM jobs WHERE id = ?)",
+            (job_id,),
+        ).fetchone()
+        return row[0]
+
+    def stats(self) -> dict:
+        db = self._conn()
+        counts = {r["status"]: r["n"] for r in db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+        alive = time.time() - 3 * self.lease_s
+        workers = [dict(r) for r in db.execute("SELECT * FROM workers WHERE heartbeat >= ? ORDER BY id", (alive,))]
+        return {"jobs": counts, "workers": workers,
+                "capacity": sum(w["concurrency"] or 0 for w in workers),
+                "running": sum(w["running"] or 0 for w in workers)}
+
+    # -----------------------------------------------------------
+    # workers
+    # -----------------------------------------------------------
+    def claim(self, worker_id: str) -> dict:
+        now = time.time()
+        with self._tx() as db:
+            row = db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' AND not_before <= ? ORDER BY created LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, attempts = attempts + 1, lease_until = ?,"
+                " started = ? WHERE id = ?",
+                (worker_id, now + self.lease_s, now, row["id"]),
+            )
+            return self._row(db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, worker_id: str, job_ids: list, concurrency: int = None):
+        now = time.time()
+        with self._tx() as db:
+            for job_id in job_ids:
+                db.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                           (now + self.lease_s, job_id, worker_id))
+            db.execute(
+                "INSERT INTO workers (id, host, pid, concurrency, running, started, heartbeat) VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET running = excluded.running, heartbeat = excluded.heartbeat,"
+                " concurrency = COALESCE(excluded.concurrency, workers.concurrency)",
+                (worker_id, socket.gethostname(), os.getpid(), concurrency, len(job_ids), now, now),
+            )
+
+    def unregister(self, worker_id: str):
+        with self._tx() as db:
+            db.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    def complete(self, job_id: str, worker_id: str, result: dict, status: str = "done") -> bool:
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished = ?, lease_until = NULL"
+                " WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (status, json.dumps(result, default=str), time.time(), job_id, worker_id),
+            )
+            # False: the lease was lost and another worker owns the job now
+            return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> str:
+        now = time.time()
+        with self._tx() as db:
+            job = db.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                             (job_id, worker_id)).fetchone()
+            if job is None:
+                return None
+            if retry and job["attempts"] < job["max_attempts"]:
+                status, not_before = "queued", now + RETRY_BACKOFF_S * job["attempts"]
+            else:
+                status, not_before = "failed", 0
+            db.execute(
+                "UPDATE jobs SET status = ?, error = ?, worker_id = NULL, lease_until = NULL, not_before = ?,"
+                " finished = CASE WHEN ? = 'failed' THEN ? ELSE NULL END WHERE id = ?",
+                (status, error[-4000:], not_before, status, now, job_id),
+            )
+            return status
+
+    def requeue_expired(self) -> list:
+        """Jobs whose worker stopped heartbeating go back to the queue (or fail when out of attempts)."""
+        now = time.time()
+        with self._tx() as db:
+            rows = db.execute(
+                "SELECT id, worker_id, attempts, max_attempts FROM jobs WHERE status = 'running' AND lease_until < ?",
+                (now,),
+            ).fetchall()
+            for r in rows:
+                status = "queued" if r["attempts"] < r["max_attempts"] else "failed"
+                db.execute(
+                    "UPDATE jobs SET status = ?, worker_id = NULL, lease_until = NULL,"
+                    " error = ?, finished = CASE WHEN ? = 'failed' THEN ? ELSE NULL END WHERE id = ?",
+                    (status, f"worker {r['worker_id']} lost its lease", status, now, r["id"]),
+                )
+            db.execute("DELETE FROM workers WHERE heartbeat < ?", (now - 10 * self.lease_s,))
+        return [dict(r) for r in rows]
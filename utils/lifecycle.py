@@ -0,0 +1,234 @@
+# utils/lifecycle.py
+"""
+Build container lifecycle: labels, teardown policy, workspace snapshots
+and a background reaper for orphaned containers.
+
+Every container DockerAgent creates is labelled with its build id and
+creation time (next to the admission labels in utils/admission.py), so it
+can be found again without any in-process state:
+
+  finished build        -> finalize stops the app, optionally snapshots
+                           /workspace, then removes the container
+  paused (clarification) or failed with an exception
+                        -> the container is stopped, not removed: it no
+                           longer counts against host capacity, and a
+                           resumed build restarts it (DockerAgent.reattach)
+  nobody came back      -> the reaper removes it once it is older than
+                           CONTAINER_TTL_S
+
+Env:
+  CONTAINER_TEARDOWN=always    always | success (keep failed builds, stopped,
+                               until the reaper) | never
+  CONTAINER_SNAPSHOT=off       off | on | failed: archive /workspace to
+                               <VAR_DIR>/snapshots/<build_id>.tar.gz before removal
+  CONTAINER_SNAPSHOT_EXCLUDE   comma-separated directory names left out of
+                               snapshots (build output, installed packages)
+  CONTAINER_REAPER=on
+  CONTAINER_TTL_S=21600        age after which an inactive build container is reaped
+  CONTAINER_REAP_INTERVAL_S=300
+"""
+import os
+import tarfile
+import threading
+import time
+from contextlib import contextmanager
+from constants.storage import VAR_DIR
+from utils import metrics
+from utils.admission import MANAGED_LABEL
+
+BUILD_LABEL = "solution-builder.build_id"
+CREATED_LABEL = "solution-builder.created"
+
+SNAPSHOT_DIR = os.path.join(VAR_DIR, "snapshots")
+DEFAULT_SNAPSHOT_EXCLUDE = "node_modules,target,build,dist,bin,obj,.gradle,.m2,__pycache__,.venv,venv"
+
+CONTAINER_TEARDOWNS = metrics.Counter("sb_container_teardowns_total", "Build containers torn down", ["action", "reason"])
+
+# build ids running in this process; the reaper never touches their containers
+_active = set()
+_active_lock = threading.Lock()
+# extra is_active(build_id) checks, e.g. the job queue for builds run by other processes
+_activity_checks = []
+
+
+def build_labels(build_id: str) -> dict:
+    return {BUILD_LABEL: build_id or "", CREATED_LABEL: str(int(time.time()))}
+
+
+@contextmanager
+def track(build_id: str):
+    with _active_lock:
+        _active.add(build_id)
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active.discard(build_id)
+
+
+def register_activity_check(fn):
+    _activity_checks.append(fn)
+
+
+def is_active(build_id: str) -> bool:
+    with _active_lock:
+        if build_id in _active:
+            return True
+    for check in _activity_checks:
+        try:
+            if check(build_id):
+                return True
+        except Exception as e:
+            print(f"⚠️ Activity check failed for build {build_id}: {e}; treating it as active")
+            return True
+    return False
+
+
+# -----------------------------------------------------------
+# policy
+# -----------------------------------------------------------
+def should_remove(status: str) -> bool:
+    policy = os.getenv("CONTAINER_TEARDOWN", "always").lower()
+    if policy == "never":
+        return False
+    if policy == "success":
+        return status == "success"
+    return True
+
+
+def should_snapshot(status: str) -> bool:
+    mode = os.getenv("CONTAINER_SNAPSHOT", "off").lower()
+    if mode in ("1", "on", "true", "always"):
+        return True
+    return mode == "failed" and status != "success"
+
+
+def snapshot_excludes() -> set:
+    raw = os.getenv("CONTAINER_SNAPSHOT_EXCLUDE", DEFAULT_SNAPSHOT_EXCLUDE)
+    return {p.strip() for p in raw.split(",") if p.strip()}
+
+
+def write_snapshot(stream, build_id: str, excludes: set = None) -> dict:
+    """
+    Re-packs a get_archive stream into <SNAPSHOT_DIR>/<build_id>.tar.gz,
+    dropping excluded directories. Streams member by member, so the
+    workspace is never held in memory.
+    """
+    excludes = snapshot_excludes() if excludes is None else excludes
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = os.path.join(SNAPSHOT_DIR, f"{build_id}.tar.gz")
+    tmp = f"{path}.tmp"
+    files = skipped = 0
+    with _ChunkReader(stream) as raw, tarfile.open(fileobj=raw, mode="r|") as src, \
+            tarfile.open(tmp, mode="w:gz") as dst:
+        for member in src:
+            parts = member.name.split("/")
+            if excludes.intersection(parts if member.isdir() else parts[:-1]):
+                skipped += 1
+                continue
+            dst.addfile(member, src.extractfile(member) if member.isfile() else None)
+            files += member.isfile()
+    os.replace(tmp, path)
+    return {"path": path, "files": files, "skipped": skipped, "bytes": os.path.getsize(path)}
+
+
+class _ChunkReader:
+    """File-like view over the chunk iterator docker's get_archive returns."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = b""
+
+    def read(self, n=-1):
+        while n < 0 or len(self._buf) < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+        if n < 0:
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:n], self._buf[n:]
+        return out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        close = getattr(self._chunks, "close", None)
+        if close:
+            close()
+
+
+# -----------------------------------------------------------
+# reaper
+# -----------------------------------------------------------
+class ContainerReaper:
+    """
+    Periodically removes labelled build containers older than `ttl_s`
+    whose build is not active (see is_active).
+    """
+
+    def __init__(self, client, ttl_s: float = None, interval_s: float = None):
+        self.client = client
+        self.ttl_s = ttl_s or float(os.getenv("CONTAINER_TTL_S", "21600"))
+        self.interval_s = interval_s or float(os.getenv("CONTAINER_REAP_INTERVAL_S", "300"))
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def reap_once(self) -> list:
+        now = time.time()
+        reaped = []
+        for c in self.client.containers.list(all=True, filters={"label": MANAGED_LABEL}):
+            labels = c.labels or {}
+            try:
+                created = float(labels.get(CREATED_LABEL, ""))
+            except ValueError:
+                # labelled before build lifecycle labels existed: only clean up stopped ones
+                created = 0 if c.status != "running" else now
+            build_id = labels.get(BUILD_LABEL)
+            if now - created < self.ttl_s or (build_id and is_active(build_id)):
+                continue
+            try:
+                c.remove(force=True)
+            except Exception as e:
+                print(f"⚠️ Could not reap container {c.name}: {e}")
+                continue
+            CONTAINER_TEARDOWNS.inc(action="removed", reason="ttl")
+            reaped.append({"name": c.name, "build_id": build_id, "age_s": round(now - created)})
+            print(f"🧹 Reaped container {c.name} (build {build_id or '?'}, {(now - created) / 3600:.1f}h old)")
+        return reaped
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                self.reap_once()
+            except Exception as e:
+                print(f"⚠️ Container reaper failed: {e}")
+            self._stopping.wait(self.interval_s)
+
+    def start(self) -> "ContainerReaper":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="container-reaper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+
+
+_reaper = None
+
+
+def start_reaper(client):
+    """
+    Starts the process-wide reaper once (DockerAgent does, when it is
+    first built); no-op with CONTAINER_REAPER=off.
+    """
+    global _reaper
+    if os.getenv("CONTAINER_REAPER", "on").lower() in ("0", "off", "false"):
+        return None
+    if _reaper is None:
+        _reaper = ContainerReaper(client).start()
+        print(f"🧹 Container reaper started (ttl {_reaper.ttl_s:.0f}s, every {_reaper.interval_s:.0f}s)")
+    return _reaper
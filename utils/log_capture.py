@@ -0,0 +1,122 @@
+# utils/log_capture.py
+import gzip
+import os
+import re
+import time
+from collections import deque
+from constants.storage import LOG_DIR
+
+ERROR_LINE_RE = re.compile(r"ERROR|Exception|error:|error [A-Z]+\d+|FAIL|Caused by|Traceback")
+
+
+def spill_path_for(container_id: str, kind: str) -> str:
+    """Path of the compressed full log for one exec (build, runtime, ...)."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(LOG_DIR, f"{container_id[:12]}-{kind}-{stamp}-{time.time_ns() % 10**6}.log.gz")
+
+
+class LogCapture:
+    """
+    Bounded capture for streamed exec output.
+
+    Keeps:
+      - the first `head_lines` lines
+      - the last `tail_lines` lines (ring buffer)
+      - an index of error lines (+ a few lines after each) seen anywhere
+    and writes the complete output to a gzip file so nothing is lost.
+    Memory stays O(head + tail + errors) regardless of log size.
+    """
+
+    def __init__(self, spill_path: str = None, head_lines: int = 200, tail_lines: int = 800,
+                 max_error_lines: int = 400, error_context: int = 3):
+        self.head_lines = head_lines
+        self.max_error_lines = max_error_lines
+        self.error_context = error_context
+
+        self.head = []
+        self.tail = deque(maxlen=tail_lines)
+        self.error_lines = []  # [(line_no, text)]
+        self.line_count = 0
+        self.byte_count = 0
+
+        self._partial = ""
+        self._context_left = 0
+        self.spill_path = spill_path
+        self._spill = gzip.open(spill_path, "wt", encoding="utf-8") if spill_path else None
+
+    def feed(self, chunk):
+        if isinstance(chunk, bytes):
+            self.byte_count += len(chunk)
+            chunk = chunk.decode(errors="ignore")
+        else:
+            self.byte_count += len(chunk)
+        if self._spill:
+            self._spill.write(chunk)
+
+        data = self._partial + chunk
+        lines = data.split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line: str):
+        n = self.line_count
+        self.line_count += 1
+        if n < self.head_lines:
+            self.head.append(line)
+        else:
+            self.tail.append((n, line))
+
+        if len(self.error_lines) >= self.max_error_lines:
+            return
+        if ERROR_LINE_RE.search(line):
+            self.error_lines.append((n, line[:1000]))
+            self._context_left = self.error_context
+        elif self._context_left:
+            self.error_lines.append((n, line[:1000]))
+            self._context_left -= 1
+
+    def close(self):
+        if self._partial:
+            self._add_line(self._partial)
+            self._partial = ""
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+        return self
+
+    @property
+    def truncated(self) -> bool:
+        return self.line_count > len(self.head) + len(self.tail)
+
+    def text(self) -> str:
+        """Head + error lines from the omitted middle + tail."""
+        if not self.truncated:
+            return "\n".join(self.head + [l for _, l in self.tail])
+
+        first_tail = self.tail[0][0] if self.tail else self.line_count
+        omitted = first_tail - len(self.head)
+        middle = [l for n, l in self.error_lines if len(self.head) <= n < first_tail]
+
+        parts = ["\n".join(self.head)]
+        parts.append(f"... {omitted} line(s) omitted (full log: {self.spill_path or 'not kept'}) ...")
+        if middle:
+            parts.append("--- error lines from omitted section ---\n" + "\n".join(middle))
+            parts.append("--- end of omitted section ---")
+        parts.append("\n".join(l for _, l in self.tail))
+        return "\n".join(parts)
+
+    def summary(self) -> dict:
+        return {
+            "log_file": self.spill_path,
+            "log_lines": self.line_count,
+            "log_bytes": self.byte_count,
+            "log_truncated": self.truncated,
+            "error_line_count": len(self.error_lines),
+        }
+
+
+def read_full_log(path: str) -> str:
+    with gzip.open(path, "rt", encoding="utf-8", errors="ignore") as f:
+        return f.read()
@@ -0,0 +1,251 @@
+# utils/log_parsers.py
+"""
+Deterministic build-log parsers.
+
+Each parser recognises one toolchain's error format and turns it into
+structured errors:
+
+    {"file": str, "line": int | None, "column": int | None,
+     "message": str, "code": str | None, "severity": "error"}
+
+Parsers are tried in registry order; the first one that extracts at least
+one error wins. Register extra parsers with `register_parser`.
+"""
+import re
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]|\[[0-9;]*m")
+
+
+def strip_ansi(text: str) -> str:
+    return ANSI_RE.sub("", text)
+
+
+def _error(file, line, column, message, code=None):
+    return {
+        "file": file,
+        "line": int(line) if line else None,
+        "column": int(column) if column else None,
+        "message": message.strip(),
+        "code": code,
+        "severity": "error",
+    }
+
+
+class LogParser:
+    """
+    Base class. Subclasses set `name` and implement `parse(lines)`.
+    `detect(text)` is a cheap pre-check so most parsers never scan the log.
+    """
+    name = "base"
+    markers = ()
+
+    def detect(self, text: str) -> bool:
+        return any(m in text for m in self.markers)
+
+    def parse(self, lines: list) -> list:
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------
+# Maven + plain javac
+# ---------------------------------------------------------
+class MavenJavacParser(LogParser):
+    name = "maven"
+    markers = (".java:[", ": error:", "[ERROR]")
+
+    # [ERROR] /workspace/.../Foo.java:[12,8] cannot find symbol
+    MAVEN_RE = re.compile(r"^\[ERROR\]\s+(\S+\.java):\[(\d+),(\d+)\]\s*(.*)$")
+    # /workspace/.../Foo.java:12: error: cannot find symbol
+    JAVAC_RE = re.compile(r"^(\S+\.java):(\d+):\s*error:\s*(.*)$")
+    # "  symbol:   class Foo" / "  location: class Bar"
+    DETAIL_RE = re.compile(r"^(?:\[ERROR\])?\s+(symbol|location)\s*:\s*(.*)$")
+
+    def parse(self, lines):
+        errors = []
+        seen = set()
+        for line in lines:
+            m = self.MAVEN_RE.match(line)
+            if m:
+                key = m.group(1, 2, 3, 4)
+                if key in seen:
+                    # maven repeats compiler errors in the final summary
+                    continue
+                seen.add(key)
+                errors.append(_error(m.group(1), m.group(2), m.group(3), m.group(4)))
+                continue
+            m = self.JAVAC_RE.match(line)
+            if m:
+                key = (m.group(1), m.group(2), None, m.group(3))
+                if key in seen:
+                    continue
+                seen.add(key)
+                errors.append(_error(m.group(1), m.group(2), None, m.group(3)))
+                continue
+            m = self.DETAIL_RE.match(line)
+            if m and errors:
+                errors[-1]["message"] += f" ({m.group(1)}: {m.group(2).strip()})"
+        return errors
+
+
+# ---------------------------------------------------------
+# Gradle (javac + kotlinc output)
+# ---------------------------------------------------------
+class GradleParser(LogParser):
+    name = "gradle"
+    markers = ("> Task :", "FAILURE: Build failed", "BUILD FAILED")
+
+    # e: file:///src/Foo.kt:12:8 message   |   e: /src/Foo.kt: (12, 8): message
+    KOTLIN_RE = re.compile(r"^e:\s+(?:file://)?(\S+?\.kts?):?\s*\(?(\d+)[:,]\s*(\d+)\)?:?\s*(.*)$")
+    JAVAC_RE = MavenJavacParser.JAVAC_RE
+
+    def parse(self, lines):
+        errors = []
+        for line in lines:
+            m = self.JAVAC_RE.match(line)
+            if m:
+                errors.append(_error(m.group(1), m.group(2), None, m.group(3)))
+                continue
+            m = self.KOTLIN_RE.match(line)
+            if m:
+                errors.append(_error(m.group(1), m.group(2), m.group(3), m.group(4)))
+                continue
+            m = MavenJavacParser.DETAIL_RE.match(line)
+            if m and errors:
+                errors[-1]["message"] += f" ({m.group(1)}: {m.group(2).strip()})"
+        return errors
+
+
+# ---------------------------------------------------------
+# npm / tsc
+# ---------------------------------------------------------
+class TscParser(LogParser):
+    name = "tsc"
+    markers = ("error TS",)
+
+    # src/app.ts(12,5): error TS2304: Cannot find name 'x'.
+    PAREN_RE = re.compile(r"^(\S+\.[jt]sx?)\((\d+),(\d+)\):\s*error\s+(TS\d+):\s*(.*)$")
+    # src/app.ts:12:5 - error TS2304: Cannot find name 'x'.
+    COLON_RE = re.compile(r"^(\S+\.[jt]sx?):(\d+):(\d+)\s*-\s*error\s+(TS\d+):\s*(.*)$")
+
+    def parse(self, lines):
+        errors = []
+        for line in lines:
+            m = self.PAREN_RE.match(line) or self.COLON_RE.match(line)
+            if m:
+                errors.append(_error(m.group(1), m.group(2), m.group(3), m.group(5), code=m.group(4)))
+        return errors
+
+
+# ---------------------------------------------------------
+# pytest
+# ---------------------------------------------------------
+class PytestParser(LogParser):
+    name = "pytest"
+    markers = ("short test summary info", "FAILED ", "ERROR collecting", "== FAILURES ==")
+
+    # FAILED tests/test_api.py::test_create - AssertionError: assert 500 == 200
+    FAILED_RE = re.compile(r"^(?:FAILED|ERROR)\s+(\S+?\.py)(::\S+)?(?:\s+-\s+(.*))?$")
+    # tests/test_api.py:42: AssertionError
+    LOCATION_RE = re.compile(r"^(\S+?\.py):(\d+):\s+(\w+(?:Error|Exception)\w*)$")
+
+    def parse(self, lines):
+        locations = {}
+        for line in lines:
+            m = self.LOCATION_RE.match(line)
+            if m:
+                locations.setdefault(m.group(1), (m.group(2), m.group(3)))
+
+        errors = []
+        for line in lines:
+            m = self.FAILED_RE.match(line)
+            if not m:
+                continue
+            path = m.group(1)
+            line_no, exc = locations.get(path, (None, None))
+            message = m.group(3) or exc or "test failed"
+            if m.group(2):
+                message = f"{m.group(2)[2:]}: {message}"
+            errors.append(_error(path, line_no, None, message, code=exc))
+        return errors
+
+
+# ---------------------------------------------------------
+# dotnet / MSBuild
+# ---------------------------------------------------------
+class DotnetParser(LogParser):
+    name = "dotnet"
+    markers = ("error CS", "error MSB", "error NU")
+
+    # /src/Foo.cs(12,8): error CS0246: The type ... [/src/App.csproj]
+    RE = re.compile(r"^(\S+?)\((\d+),(\d+)\):\s*error\s+([A-Z]+\d+):\s*(.*?)(?:\s+\[[^\]]+\])?$")
+    # /src/App.csproj : error NU1101: Unable to find package ...
+    PROJECT_RE = re.compile(r"^(\S+?)\s*:\s*error\s+([A-Z]+\d+):\s*(.*?)(?:\s+\[[^\]]+\])?$")
+
+    def parse(self, lines):
+        errors = []
+        seen = set()
+        for line in lines:
+            m = self.RE.match(line)
+            if m:
+                err = _error(m.group(1), m.group(2), m.group(3), m.group(5), code=m.group(4))
+            else:
+                m = self.PROJECT_RE.match(line)
+                if not m:
+                    continue
+                err = _error(m.group(1), None, None, m.group(3), code=m.group(2))
+            # msbuild prints every error twice (inline + summary)
+            key = (err["file"], err["line"], err["column"], err["code"])
+            if key not in seen:
+                seen.add(key)
+                errors.append(err)
+        return errors
+
+
+PARSERS = [
+    GradleParser(),
+    MavenJavacParser(),
+    TscParser(),
+    DotnetParser(),
+    PytestParser(),
+]
+
+
+def register_parser(parser: LogParser, first: bool = False):
+    if first:
+        PARSERS.insert(0, parser)
+    else:
+        PARSERS.append(parser)
+
+
+def parse_logs(logs: str):
+    """
+    Returns {"parser": name, "errors": [...]} for the first parser that
+    recognises the log, or None when no parser does.
+    """
+    text = strip_ansi(logs)
+    lines = None
+    for parser in PARSERS:
+        if not parser.detect(text):
+            continue
+        if lines is None:
+            lines = [l.rstrip() for l in text.splitlines()]
+        errors = parser.parse(lines)
+        if errors:
+            return {"parser": parser.name, "errors": errors}
+    return None
+
+
+def format_errors(errors: list, limit: int = 50) -> str:
+    """Renders parsed errors back into a compact, compiler-like block."""
+    out = []
+    for e in errors[:limit]:
+        loc = e["file"]
+        if e.get("line"):
+            loc += f":{e['line']}"
+            if e.get("column"):
+                loc += f":{e['column']}"
+        code = f" {e['code']}" if e.get("code") else ""
+        out.append(f"{loc}: error{code}: {e['message']}")
+    if len(errors) > limit:
+        out.append(f"... {len(errors) - limit} more error(s)")
+    return "\n".join(out)
@@ -0,0 +1,232 @@
+# utils/metrics.py
+"""
+Process-wide metrics (Prometheus text format) plus a per-build rollup.
+
+Recorders are called from the instrumented clients (utils/clients.py) and
+the graph's node wrapper. Every observation goes to:
+  - the process registry, served on GET /metrics
+  - the current build's BuildMetrics (a contextvar set by `build_scope`),
+    attached to the build result for offline analysis
+
+No external dependency: counters and histograms render the text exposition
+format directly.
+"""
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from utils import tracing
+
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+ITERATION_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13)
+
+
+def _fmt_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            return [f"{self.name}{_fmt_labels(self.labelnames, k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["counts"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for key, e in self._values.items():
+                for bound, c in zip(self.buckets, e["counts"]):
+                    lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, [('le', bound)])} {c}")
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, [('le', '+Inf')])} {e['count']}")
+                lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {e['sum']}")
+                lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {e['count']}")
+        return lines
+
+
+REGISTRY = []
+
+NODE_DURATION = Histogram("sb_node_duration_seconds", "Graph node wall time", ["node", "status"])
+LLM_DURATION = Histogram("sb_llm_request_duration_seconds", "Groq chat.completions latency", ["agent", "status"])
+LLM_TOKENS = Counter("sb_llm_tokens_total", "LLM tokens by agent", ["agent", "kind"])
+DOCKER_CALLS = Counter("sb_docker_calls_total", "Docker API calls", ["op"])
+DOCKER_DURATION = Histogram("sb_docker_call_duration_seconds", "Docker call wall time", ["op"])
+DOCKER_BYTES = Counter("sb_docker_bytes_total", "Bytes moved to/from containers", ["direction"])
+FIX_LOOP_ITERATIONS = Histogram("sb_fix_loop_iterations", "Fix-loop iterations per build", ["stopped"], ITERATION_BUCKETS)
+BUILDS = Counter("sb_builds_total", "Finished builds", ["status"])
+
+
+def render() -> str:
+    out = []
+    for m in REGISTRY:
+        out.append(f"# HELP {m.name} {m.help}")
+        out.append(f"# TYPE {m.name} {m.type}")
+        out.extend(m.render())
+    return "\n".join(out) + "\n"
+
+
+# ---------------------------------------------------------------
+# Per-build rollup
+# ---------------------------------------------------------------
+class BuildMetrics:
+    def __init__(self, build_id: str = None):
+        self.build_id = build_id
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.nodes = {}
+        self.llm = {}
+        self.docker = {"exec_calls": 0, "exec_seconds": 0.0, "put_archive_calls": 0,
+                       "bytes_to_container": 0, "bytes_from_container": 0}
+        self.fix_loop_iterations = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "build_id": self.build_id,
+                "wall_seconds": round(time.time() - self.started, 3),
+                "nodes": {k: {**v, "seconds": round(v["seconds"], 3)} for k, v in self.nodes.items()},
+                "llm": {k: {**v, "seconds": round(v["seconds"], 3)} for k, v in self.llm.items()},
+                "docker": {**self.docker, "exec_seconds": round(self.docker["exec_seconds"], 3)},
+                "fix_loop_iterations": self.fix_loop_iterations,
+            }
+
+
+_current = contextvars.ContextVar("build_metrics", default=None)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def build_scope(build_id: str = None):
+    bm = BuildMetrics(build_id)
+    token = _current.set(bm)
+    try:
+        yield bm
+    finally:
+        _current.reset(token)
+
+
+# ---------------------------------------------------------------
+# Recorders
+# ---------------------------------------------------------------
+def observe_node(node: str, seconds: float, ok: bool = True):
+    NODE_DURATION.observe(seconds, node=node, status="ok" if ok else "error")
+    bm = current()
+    if bm:
+        with bm._lock:
+            e = bm.nodes.setdefault(node, {"calls": 0, "seconds": 0.0, "errors": 0})
+            e["calls"] += 1
+            e["seconds"] += seconds
+            e["errors"] += 0 if ok else 1
+
+
+def observe_llm(agent: str, seconds: float, usage=None, ok: bool = True):
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    LLM_DURATION.observe(seconds, agent=agent, status="ok" if ok else "error")
+    LLM_TOKENS.inc(prompt, agent=agent, kind="prompt")
+    LLM_TOKENS.inc(completion, agent=agent, kind="completion")
+    bm = current()
+    if bm:
+        with bm._lock:
+            e = bm.llm.setdefault(agent, {"requests": 0, "seconds": 0.0, "prompt_tokens": 0,
+                                          "completion_tokens": 0, "errors": 0})
+            e["requests"] += 1
+            e["seconds"] += seconds
+            e["prompt_tokens"] += prompt
+            e["completion_tokens"] += completion
+            e["errors"] += 0 if ok else 1
+
+
+def observe_docker(op: str, seconds: float = 0.0, bytes_to: int = 0, bytes_from: int = 0):
+    DOCKER_CALLS.inc(op=op)
+    if seconds:
+        DOCKER_DURATION.observe(seconds, op=op)
+    if bytes_to:
+        DOCKER_BYTES.inc(bytes_to, direction="to_container")
+    if bytes_from:
+        DOCKER_BYTES.inc(bytes_from, direction="from_container")
+    bm = current()
+    if bm:
+        with bm._lock:
+            d = bm.docker
+            if op in ("exec_run", "exec_start"):
+                d["exec_calls"] += 1
+                d["exec_seconds"] += seconds
+            elif op == "put_archive":
+                d["put_archive_calls"] += 1
+            d["bytes_to_container"] += bytes_to
+            d["bytes_from_container"] += bytes_from
+
+
+def observe_build(status: str, fix_loop: dict = None):
+    BUILDS.inc(status=status)
+    iterations = (fix_loop or {}).get("iteration", 0)
+    FIX_LOOP_ITERATIONS.observe(iterations, stopped=(fix_loop or {}).get("stopped") or "converged")
+    bm = current()
+    if bm:
+        bm.fix_loop_iterations = iterations
+
+
+def timed_node(name: str, fn):
+    """
+    Wraps a graph node so its wall time is recorded and it runs in a child
+    span of the build (signature preserved for LangGraph).
+    """
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        started = time.perf_counter()
+        ok = False
+        with tracing.span(f"node.{name}", {"graph.node": name, "build.id": state.get("build_id")}):
+            try:
+                result = fn(state, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                observe_node(name, time.perf_counter() - started, ok)
+    return wrapper
@@ -0,0 +1,161 @@
+# utils/patching.py
+"""
+Patch-based edit protocol shared by the writer and the fixer.
+
+An LLM edit may carry one of:
+  "content"  full file (create, or fallback)
+  "hunks"    [{"search": "<exact existing text>", "replace": "<new text>"}]
+  "diff"     unified diff against the current file
+
+Patches are applied against the host-side copy of the file (what was
+sent to the model). When a patch does not apply cleanly the caller asks
+for full content for that path only.
+"""
+import os
+import re
+
+HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+PATCH_FORMAT_INSTRUCTIONS = """
+For files whose current content is provided, prefer a patch over a full rewrite:
+  { "path": "...", "action": "patch", "hunks": [ { "search": "exact lines copied from the current file", "replace": "new lines" } ] }
+- "search" must match the current file exactly (including indentation) and be unique; include 2-3 surrounding lines if needed.
+- Hunks are applied in order; keep them small.
+- Use { "path": "...", "action": "create|update", "content": "full file" } for new files or near-total rewrites.
+"""
+
+
+class PatchError(Exception):
+    pass
+
+
+def edit_protocol() -> str:
+    return os.getenv("EDIT_PROTOCOL", "patch").lower()
+
+
+def is_patch(edit: dict) -> bool:
+    return bool(edit.get("hunks") or edit.get("diff")) and not edit.get("content")
+
+
+# ---------------------------------------------------------------
+# search/replace hunks
+# ---------------------------------------------------------------
+def _find_loose(content: str, search: str):
+    """Whitespace-tolerant line match; returns (start, end) char offsets or None."""
+    want = [l.strip() for l in search.strip("\n").splitlines()]
+    if not want:
+        return None
+    lines = content.splitlines(keepends=True)
+    offsets, pos = [], 0
+    for l in lines:
+        offsets.append(pos)
+        pos += len(l)
+    hits = [
+        i for i in range(len(lines) - len(want) + 1)
+        if all(lines[i + k].strip() == want[k] for k in range(len(want)))
+    ]
+    if len(hits) != 1:
+        return None
+    i = hits[0]
+    end = offsets[i + len(want) - 1] + len(lines[i + len(want) - 1].rstrip("\r\n"))
+    return offsets[i], end
+
+
+def apply_hunks(content: str, hunks: list) -> str:
+    for n, h in enumerate(hunks, 1):
+        search, replace = h.get("search", ""), h.get("replace", "")
+        if not search:
+            raise PatchError(f"hunk {n}: empty search")
+        count = content.count(search)
+        if count == 1:
+            content = content.replace(search, replace, 1)
+            continue
+        if count > 1:
+            raise PatchError(f"hunk {n}: search text is not unique ({count} matches)")
+        span = _find_loose(content, search)
+        if span is None:
+            raise PatchError(f"hunk {n}: search text not found")
+        start, end = span
+        # keep the file's indentation of the first matched line
+        indent = content[start:len(content) - len(content[start:].lstrip(" \t"))]
+        first = replace.lstrip("\n")
+        if first and not first[0].isspace():
+            replace = indent + first
+        content = content[:start] + replace.strip("\n") + content[end:]
+    return content
+
+
+# ---------------------------------------------------------------
+# unified diff
+# ---------------------------------------------------------------
+def _parse_diff(diff: str):
+    hunks, cur = [], None
+    for line in diff.splitlines():
+        m = HUNK_HEADER_RE.match(line)
+        if m:
+            cur = {"start": int(m.group(1)), "old": [], "new": []}
+            hunks.append(cur)
+        elif cur is None or line.startswith(("---", "+++")):
+            continue
+        elif line.startswith("+"):
+            cur["new"].append(line[1:])
+        elif line.startswith("-"):
+            cur["old"].append(line[1:])
+        elif line.startswith(" ") or line == "":
+            cur["old"].append(line[1:])
+            cur["new"].append(line[1:])
+        elif line.startswith("\\"):
+            continue
+    if not hunks:
+        raise PatchError("diff has no hunks")
+    return hunks
+
+
+def apply_unified_diff(content: str, diff: str) -> str:
+    lines = content.splitlines()
+    offset = 0
+    for n, h in enumerate(_parse_diff(diff), 1):
+        old, new = h["old"], h["new"]
+        expected = max(h["start"] - 1 + offset, 0)
+        # exact position first, then the nearest matching block
+        candidates = sorted(range(len(lines) - len(old) + 1), key=lambda i: abs(i - expected))
+        at = next((i for i in candidates if lines[i:i + len(old)] == old), None)
+        if at is None:
+            at = next((i for i in candidates
+                       if [l.strip() for l in lines[i:i + len(old)]] == [l.strip() for l in old]), None)
+        if at is None:
+            raise PatchError(f"diff hunk {n} does not apply")
+        lines[at:at + len(old)] = new
+        offset += len(new) - len(old)
+    return "\n".join(lines) + ("\n" if content.endswith("\n") else "")
+
+
+# ---------------------------------------------------------------
+# edit resolution
+# ---------------------------------------------------------------
+def resolve_edit(edit: dict, original: str) -> dict:
+    """Returns the edit as {"path", "action": "update", "content"}; raises PatchError."""
+    if not is_patch(edit):
+        return edit
+    if original is None:
+        raise PatchError("no current content to patch")
+    if edit.get("hunks"):
+        content = apply_hunks(original, edit["hunks"])
+    else:
+        content = apply_unified_diff(original, edit["diff"])
+    return {"path": edit["path"], "action": "update", "content": content, "patched": True}
+
+
+def resolve_edits(edits: list, originals: dict):
+    """
+    originals: {path: current content}
+    Returns (resolved edits, failed [{"path", "reason"}]).
+    """
+    resolved, failed = [], []
+    for e in edits:
+        try:
+            resolved.append(resolve_edit(e, originals.get(e.get("path"))))
+        except PatchError as ex:
+            print(f"⚠️ Patch for {e.get('path')} failed: {ex}")
+            failed.append({"path": e.get("path"), "reason": str(ex)})
+    return resolved, failed
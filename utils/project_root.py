@@ -0,0 +1,66 @@
+# utils/project_root.py
+import fnmatch
+import os
+import threading
+
+# Highest priority first (same order the runners always used)
+PROJECT_MARKERS = [
+    "pom.xml",               # Maven
+    "build.gradle",          # Gradle
+    "package.json",          # Node
+    "pyproject.toml",        # Python
+    "requirements.txt",      # Python
+    "*.csproj",              # .NET
+]
+
+# Never descend into build output / dependency folders
+PRUNE_DIRS = ["target", "node_modules", ".git", ".gradle", "bin", "obj", ".venv", "venv", "__pycache__"]
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def is_marker_path(path: str) -> bool:
+    name = os.path.basename(path)
+    return any(fnmatch.fnmatch(name, m) for m in PROJECT_MARKERS)
+
+
+def invalidate(container_id: str = None):
+    """Drop cached roots (all containers if container_id is None)."""
+    with _lock:
+        if container_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(container_id, None)
+
+
+def detect_project_root(client, container_id: str, workspace: str = "/workspace") -> str:
+    """
+    Returns the directory holding the highest-priority build marker.
+    One `find` per container: all markers in a single pass with heavy
+    directories pruned; the answer is cached until a writer adds or
+    removes a marker file (see `invalidate`).
+    """
+    with _lock:
+        if container_id in _cache:
+            return _cache[container_id]
+
+    prune = " -o ".join(f"-name '{d}'" for d in PRUNE_DIRS)
+    names = " -o ".join(f"-name '{m}'" for m in PROJECT_MARKERS)
+    cmd = f"bash -lc \"find {workspace} -type d \\( {prune} \\) -prune -o -type f \\( {names} \\) -print\""
+
+    container = client.containers.get(container_id)
+    ec, out = container.exec_run(cmd)
+    found = out.decode(errors="ignore").splitlines() if out else []
+
+    root = workspace  # fallback → assume workspace root
+    for marker in PROJECT_MARKERS:
+        match = next((p for p in found if fnmatch.fnmatch(os.path.basename(p), marker)), None)
+        if match:
+            # Strip filename → return folder containing it
+            root = os.path.dirname(match)
+            break
+
+    with _lock:
+        _cache[container_id] = root
+    return root
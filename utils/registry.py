@@ -0,0 +1,109 @@
+# utils/registry.py
+"""
+Lazy, injectable agent construction.
+
+Factories are registered by name (as "module:Class" strings, so the agent
+module and its clients are only imported on first use) and resolved once:
+
+    registry.register("docker_agent", "agents.docker_agent:DockerAgent")
+    docker_agent = registry.lazy("docker_agent")   # nothing built yet
+    docker_agent.create_environment(stack)         # built here, then cached
+
+Tests, benchmarks or alternative deployments inject their own instance or
+factory before first use:
+
+    registry.override("docker_agent", FakeDockerAgent())
+
+Agents that keep per-build state on the instance are registered with
+per_thread=True, so concurrent builds in one process (app/worker.py
+--concurrency) each get their own copy.
+"""
+import importlib
+import threading
+
+
+def _load(spec: str):
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class AgentRegistry:
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._per_thread = set()
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory, per_thread: bool = False):
+        """factory: a callable or a "module:Class" string (imported lazily)."""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            if per_thread:
+                self._per_thread.add(name)
+            else:
+                self._per_thread.discard(name)
+
+    def override(self, name: str, instance):
+        with self._lock:
+            self._instances[name] = instance
+
+    def _build(self, name: str):
+        if name not in self._factories:
+            raise KeyError(f"No agent registered as '{name}'")
+        factory = self._factories[name]
+        if isinstance(factory, str):
+            factory = _load(factory)
+        return factory()
+
+    def get(self, name: str):
+        inst = self._instances.get(name)
+        if inst is not None:
+            return inst
+        if name in self._per_thread:
+            local = getattr(self._local, "instances", None)
+            if local is None:
+                local = self._local.instances = {}
+            if name not in local:
+                local[name] = self._build(name)
+            return local[name]
+        with self._lock:
+            inst = self._instances.get(name)
+            if inst is None:
+                inst = self._instances[name] = self._build(name)
+            return inst
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances or name in (getattr(self._local, "instances", None) or {})
+
+    def reset(self, name: str = None):
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._local.instances = {}
+            else:
+                self._instances.pop(name, None)
+                (getattr(self._local, "instances", None) or {}).pop(name, None)
+
+    def lazy(self, name: str) -> "LazyAgent":
+        return LazyAgent(self, name)
+
+
+class LazyAgent:
+    """Module-level stand-in that builds the registered agent on first attribute access."""
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: AgentRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        state = "built" if self._registry.is_built(self._name) else "not built"
+        return f"<LazyAgent {self._name} ({state})>"
+
+
+registry = AgentRegistry()
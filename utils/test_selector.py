@@ -0,0 +1,77 @@
+# utils/test_selector.py
+"""
+Impacted-test selection for the incremental fix loop.
+
+Maps changed source files to the test files that reference them so the
+build runner can run those first (Surefire -Dtest=, Gradle --tests,
+Jest --findRelatedTests, pytest node ids, dotnet --filter). The full
+suite still runs as the final gate.
+"""
+import os
+import re
+
+# (test roots relative to the project root, grep --include globs)
+TEST_LAYOUTS = {
+    "maven": (["src/test"], ["*.java", "*.kt"]),
+    "gradle": (["src/test"], ["*.java", "*.kt", "*.groovy"]),
+    "python": (["tests", "test"], ["*.py"]),
+    "dotnet": (["."], ["*Tests.cs", "*Test.cs"]),
+}
+
+TEST_FILE_RE = re.compile(r"(^|/)(src/test/|tests?/|__tests__/)|(Tests?\.(java|kt|cs)$)|(\.(test|spec)\.[jt]sx?$)|(^|/)test_[^/]+\.py$")
+IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def is_test_path(path: str) -> bool:
+    return bool(TEST_FILE_RE.search(path.replace("\\", "/")))
+
+
+def _relative_to_root(path: str, project_root: str, workspace: str = "/workspace") -> str:
+    full = path if path.startswith("/") else os.path.join(workspace, path)
+    rel = os.path.relpath(full, project_root)
+    return rel.replace("\\", "/")
+
+
+def find_impacted_tests(container, project_root: str, toolchain: str, changed_paths: list) -> list:
+    """
+    Returns test identifiers for `toolchain`:
+      maven/gradle/dotnet → test class names, python → file node ids,
+      node → the changed source files themselves (Jest resolves the graph).
+    Paths are relative to the project root; files outside it are ignored.
+    """
+    rel_paths = [
+        p for p in (_relative_to_root(c, project_root) for c in changed_paths or [])
+        if not p.startswith("../")
+    ]
+    if not rel_paths:
+        return []
+
+    if toolchain == "node":
+        return sorted(set(p for p in rel_paths if re.search(r"\.[jt]sx?$", p)))
+
+    if toolchain not in TEST_LAYOUTS:
+        return []
+
+    direct_tests = [p for p in rel_paths if is_test_path(p)]
+    symbols = sorted({
+        os.path.splitext(os.path.basename(p))[0]
+        for p in rel_paths if not is_test_path(p)
+    })
+    symbols = [s for s in symbols if IDENT_RE.match(s) and s != "__init__"]
+
+    found = list(direct_tests)
+    if symbols:
+        roots, includes = TEST_LAYOUTS[toolchain]
+        include = " ".join(f"--include='{g}'" for g in includes)
+        pattern = "|".join(symbols)
+        cmd = (
+            f"bash -lc \"cd {project_root} && "
+            f"grep -rlwE '{pattern}' {include} {' '.join(roots)} 2>/dev/null\""
+        )
+        ec, out = container.exec_run(cmd)
+        found.extend(l.strip().lstrip("./") for l in out.decode(errors="ignore").splitlines() if l.strip())
+
+    if toolchain == "python":
+        return sorted(set(p for p in found if p.endswith(".py")))
+    # JVM / .NET: class names
+    return sorted(set(os.path.splitext(os.path.basename(p))[0] for p in found if is_test_path(p)))
@@ -0,0 +1,137 @@
+# utils/tracing.py
+"""
+Optional OpenTelemetry tracing: one root span per build, a child span per
+graph node and leaf spans for LLM calls and container execs/archives.
+
+Enable with TRACE_EXPORTER:
+  file  -> JSON lines appended to TRACE_FILE (default <VAR_DIR>/traces.jsonl)
+  otlp  -> OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (standard OTel env vars)
+  off   -> (default) no spans
+
+Needs `pip install opentelemetry-sdk` (plus `opentelemetry-exporter-otlp-proto-http`
+for otlp). Without them `span()` is a no-op and builds run unchanged.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from constants.storage import VAR_DIR
+
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(VAR_DIR, "traces.jsonl"))
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "solution-builder")
+
+_tracer = None
+_provider = None
+_initialized = False
+_lock = threading.Lock()
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def exporter_kind() -> str:
+    return os.getenv("TRACE_EXPORTER", "off").lower()
+
+
+def _file_exporter(path: str):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        """One span per line, in the SDK's JSON form (loadable by trace viewers/converters)."""
+        def __init__(self):
+            self._lock = threading.Lock()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        def export(self, spans):
+            lines = [json.dumps(json.loads(s.to_json())) for s in spans]
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+    return JsonLinesSpanExporter()
+
+
+def _init():
+    global _tracer, _provider, _initialized
+    with _lock:
+        if _initialized:
+            return _tracer
+        _initialized = True
+        kind = exporter_kind()
+        if kind in ("", "0", "off", "false", "none"):
+            return None
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            print("⚠️ opentelemetry-sdk not installed; tracing disabled")
+            return None
+        if kind == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError:
+                print("⚠️ opentelemetry-exporter-otlp-proto-http not installed; tracing disabled")
+                return None
+            exporter = OTLPSpanExporter()
+        elif kind == "file":
+            exporter = _file_exporter(TRACE_FILE)
+        else:
+            print(f"⚠️ Unknown TRACE_EXPORTER '{kind}'; tracing disabled")
+            return None
+        _provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        _provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(_provider)
+        _tracer = _provider.get_tracer("solution-builder")
+        print(f"🔭 Tracing enabled ({kind})")
+        return _tracer
+
+
+def get_tracer():
+    return _tracer if _initialized else _init()
+
+
+@contextmanager
+def span(name: str, attributes: dict = None):
+    """Current-context span (nests under the active build/node span)."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as s:
+        yield s
+
+
+def start_span(name: str, attributes: dict = None):
+    """Detached span for work that outlives the caller's frame (streamed execs); call .end()."""
+    tracer = get_tracer()
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start_span(name, attributes=_clean(attributes))
+
+
+def _clean(attributes: dict) -> dict:
+    return {k: v for k, v in (attributes or {}).items() if v is not None}
+
+
+def flush():
+    if _provider is not None:
+        _provider.force_flush()